@@ -4,17 +4,57 @@ Base classes for all conversational agents.
 Provides common lifecycle hooks, transfer logic, and form scaffolding.
 """
 
+import json
 import logging
 from abc import ABC, abstractmethod
-from typing import Tuple, Annotated
+from typing import Annotated, Any, Dict, List, Optional, Set, Tuple
 
 from livekit.agents.voice import Agent
-from livekit.agents.llm import function_tool
+from livekit.agents.llm import ChatContext, ChatMessage, StopResponse, ToolResult, function_tool
+from livekit.agents.voice.events import FunctionToolsExecutedEvent, MetricsCollectedEvent
 from livekit.plugins import openai
 from pydantic import Field
 
+from agents.chat_context import (
+    AGENT_IDENTITY_MESSAGE_ID, DEFAULT_KEEP_EXCHANGES, DEFAULT_MAX_TOKENS, FORM_STATE_MESSAGE_ID,
+    FRONTEND_UPDATE_MESSAGE_ID, ContextCompactor,
+)
+from agents.form_engine import form_tools, language_bundle, turn_tools
+from models.base_form import BaseFormData
+from models.schema import SESSION_MIN_SILENCE, YES_NO, FormSchema, SpeechProfile, compile_schema
+from utils.applicants import APPLICANTS
+from utils.frontend import queue_to_frontend, schedule_form_submit
+from utils.tts_cache import PHRASE_CACHE
+from utils.normalizers import is_correction, parse_yes_no
+from utils.stt_manager import STT_MANAGER, ManagedSTT
+from utils.submissions import SUBMISSIONS
+
 logger = logging.getLogger(__name__)
 
+RESUME_PROMPT = {
+    "english": "Welcome back! Let's continue where we left off.",
+    "kannada": "ಮತ್ತೆ ಸ್ವಾಗತ! ನಾವು ನಿಲ್ಲಿಸಿದ ಕಡೆಯಿಂದ ಮುಂದುವರಿಸೋಣ.",
+}
+
+# Read back values pre-filled from another answer (e.g. district and taluk from the pincode)
+INFERRED_PROMPT = {
+    "english": "From your {source}, {values}. Is that correct?",
+    "kannada": "ನಿಮ್ಮ {source} ಪ್ರಕಾರ {values}. ಇದು ಸರಿಯೇ?",
+}
+INFERRED_VALUE = {"english": "{label} is {value}", "kannada": "{label} {value}"}
+INFERRED_JOIN = {"english": " and ", "kannada": ", "}
+
+# Offer a returning applicant's stored details ({name}: ", <name>" or "")
+RETURNING_PROMPT = {
+    "english": "Welcome back{name}! Shall I use your applicant details from your earlier application?",
+    "kannada": "ಮತ್ತೆ ಸ್ವಾಗತ{name}! ನಿಮ್ಮ ಹಿಂದಿನ ಅರ್ಜಿಯ ಅರ್ಜಿದಾರರ ವಿವರಗಳನ್ನು ಬಳಸಲೇ?",
+}
+
+CONFIRMATION_PROMPT = {
+    "english": "Thank you. Would you like to submit the form now?",
+    "kannada": "ಧನ್ಯವಾದಗಳು. ನೀವು ಫಾರ್ಮ್ ಸಲ್ಲಿಸಲು ಬಯಸುವಿರಾ?",
+}
+
 
 # -------------------------------------------------------------------
 # BaseAgent
@@ -42,12 +82,17 @@ class BaseAgent(Agent):
             truncated_chat_ctx = userdata.prev_agent.chat_ctx.copy(
                 exclude_instructions=True, exclude_function_call=False
             ).truncate(max_items=6)
-            existing_ids = {item.id for item in chat_ctx.items}
+            existing_ids = {item.id for item in chat_ctx.items} | {
+                AGENT_IDENTITY_MESSAGE_ID, FORM_STATE_MESSAGE_ID, FRONTEND_UPDATE_MESSAGE_ID,
+            }
             items_copy = [item for item in truncated_chat_ctx.items if item.id not in existing_ids]
             chat_ctx.items.extend(items_copy)
 
-        # Add an instruction including the user data
+        # Add an instruction including the user data (one message, replaced on re-entry)
+        if chat_ctx.get_by_id(AGENT_IDENTITY_MESSAGE_ID) is not None:
+            chat_ctx.remove(AGENT_IDENTITY_MESSAGE_ID)
         chat_ctx.add_message(
+            id=AGENT_IDENTITY_MESSAGE_ID,
             role="system",
             content=f"You are {agent_name} agent.",
         )
@@ -61,8 +106,27 @@ class BaseAgent(Agent):
         current_agent = self.session.current_agent
         next_agent = userdata.agents[name]
         userdata.prev_agent = current_agent
+        if isinstance(next_agent, BaseAgent):
+            await next_agent.apply_language(userdata.preferred_language)
         return next_agent, f"Transferring to {name}."
 
+    def say(self, text: str, **kwargs):
+        """session.say() through the phrase cache (fixed prompts play pre-synthesized audio)."""
+        return PHRASE_CACHE.say(self.session, text, **kwargs)
+
+    async def apply_language(self, language: Optional[str]) -> None:
+        """
+        Switch to the instruction/STT bundle for `language`.
+        No-op by default; form agents swap their precompiled bundles.
+        """
+
+    async def reset(self) -> None:
+        """
+        Clear per-session state so a pooled instance can serve a new session.
+        Called by AgentPool once the owning session has shut down.
+        """
+        await self.update_chat_ctx(ChatContext.empty())
+
     @function_tool()
     async def to_greeter(self) -> tuple:
         """Called when user asks any unrelated questions or wants to go back to main menu."""
@@ -92,6 +156,7 @@ class BaseAgent(Agent):
         
         # Update STT language hints based on selected language
         await update_stt_language(self.session, language_lower)
+        await self.apply_language(language_lower)
         
         if language_lower == "kannada":
             return "ಧನ್ಯವಾದಗಳು! ನಿಮ್ಮ ಮಾಹಿತಿಯನ್ನು ನಾನು ಸಂಗ್ರಹಿಸುತ್ತೇನೆ."
@@ -158,25 +223,593 @@ class BaseFormAgent(BaseAgent):
     """
     Base class for form-filling agents (e.g. contact form, felling form).
     Adds scaffolding for collecting fields, asking confirmation, and submission.
+    Tools, instructions and next questions are generated from `form_class`
+    (see agents/form_engine.py and models/schema.py).
     """
 
+    # Form dataclass filled by this agent
+    form_class: Optional[type] = None
+
+    # "dynamic": each turn only exposes the setters for the expected field and
+    # the next ones (plus navigation and confirm); "all": every tool, always
+    tool_exposure: str = "dynamic"
+    # Number of field setters exposed per turn in dynamic mode
+    tool_window: int = 2
+
+    # Speak the next question returned by a form tool directly instead of
+    # sending the tool result back to the LLM for a follow-up completion
+    direct_reply: bool = True
+
+    # Per-language Soniox context; when set the agent runs its own STT
+    stt_context: Dict[str, str] = {}
+
+    # Chat history sent to the LLM: last N user exchanges verbatim, older
+    # turns folded into one form-state message, bounded by a token ceiling
+    context_exchanges: int = DEFAULT_KEEP_EXCHANGES
+    context_max_tokens: int = DEFAULT_MAX_TOKENS
+
+    def __init__(self, instructions: Optional[str] = None, **kwargs) -> None:
+        tools = [*(kwargs.pop("tools", None) or []), *form_tools(self.form_class)]
+        # Bilingual bundle until the user's language is known
+        bundle = language_bundle(type(self))
+        if self.stt_context and "stt" not in kwargs:
+            kwargs["stt"] = STT_MANAGER.client(self.stt_profile())
+        super().__init__(
+            instructions=instructions or bundle.instructions,
+            tools=tools,
+            **kwargs,
+        )
+        self._custom_instructions = instructions is not None
+        self._compactor = ContextCompactor(self.context_exchanges, self.context_max_tokens)
+        # Speech queued by tool_reply(), spoken once the tool batch is done
+        self._pending_reply: Optional[str] = None
+        self._language: Optional[str] = None
+        # Field whose question was asked last, i.e. the answer we expect next
+        self._expected_field: Optional[str] = None
+        # Field the user was answering in the turn being processed (latency report)
+        self._turn_field: Optional[str] = None
+        # VAD silence this agent last set (the session's until a profile applies)
+        self._vad_silence = SESSION_MIN_SILENCE
+        # Field whose answer pre-filled others that the user was asked to confirm
+        self._confirming: Optional[str] = None
+        # Stored details offered to a returning applicant, awaiting yes/no
+        self._returning_offer: Optional[Dict[str, Any]] = None
+        # Fields typed in the frontend that the planner has not passed yet
+        self._frontend_filled: Set[str] = set()
+        # Questions not asked because the frontend already had the answer
+        self.questions_skipped = 0
+        # to_greeter, set_language and any extra tools passed in
+        generated = form_tools(self.form_class)
+        self._navigation_tools = [tool for tool in self.tools if tool not in generated]
+
+    @classmethod
+    def stt_profile(cls) -> str:
+        """Name of this agent's option sets in the STT manager (registered on first use)."""
+        profile = cls.__name__
+
+        def build(language: Optional[str]) -> Tuple[Tuple[str, ...], str]:
+            bundle = language_bundle(cls, language)
+            return bundle.language_hints, bundle.stt_context
+
+        STT_MANAGER.register(profile, build)
+        return profile
+
+    @property
+    def schema(self) -> FormSchema:
+        return compile_schema(self.form_class)
+
+    @property
+    def form(self) -> BaseFormData:
+        return self.session.userdata.get_form(self.schema.name)
+
+    async def reset(self) -> None:
+        await super().reset()
+        self._expected_field = None
+        self._turn_field = None
+        self._vad_silence = SESSION_MIN_SILENCE
+        self._frontend_filled.clear()
+        self._confirming = None
+        self._returning_offer = None
+        self.questions_skipped = 0
+        self._pending_reply = None
+        await self.apply_language(None)
+        await self.update_tools([*self._navigation_tools, *form_tools(self.form_class)])
+
     async def on_enter(self) -> None:
         """
         Extended lifecycle: after base enter, begin form collection.
         """
-        await super().on_enter()
-        agent_name = self.__class__.__name__
-        logger.info(f"Entering {agent_name}")
-        
         userdata = self.session.userdata
-        
-        # Form agents should already have language selected from greeter
-        if userdata.language_selected:
-            await self._start_form_collection()
+        userdata.agent_type = self.schema.name
+        await self.apply_language(userdata.preferred_language)
+        await super().on_enter()
+        self.session.on("function_tools_executed", self._on_tools_executed)
+        self.session.on("metrics_collected", self._on_metrics_collected)
+        await self._start_form_collection()
+        await self._expose_tools()
+
+    async def on_exit(self) -> None:
+        self.session.off("function_tools_executed", self._on_tools_executed)
+        self.session.off("metrics_collected", self._on_metrics_collected)
+        self._pending_reply = None
+        self._apply_speech_profile(None)
+
+    async def apply_language(self, language: Optional[str]) -> None:
+        """Swap instructions and STT context to the precompiled bundle for `language`."""
+        if language == self._language:
+            return
+
+        bundle = language_bundle(type(self), language)
+        if not self._custom_instructions:
+            await self.update_instructions(bundle.instructions)
+        if isinstance(self.stt, ManagedSTT):
+            # Prebuilt options; a live stream reconnects with them in place
+            STT_MANAGER.switch(self.stt, language)
+
+        self._language = language
+        logger.info(f"🌐 {self.__class__.__name__} using {language or 'bilingual'} bundle")
 
     async def _start_form_collection(self):
-        """Override this method in subclasses to start collecting form data"""
-        pass
+        """Greet the user and ask for the first unfilled field (or resume a restored session)."""
+        userdata = self.session.userdata
+        language = userdata.preferred_language or "english"
+        intro = self.form_class.intro.get(language) or self.form_class.intro.get("english", "")
+
+        resume_field = None
+        if userdata.resumed:
+            # Restored after a crash or reconnect: pick up at the field that was being asked
+            userdata.resumed = False
+            intro = RESUME_PROMPT.get(language) or RESUME_PROMPT["english"]
+            if userdata.current_field in self.schema.by_name and not getattr(self.form, userdata.current_field):
+                resume_field = userdata.current_field
+
+        self._expect(resume_field or self.plan_next_field())
+        if self._expected_field is None:
+            question = await self._ask_for_confirmation()
+        else:
+            question = self.schema.by_name[self._expected_field].prompt_for(language)
+
+        # Spoken as two fixed phrases so both can come from the phrase cache
+        if intro:
+            self.say(intro)
+        await self.say(question)
+
+    def plan_next_field(self, after: Optional[str] = None) -> Optional[str]:
+        """
+        Next field to ask, from the live form state: the first unfilled field
+        in question order after `after`, then any missing required field.
+        Fields the user already filled in the frontend are skipped (and counted).
+        """
+        form = self.form
+        next_field = form.next_field(after=after)
+
+        order = self.schema.field_order
+        start = order.index(after) + 1 if after in order else 0
+        stop = order.index(next_field) if next_field in order else len(order)
+        skipped = [name for name in order[start:stop] if name in self._frontend_filled]
+        if skipped:
+            self.questions_skipped += len(skipped)
+            self._frontend_filled.difference_update(skipped)
+            logger.info(f"⏭️ Skipping {', '.join(skipped)} (filled in the form)")
+        return next_field
+
+    async def _next_question(self, after: Optional[str] = None) -> str:
+        """Question for the next unfilled field, or the confirmation prompt when done."""
+        self._expect(self.plan_next_field(after=after))
+        if self._expected_field is None:
+            return await self._ask_for_confirmation()
+        return self.schema.by_name[self._expected_field].prompt_for(self.session.userdata.preferred_language)
+
+    # -----------------------------------------------------------------
+    # Per-field speech profiles
+    # -----------------------------------------------------------------
+
+    def _expect(self, field_name: Optional[str]) -> None:
+        """Mark `field_name` as the field being asked and listen for it."""
+        self._expected_field = field_name
+        self.session.userdata.current_field = field_name
+        spec = self.schema.by_name.get(field_name) if field_name else None
+        self._apply_speech_profile(spec.speech if spec is not None else None)
+
+    def _apply_speech_profile(self, speech: Optional[SpeechProfile]) -> None:
+        """Endpointing and STT biasing for the next answer (None = session defaults)."""
+        stt = self.stt if isinstance(self.stt, ManagedSTT) else self.session.stt
+        if isinstance(stt, ManagedSTT):
+            STT_MANAGER.focus(stt, speech)
+
+        vad = self.session.vad
+        if vad is None or not hasattr(vad, "update_options"):
+            return
+        silence = speech.silence() if speech else SESSION_MIN_SILENCE
+        if silence != self._vad_silence:
+            vad.update_options(min_silence_duration=silence)
+            self._vad_silence = silence
+
+    def _on_metrics_collected(self, ev: MetricsCollectedEvent) -> None:
+        if ev.metrics.type != "eou_metrics" or self._turn_field is None:
+            return
+        spec = self.schema.by_name.get(self._turn_field)
+        silence = spec.speech.silence() if spec is not None and spec.speech else SESSION_MIN_SILENCE
+        STT_MANAGER.record_turn(self._turn_field, ev.metrics.end_of_utterance_delay, SESSION_MIN_SILENCE - silence)
+
+    # -----------------------------------------------------------------
+    # Field updates (called by the generated tools and the fast path)
+    # -----------------------------------------------------------------
+
+    async def apply_field(self, field_name: str, value: Any) -> str:
+        """Validate and store one field, notify the frontend, return the next question."""
+        userdata = self.session.userdata
+        cleaned, errors = self.form.validate_updates({field_name: value})
+        if errors:
+            self._expect(field_name)
+            return self.schema.by_name[field_name].error_for(userdata.preferred_language)
+
+        self._confirming = None
+        self._returning_offer = None
+        self.form.apply_updates(cleaned)
+        returning = self.form_class.returning
+        if returning is not None and field_name == returning.key:
+            offer = await self._offer_returning(cleaned[field_name])
+            if offer is not None:
+                queue_to_frontend(userdata.ctx.room, cleaned)
+                await self._expose_tools()
+                return offer
+        inferred = self.form.infer_from(field_name)
+        queue_to_frontend(userdata.ctx.room, {**cleaned, **inferred})
+        if inferred:
+            question = self._confirm_inferred_question(field_name, inferred)
+        else:
+            question = await self._next_question(after=field_name)
+        await self._expose_tools()
+        return question
+
+    async def apply_fields(self, raw_arguments: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """
+        Validate every provided field, apply them together, and send one
+        frontend update. Nothing is saved if any value is invalid.
+        Returns (tool output, next question or None if nothing was saved).
+        """
+        userdata = self.session.userdata
+        form = self.form
+
+        updates = {k: v for k, v in raw_arguments.items() if v is not None and v != ""}
+        if not updates:
+            return "No field values were provided.", None
+
+        cleaned, errors = form.validate_updates(updates)
+        if errors:
+            problems = "; ".join(f"{name}: {error}" for name, error in errors.items())
+            return f"Nothing was saved. Please ask the user again for: {problems}", None
+
+        self._confirming = None
+        form.apply_updates(cleaned)
+        inferred = {name: form.infer_from(name) for name in cleaned}
+        source = next((name for name, values in inferred.items() if values), None)
+        queue_to_frontend(userdata.ctx.room, {**cleaned, **{k: v for values in inferred.values() for k, v in values.items()}})
+        logger.info(f"📝 Bulk-updated fields: {', '.join(cleaned)}")
+
+        if source is not None:
+            question = self._confirm_inferred_question(source, inferred[source])
+        else:
+            last = max(cleaned, key=form.field_order.index)
+            question = await self._next_question(after=last)
+        await self._expose_tools()
+        return f"Saved {', '.join(cleaned)}. Next question: {question}", question
+
+    def _confirm_inferred_question(self, source: str, inferred: Dict[str, str]) -> str:
+        """Read back the values pre-filled from `source` and ask the user to confirm them."""
+        language = self.session.userdata.preferred_language
+        key = language if language in INFERRED_PROMPT else "english"
+        specs = self.schema.by_name
+        values = INFERRED_JOIN[key].join(
+            INFERRED_VALUE[key].format(label=specs[name].label_for(language).replace("_", " "), value=value)
+            for name, value in inferred.items()
+        )
+        logger.info(f"🧭 Inferred {', '.join(inferred)} from {source}, asking to confirm")
+        self._confirming = source
+        self._expected_field = None
+        self._apply_speech_profile(YES_NO)
+        source_label = specs[source].label_for(language).replace("_", " ")
+        return INFERRED_PROMPT[key].format(source=source_label, values=values)
+
+    async def _answer_inferred(self, transcript: str) -> Optional[str]:
+        """Yes/no to the inferred values: keep them, or clear them and ask. None if unclear."""
+        answer = parse_yes_no(transcript)
+        if answer is None:
+            return None
+        source, self._confirming = self._confirming, None
+        form = self.form
+        if answer == "Yes":
+            confirmed = form.confirm_inferred()
+            self.questions_skipped += len(confirmed)
+            logger.info(f"⏭️ Confirmed inferred {', '.join(confirmed)}")
+            return await self._next_question(after=source)
+
+        rejected = form.reject_inferred()
+        queue_to_frontend(self.session.userdata.ctx.room, {name: None for name in rejected})
+        logger.info(f"↩️ Inferred {', '.join(rejected)} rejected, asking again")
+        if not rejected:
+            return await self._next_question(after=source)
+        self._expect(rejected[0])
+        return self.schema.by_name[rejected[0]].prompt_for(self.session.userdata.preferred_language)
+
+    async def _offer_returning(self, key: str) -> Optional[str]:
+        """Offer a returning applicant's stored details in one yes/no turn. None if there are none to offer."""
+        profile = await APPLICANTS.lookup(self.schema.name, key)
+        form = self.form
+        offer = {name: value for name, value in (profile or {}).items() if value and not getattr(form, name, None)}
+        if not offer:
+            return None
+
+        logger.info(f"🔁 Returning applicant, offering {len(offer)} stored fields")
+        self._returning_offer = offer
+        self._expected_field = None
+        self._apply_speech_profile(YES_NO)
+        language = self.session.userdata.preferred_language
+        name = (profile or {}).get(self.form_class.returning.name or "")
+        prompt = RETURNING_PROMPT.get(language) or RETURNING_PROMPT["english"]
+        return prompt.format(name=f", {name}" if name else "")
+
+    async def _answer_returning(self, transcript: str) -> Optional[str]:
+        """Yes/no to the stored details: fill them, or ask as for a new applicant. None if unclear."""
+        answer = parse_yes_no(transcript)
+        if answer is None:
+            return None
+        offer, self._returning_offer = self._returning_offer, None
+        if answer == "Yes":
+            reused = self.form.prefill(offer)
+            queue_to_frontend(self.session.userdata.ctx.room, reused)
+            self.questions_skipped += len(reused)
+            logger.info(f"⏭️ Reused {', '.join(reused)} for a returning applicant")
+        return await self._next_question(after=self.form_class.returning.key)
+
+    async def on_frontend_update(self, changes: Dict[str, Any]) -> None:
+        """
+        Fields typed (or cleared) in the frontend, already applied to the form.
+        The LLM is told through one system message (no generation), and if
+        the field being asked was filled there, the next question is spoken.
+        """
+        form = self.form
+        filled = {name: value for name, value in changes.items() if value not in (None, "")}
+        self._frontend_filled.update(filled)
+        self._frontend_filled.difference_update(name for name in changes if name not in filled)
+        await self._announce_frontend_update(changes)
+
+        expected = self._expected_field
+        if expected in filled and getattr(form, expected, None):
+            self._frontend_filled.discard(expected)
+            self.questions_skipped += 1
+            question = await self._next_question(after=expected)
+            if self.session.current_agent is self:
+                self.say(question)
+        await self._expose_tools()
+
+    async def _announce_frontend_update(self, changes: Dict[str, Any]) -> None:
+        """Replace the frontend-update system message with `changes`."""
+        chat_ctx = self.chat_ctx.copy()
+        if chat_ctx.get_by_id(FRONTEND_UPDATE_MESSAGE_ID) is not None:
+            chat_ctx.remove(FRONTEND_UPDATE_MESSAGE_ID)
+        chat_ctx.add_message(
+            id=FRONTEND_UPDATE_MESSAGE_ID,
+            role="system",
+            content=(
+                "The user edited the form directly (already saved, do not ask for these again): "
+                f"{json.dumps(changes, ensure_ascii=False)}."
+            ),
+        )
+        await self.update_chat_ctx(chat_ctx)
+
+    async def confirm_and_submit(self) -> str:
+        """Submit the form if nothing required is missing."""
+        userdata = self.session.userdata
+        form = self.form
+
+        missing_fields = form.get_missing_fields()
+        if missing_fields:
+            missing = ", ".join(missing_fields)
+            if userdata.preferred_language == "kannada":
+                return f"ದಯವಿಟ್ಟು ಈ ಮಾಹಿತಿಯನ್ನು ಒದಗಿಸಿ: {missing}"
+            return f"Please provide the following missing information: {missing}"
+
+        # Durable server-side submission first (delivered in the background,
+        # see utils/submissions.py); the frontend submit stays as the fallback
+        submission_id = None
+        try:
+            submission_id = await SUBMISSIONS.submit(self.schema.name, form.to_dict(), session=userdata.ctx.room.name)
+        except Exception as e:
+            logger.error(f"❌ Could not queue {self.schema.name} submission: {e}")
+        # Applicant details for the next application (returning applicants);
+        # the write is tracked by APPLICANTS, which the shutdown callback drains
+        APPLICANTS.remember(self.schema.name, form)
+
+        # If nothing missing → mark ready to submit
+        userdata.awaiting_confirmation = False
+        userdata.should_submit = True
+        # Flushes the queued field updates before should_submit, off the reply path
+        # (tracked by the room's outbox, which the shutdown callback closes)
+        schedule_form_submit(userdata.ctx.room, submission_id)
+
+        messages = self.form_class.submitted_message
+        return messages.get(userdata.preferred_language) or messages["english"]
+
+    # -----------------------------------------------------------------
+    # Direct replies
+    # -----------------------------------------------------------------
+
+    def tool_reply(self, output: str, speech: Optional[str] = None) -> Any:
+        """
+        Result for a form tool. With direct_reply, `speech` (default: output)
+        is spoken as soon as the tool batch finishes and no follow-up LLM
+        generation is requested; the output stays in the chat context.
+        """
+        if not self.direct_reply:
+            return output
+        self._pending_reply = speech or output
+        return ToolResult(output, reply_required=False)
+
+    def _on_tools_executed(self, ev: FunctionToolsExecutedEvent) -> None:
+        reply, self._pending_reply = self._pending_reply, None
+        if reply is None or self.session.current_agent is not self:
+            return
+        if ev.has_tool_reply or ev.has_agent_handoff:
+            return  # the LLM replies anyway (e.g. set_language ran in the same batch)
+        logger.debug("⏩ Direct reply, skipping follow-up LLM generation")
+        self.say(reply)
+
+    # -----------------------------------------------------------------
+    # Pre-LLM fast path
+    # -----------------------------------------------------------------
+
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        """
+        Pre-LLM capture stage.
+        If the answer to the expected field can be parsed locally, store it,
+        speak the next question and skip the LLM for this turn.
+        """
+        transcript = new_message.text_content
+        self._turn_field = self._expected_field
+        # A pending yes/no question is settled first: "yes, that's correct" confirms, it corrects nothing
+        reply = await self._try_yes_no(transcript)
+        if reply is None and not is_correction(transcript):
+            reply = await self._try_fast_path(transcript)
+        if reply is None:
+            # The LLM answers this turn: give it only the tools and history it needs
+            await self._expose_tools(widen=self._should_widen(transcript))
+            await self._compact_chat_ctx(turn_ctx)
+            # Inferred values stay unconfirmed (listed in the form state) unless corrected,
+            # and an unanswered returning-applicant offer lapses
+            self._confirming = None
+            self._returning_offer = None
+            return
+
+        # Keep the user's answer in the history, the LLM never saw this turn
+        chat_ctx = self.chat_ctx.copy()
+        chat_ctx.items.append(new_message)
+        await self.update_chat_ctx(chat_ctx)
+
+        self.say(reply)
+        raise StopResponse()
+
+    async def _try_yes_no(self, transcript: Optional[str]) -> Optional[str]:
+        """
+        Answer to a pending yes/no question (inferred values, returning-applicant
+        offer or a yes/no field). Returns the next question, None if unclear.
+        """
+        if not transcript or self.session.userdata.awaiting_confirmation:
+            return None
+        if self._confirming is not None:
+            return await self._answer_inferred(transcript)
+        if self._returning_offer is not None:
+            return await self._answer_returning(transcript)
+
+        spec = self.schema.by_name.get(self._expected_field) if self._expected_field else None
+        if spec is None or spec.capture is not parse_yes_no:
+            return None
+        value = parse_yes_no(transcript)
+        if value is None:
+            return None
+        logger.info(f"⚡ Fast-path captured {spec.name}")
+        return await self.apply_field(spec.name, value)
+
+    async def _try_fast_path(self, transcript: Optional[str]) -> Optional[str]:
+        """Returns the next question if the expected field was captured, else None."""
+        userdata = self.session.userdata
+        if not transcript or userdata.awaiting_confirmation:
+            return None
+        if self._confirming is not None or self._returning_offer is not None:
+            return None  # unclear answer to the pending yes/no question (see _try_yes_no)
+
+        field_name = self._expected_field or self.form.next_field()
+        if field_name is None:
+            return None
+
+        value = self.form.capture_value(field_name, transcript)
+        if value is None:
+            return None
+
+        logger.info(f"⚡ Fast-path captured {field_name}")
+        return await self.apply_field(field_name, value)
+
+    # -----------------------------------------------------------------
+    # Chat context compaction
+    # -----------------------------------------------------------------
+
+    def _form_state_message(self) -> str:
+        """Snapshot of the saved fields and the next one to ask, for the LLM."""
+        form = self.form
+        filled = {name: value for name, value in form.to_dict().items() if value not in (None, "", False, [])}
+        next_field = self._expected_field or form.next_field()
+        unconfirmed = form.unconfirmed
+        inferred = (
+            f" {', '.join(unconfirmed)} were inferred from another answer and read back to the user; "
+            "if the user corrects them, save the corrected values."
+        ) if unconfirmed else ""
+        return (
+            f"Current {self.schema.name} form state (already saved, do not ask again): "
+            f"{json.dumps(filled, ensure_ascii=False)}.{inferred} "
+            f"Next field to ask: {next_field or 'none, ask the user to confirm submission'}."
+        )
+
+    async def _compact_chat_ctx(self, turn_ctx: ChatContext) -> None:
+        """Fold old turns into the form-state message, in the agent and for this reply."""
+        state = self._form_state_message()
+        await self.update_chat_ctx(self._compactor.compact(self.chat_ctx, state))
+        # This turn's reply is generated from turn_ctx, a copy taken before the update
+        turn_ctx.items = self._compactor.compact(turn_ctx, state).items
+
+    # -----------------------------------------------------------------
+    # Dynamic tool exposure
+    # -----------------------------------------------------------------
+
+    def tools_for_turn(self, form: BaseFormData, widen: bool = False) -> List[Any]:
+        """
+        Tools sent with the next LLM request: navigation tools, setters for the
+        expected field and the `tool_window - 1` fields after it, update_fields
+        (any field the user volunteers beyond the window) and confirm.
+        `widen` (or tool_exposure="all") returns every tool.
+        """
+        if widen or self.tool_exposure != "dynamic":
+            return [*self._navigation_tools, *form_tools(self.form_class)]
+
+        window: List[str] = []
+        field_name = self._expected_field or form.next_field()
+        while field_name is not None and field_name not in window and len(window) < self.tool_window:
+            window.append(field_name)
+            field_name = form.next_field(after=field_name)
+
+        return [*self._navigation_tools, *turn_tools(self.form_class, window)]
+
+    def _should_widen(self, transcript: Optional[str]) -> bool:
+        """
+        Fallback to the full tool set when the user may be changing an earlier
+        answer: correction words, naming an already-filled field, the read-back
+        of inferred values, or the confirmation step (any field can be edited there).
+        """
+        userdata = self.session.userdata
+        if userdata.awaiting_confirmation or self._confirming is not None or is_correction(transcript):
+            return True
+        if not transcript:
+            return False
+
+        text = transcript.lower()
+        form = self.form
+        for spec in self.schema.fields:
+            if spec.name == self._expected_field or not getattr(form, spec.name, None):
+                continue
+            names = (spec.name.replace("_", " "), spec.label_for(userdata.preferred_language).lower())
+            if any(name in text for name in names):
+                return True
+        return False
+
+    async def _expose_tools(self, widen: bool = False) -> None:
+        """Swap the agent's tool set for the coming LLM request (dynamic mode)."""
+        if self.tool_exposure != "dynamic":
+            return
+
+        tools = self.tools_for_turn(self.form, widen=widen)
+        if tools != self.tools:
+            logger.debug(f"🧰 Exposing {len(tools)} tools{' (widened)' if widen else ''}")
+            await self.update_tools(tools)
 
     async def _ask_for_confirmation(self) -> str:
         """
@@ -185,7 +818,4 @@ class BaseFormAgent(BaseAgent):
         userdata = self.session.userdata
         userdata.awaiting_confirmation = True
 
-        if userdata.preferred_language == "kannada":
-            return "ಧನ್ಯವಾದಗಳು. ನೀವು ಫಾರ್ಮ್ ಸಲ್ಲಿಸಲು ಬಯಸುವಿರಾ?"
-        else:
-            return "Thank you. Would you like to submit the form now?"
\ No newline at end of file
+        return CONFIRMATION_PROMPT.get(userdata.preferred_language) or CONFIRMATION_PROMPT["english"]
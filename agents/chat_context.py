@@ -0,0 +1,115 @@
+# agents/chat_context.py
+"""
+Bounded chat context for form agents.
+
+A long form session otherwise resends every past question, answer and
+tool call on each turn. ContextCompactor keeps the last few user exchanges
+verbatim and replaces everything older with one system message (kept in
+place under a fixed id) describing the current form state, so the prompt
+stays roughly flat as the form fills up. The other fixed-id system messages
+(the agent identity and the latest frontend edits) are pinned the same way:
+they are replaced in place when they change, never aged out.
+"""
+
+import logging
+import os
+from typing import List, Tuple
+
+from livekit.agents.llm import ChatContext, ChatItem, ChatMessage
+
+from agents.form_engine import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Id of the instructions message managed by livekit (value must not change)
+INSTRUCTIONS_MESSAGE_ID = "lk.agent_task.instructions"
+# Id of the compacted form state message
+FORM_STATE_MESSAGE_ID = "form.state"
+# Id of the "You are X agent" system message
+AGENT_IDENTITY_MESSAGE_ID = "agent.identity"
+# Id of the "user filled these fields in the form" system message
+FRONTEND_UPDATE_MESSAGE_ID = "form.frontend_update"
+# Kept whatever their age, after the instructions and before the form state
+PINNED_MESSAGE_IDS = (AGENT_IDENTITY_MESSAGE_ID, FRONTEND_UPDATE_MESSAGE_ID)
+
+DEFAULT_KEEP_EXCHANGES = 3
+DEFAULT_MAX_TOKENS = int(os.getenv("CHAT_CONTEXT_MAX_TOKENS", "1200"))
+
+
+def item_tokens(item: ChatItem) -> int:
+    """Approximate prompt tokens of one chat item."""
+    if item.type == "message":
+        return count_tokens(item.text_content)
+    if item.type == "function_call":
+        return count_tokens(item.name) + count_tokens(item.arguments)
+    if item.type == "function_call_output":
+        return count_tokens(item.output)
+    return 0
+
+
+class ContextCompactor:
+    """
+    Keeps at most `keep_exchanges` user exchanges (a user message and
+    everything after it up to the next user message) and, on top of that,
+    drops the oldest kept exchanges while the history exceeds `max_tokens`.
+    The newest exchange and the `pinned` messages are always kept.
+    """
+
+    def __init__(
+        self,
+        keep_exchanges: int = DEFAULT_KEEP_EXCHANGES,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        pinned: Tuple[str, ...] = PINNED_MESSAGE_IDS,
+    ) -> None:
+        self.keep_exchanges = keep_exchanges
+        self.max_tokens = max_tokens
+        self.pinned = pinned
+
+    def compact(self, chat_ctx: ChatContext, state: str) -> ChatContext:
+        """Return a compacted copy of `chat_ctx` with `state` as the form state message."""
+        instructions = chat_ctx.get_by_id(INSTRUCTIONS_MESSAGE_ID)
+        pinned = [item for item in chat_ctx.items if item.id in self.pinned]
+        managed = {INSTRUCTIONS_MESSAGE_ID, FORM_STATE_MESSAGE_ID, *self.pinned}
+        body = [item for item in chat_ctx.items if item.id not in managed]
+
+        starts = [i for i, item in enumerate(body) if item.type == "message" and item.role == "user"]
+        kept_starts = starts[-self.keep_exchanges:] if self.keep_exchanges > 0 else starts[-1:]
+        start = kept_starts[0] if len(starts) > len(kept_starts) else 0
+
+        budget = self.max_tokens - count_tokens(state)
+        if instructions is not None:
+            budget -= item_tokens(instructions)
+        budget -= sum(item_tokens(item) for item in pinned)
+        tokens = [item_tokens(item) for item in body]
+        for next_start in kept_starts[1:]:
+            if sum(tokens[start:]) <= budget:
+                break
+            start = next_start
+
+        kept: List[ChatItem] = body[start:]
+        if start:
+            logger.debug(f"🗜️ Compacted {start} chat items into form state")
+
+        anchor = kept[0].created_at if kept else (instructions.created_at if instructions else None)
+        state_message = ChatMessage(
+            id=FORM_STATE_MESSAGE_ID,
+            role="system",
+            content=[state],
+            **({"created_at": anchor - 1e-3} if anchor is not None else {}),
+        )
+
+        if anchor is not None:
+            # Ordered by created_at like the rest of the context: just before the state
+            pinned = [
+                item.model_copy(update={"created_at": anchor - 1e-3 * (len(pinned) - i + 1)})
+                for i, item in enumerate(pinned)
+            ]
+
+        items: List[ChatItem] = [instructions] if instructions is not None else []
+        items.extend(pinned)
+        items.append(state_message)
+        items.extend(kept)
+        return ChatContext(items)
+
+    def total_tokens(self, chat_ctx: ChatContext) -> int:
+        return sum(item_tokens(item) for item in chat_ctx.items)
@@ -0,0 +1,300 @@
+# agents/form_engine.py
+"""
+Schema-driven form engine.
+Generates the LLM tool set and instructions for a form from the field
+metadata on its dataclass (see models/schema.py). Everything here is built
+once per form class per process and shared by every agent instance.
+
+Tools resolve the agent that is running them through RunContext, so the
+same tool objects can be handed to every pooled agent. Their results go
+through agent.tool_reply(), which speaks the next question directly
+instead of asking the LLM to repeat it (BaseFormAgent.direct_reply).
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from livekit.agents import RunContext
+from livekit.agents.llm import FunctionTool, RawFunctionTool, function_tool
+
+from models.schema import FieldSpec, compile_schema
+from utils.metrics import timed
+
+try:
+    # exact token counts for the payload report
+    import tiktoken
+except ImportError:
+    tiktoken = None  # fallback: estimate from byte length
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------------------
+# Tool generation
+# -------------------------------------------------------------------
+
+def _field_tool(spec: FieldSpec) -> RawFunctionTool:
+    """update_<field> tool for a single field."""
+
+    async def update_field(raw_arguments: Dict[str, Any], context: RunContext) -> str:
+        agent = context.session.current_agent
+        with timed("tool_exec"):
+            question = await agent.apply_field(spec.name, raw_arguments.get(spec.name))
+        return agent.tool_reply(question)
+
+    return function_tool(update_field, raw_schema=spec.tool_schema())
+
+
+@lru_cache(maxsize=None)
+def _bulk_tool(form_cls: type) -> RawFunctionTool:
+    """update_fields tool taking any subset of the form's fields."""
+
+    async def update_fields(raw_arguments: Dict[str, Any], context: RunContext) -> str:
+        agent = context.session.current_agent
+        with timed("tool_exec"):
+            output, question = await agent.apply_fields(raw_arguments)
+        # Nothing saved: let the LLM explain what to ask again
+        return agent.tool_reply(output, speech=question) if question else output
+
+    return function_tool(
+        update_fields,
+        raw_schema={
+            "name": "update_fields",
+            "description": (
+                "Save several form fields at once when the user gives more than one "
+                "value in a single answer. Only include fields the user actually said."
+            ),
+            "parameters": compile_schema(form_cls).fields_schema,
+        },
+    )
+
+
+@lru_cache(maxsize=None)
+def _confirm_tool(form_cls: type) -> RawFunctionTool:
+    """confirm_and_submit_<form>_form tool."""
+    name = f"confirm_and_submit_{compile_schema(form_cls).name}_form"
+
+    async def confirm_and_submit(raw_arguments: Dict[str, Any], context: RunContext) -> str:
+        agent = context.session.current_agent
+        with timed("tool_exec"):
+            output = await agent.confirm_and_submit()
+        return agent.tool_reply(output)
+
+    return function_tool(
+        confirm_and_submit,
+        raw_schema={
+            "name": name,
+            "description": "Submit the form after the user has confirmed all details.",
+            "parameters": {"type": "object", "properties": {}, "additionalProperties": False},
+        },
+    )
+
+
+@lru_cache(maxsize=None)
+def field_tools(form_cls: type) -> Dict[str, RawFunctionTool]:
+    """update_<field> tool per field name, in question order."""
+    return {spec.name: _field_tool(spec) for spec in compile_schema(form_cls).fields}
+
+
+@lru_cache(maxsize=None)
+def form_tools(form_cls: type) -> Tuple[RawFunctionTool, ...]:
+    """All generated tools for a form: one setter per field, update_fields and confirm."""
+    return (*field_tools(form_cls).values(), _bulk_tool(form_cls), _confirm_tool(form_cls))
+
+
+def turn_tools(form_cls: type, field_names: Sequence[str]) -> List[RawFunctionTool]:
+    """
+    Reduced tool set for one turn: setters for `field_names`, update_fields
+    (answers that run ahead of the window) and the confirm tool.
+    Used by dynamic tool exposure instead of form_tools().
+    """
+    setters = field_tools(form_cls)
+    return [
+        *(setters[name] for name in field_names if name in setters),
+        _bulk_tool(form_cls),
+        _confirm_tool(form_cls),
+    ]
+
+
+# -------------------------------------------------------------------
+# Instructions
+# -------------------------------------------------------------------
+
+INSTRUCTION_TEMPLATES = {
+    "english": (
+        "You are a form-filling assistant for the {title}. "
+        "You MUST ask for information strictly one field at a time using the provided tool functions. "
+        "Never skip fields, never summarize prematurely, and never ask for multiple fields together. "
+        "If the user volunteers several values in one answer, "
+        "save them all with a single update_fields() call when it is available, otherwise call each update tool. "
+        "The exact order is:\n"
+        "{order}"
+        "At the end, always call {confirm}(). "
+        "⚠️ Never jump ahead. Always wait for user input before moving to the next field."
+    ),
+    "kannada": (
+        "ನೀವು {title} ಅನ್ನು ಭರ್ತಿ ಮಾಡಲು ಸಹಾಯ ಮಾಡುವ ಸಹಾಯಕನಾಗಿದ್ದೀರಿ. "
+        "ಪ್ರತಿ ಹಂತವನ್ನು ಒಂದೊಂದು ಬಾರಿ ಮಾತ್ರ ಕೇಳಬೇಕು. "
+        "ಒಂದೇ ಸಮಯದಲ್ಲಿ ಹಲವಾರು ಪ್ರಶ್ನೆಗಳನ್ನು ಕೇಳಬಾರದು, ಯಾವುದನ್ನೂ ಬಿಡಬಾರದು. "
+        "ಬಳಕೆದಾರರು ಒಂದೇ ಉತ್ತರದಲ್ಲಿ ಹಲವಾರು ಮಾಹಿತಿಗಳನ್ನು ಹೇಳಿದರೆ, ಅವೆಲ್ಲವನ್ನೂ ಒಂದೇ update_fields() ಕರೆಯಲ್ಲಿ ಉಳಿಸಿ (ಲಭ್ಯವಿಲ್ಲದಿದ್ದರೆ ಪ್ರತಿ update ಟೂಲ್ ಬಳಸಿ). "
+        "ಕಡ್ಡಾಯ ಕ್ರಮ:\n"
+        "{order}"
+        "ಕೊನೆಯಲ್ಲಿ ಸದಾ {confirm}() ಅನ್ನು ಕರೆ ಮಾಡಬೇಕು. "
+        "⚠️ ಪ್ರತಿ ಹಂತಕ್ಕೆ ಬಳಕೆದಾರರ ಉತ್ತರ ಬಂದ ಬಳಿಕ ಮಾತ್ರ ಮುಂದಿನ ಹಂತಕ್ಕೆ ಹೋಗಿ."
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def build_instructions(form_cls: type, languages: Sequence[str] = ("english", "kannada")) -> str:
+    """
+    Generate the agent instructions for a form, one rule block per language.
+    The English block lists tool field names, other languages use field labels
+    (with the field name as well when no English block is included).
+    """
+    schema = compile_schema(form_cls)
+    confirm = f"confirm_and_submit_{schema.name}_form"
+    blocks = []
+
+    for language in languages:
+        lines = []
+        for number, specs in enumerate(schema.sections().values(), start=1):
+            if language == "english":
+                names = [spec.name for spec in specs]
+            elif "english" in languages:
+                names = [spec.label_for(language) for spec in specs]
+            else:
+                # No English block to name the tools: pair each label with its field
+                names = [f"{spec.label_for(language)} ({spec.name})" for spec in specs]
+            lines.append(f"{number}. {' → '.join(names)}\n")
+
+        title = form_cls.form_title.get(language) or form_cls.form_title.get("english", schema.name)
+        blocks.append(
+            INSTRUCTION_TEMPLATES[language].format(title=title, order="".join(lines), confirm=confirm)
+        )
+
+    return "\n\n".join(blocks)
+
+
+# -------------------------------------------------------------------
+# Language bundles
+# -------------------------------------------------------------------
+
+LANGUAGE_HINTS = {"english": ("en",), "kannada": ("kn", "en")}
+
+
+@dataclass(frozen=True)
+class LanguageBundle:
+    """Instructions and STT settings for one language (or all, before one is chosen)."""
+
+    language: Optional[str]
+    instructions: str
+    stt_context: Optional[str]
+    language_hints: Tuple[str, ...]
+
+
+@lru_cache(maxsize=None)
+def language_bundle(agent_cls: type, language: Optional[str] = None) -> LanguageBundle:
+    """
+    Bundle for `agent_cls` in `language`. Unknown/None → every language
+    concatenated, used until the user has picked one. Built once per process.
+    """
+    languages = (language,) if language in INSTRUCTION_TEMPLATES else tuple(INSTRUCTION_TEMPLATES)
+    contexts = getattr(agent_cls, "stt_context", None) or {}
+
+    return LanguageBundle(
+        language=language if len(languages) == 1 else None,
+        instructions=build_instructions(agent_cls.form_class, languages),
+        stt_context="\n\n".join(contexts[lang] for lang in languages if lang in contexts) or None,
+        language_hints=tuple(dict.fromkeys(hint for lang in languages for hint in LANGUAGE_HINTS[lang])),
+    )
+
+
+def prewarm_bundles(agent_classes: Iterable[type]) -> int:
+    """Build every language bundle up front (called from the worker prewarm)."""
+    count = 0
+    for agent_cls in agent_classes:
+        if getattr(agent_cls, "form_class", None) is None:
+            continue
+        for language in (None, *INSTRUCTION_TEMPLATES):
+            language_bundle(agent_cls, language)
+            count += 1
+    return count
+
+
+# -------------------------------------------------------------------
+# Payload measurement
+# -------------------------------------------------------------------
+
+def tool_schema_payload(tools: Iterable[Any]) -> Tuple[int, int]:
+    """Return (tool count, JSON bytes) of the tool definitions sent with each LLM request."""
+    from livekit.agents.llm.utils import build_legacy_openai_schema
+
+    count, size = 0, 0
+    for tool in tools:
+        if isinstance(tool, RawFunctionTool):
+            definition = {"type": "function", "function": tool.info.raw_schema}
+        elif isinstance(tool, FunctionTool):
+            definition = build_legacy_openai_schema(tool)
+        else:
+            continue
+        count += 1
+        size += len(json.dumps(definition, ensure_ascii=False).encode("utf-8"))
+    return count, size
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Prompt tokens for `text` (tiktoken if installed, else ~4 bytes per token)."""
+    if not text:
+        return 0
+    if tiktoken is not None:
+        return len(tiktoken.get_encoding("o200k_base").encode(text))
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def tool_payload_report() -> Dict[str, Dict[str, int]]:
+    """
+    Per-request payload (tools + instructions) of every registered form agent:
+    the full tool set, the set exposed on the first turn in dynamic mode, and
+    instruction / STT context tokens for the bilingual and per-language bundles.
+    """
+    from agents.registry import AGENT_REGISTRY
+    from models.registry import FORM_REGISTRY
+
+    report = {}
+    for name, form_cls in FORM_REGISTRY.items():
+        agent_cls = AGENT_REGISTRY[name]
+        agent = agent_cls()
+        count, size = tool_schema_payload(agent.tools)
+        turn_count, turn_size = tool_schema_payload(agent.tools_for_turn(form_cls()))
+        report[name] = {
+            "tools": count,
+            "tool_bytes": size,
+            "turn_tools": turn_count,
+            "turn_tool_bytes": turn_size,
+        }
+        for language in (None, *INSTRUCTION_TEMPLATES):
+            bundle = language_bundle(agent_cls, language)
+            key = language or "bilingual"
+            report[name][f"{key}_instruction_tokens"] = count_tokens(bundle.instructions)
+            report[name][f"{key}_stt_tokens"] = count_tokens(bundle.stt_context)
+    return report
+
+
+if __name__ == "__main__":
+    for form_name, sizes in tool_payload_report().items():
+        print(
+            f"{form_name:10s} tools={sizes['tools']:3d} "
+            f"tool_schema={sizes['tool_bytes']:6d} B "
+            f"per_turn={sizes['turn_tools']:3d} tools/{sizes['turn_tool_bytes']:6d} B"
+        )
+        for key in ("bilingual", *INSTRUCTION_TEMPLATES):
+            print(
+                f"{'':10s} {key:10s} instructions={sizes[f'{key}_instruction_tokens']:5d} tok "
+                f"stt_context={sizes[f'{key}_stt_tokens']:5d} tok"
+            )
+    if tiktoken is None:
+        print("(token counts estimated, install tiktoken for exact counts)")
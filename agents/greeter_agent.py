@@ -9,12 +9,40 @@ from livekit.agents.llm import function_tool
 from livekit.plugins import openai
 from pydantic import Field
 import json
-from livekit.agents.llm import LLM, ChatMessage
+from livekit.agents.llm import LLM, ChatContext, ChatMessage, StopResponse
 from agents.base_agent import BaseAgent
 from utils.frontend import send_to_frontend
+from utils.intent import load_intent_classifier
 
 logger = logging.getLogger(__name__)
 
+GREETING = (
+    "Hello! I'm here to help you with Karnataka Forest services. "
+    "Would you prefer to continue in English or Kannada?"
+)
+
+SERVICE_PROMPTS = {
+    "english": (
+        "Great! How can I help you today? Just tell me what you need - "
+        "whether it's a general inquiry, complaint, or if you need permission for tree cutting. "
+        "What brings you here?"
+    ),
+    "kannada": (
+        "ಇಂದು ನಾನು ನಿಮಗೆ ಯಾವ ರೀತಿಯಲ್ಲಿ ಸಹಾಯ ಮಾಡಬಹುದು?"
+    ),
+}
+
+CANNOT_HELP = {
+    "english": "I'm sorry, I can't help with that specific request. I can only assist with general inquiries and tree cutting permissions.",
+    "kannada": "ಕ್ಷಮಿಸಿ, ನಾನು ಆ ವಿಷಯದಲ್ಲಿ ಸಹಾಯ ಮಾಡಲು ಸಾಧ್ಯವಿಲ್ಲ. ನಾನು ಕೇವಲ ಸಾಮಾನ್ಯ ವಿಚಾರಣೆಗಳು ಮತ್ತು ಮರ ಕಡಿಯುವ ಅನುಮತಿಗಳಿಗೆ ಸಹಾಯ ಮಾಡಬಲ್ಲೆ.",
+}
+
+# Frontend route per service
+ROUTES = {
+    "contact": "/contact-form",
+    "felling": "/felling-transit-permission",
+}
+
 
 class GreeterAgent(BaseAgent):
     """
@@ -49,30 +77,50 @@ class GreeterAgent(BaseAgent):
         userdata.agent_type = "greeter"
 
         if not userdata.language_selected:
-            await self.session.say(
-                "Hello! I'm here to help you with Karnataka Forest services. "
-                "Would you prefer to continue in English or Kannada?"
-            )
+            await self.say(GREETING)
         else:
             await self._ask_for_service_intent(userdata.preferred_language)
 
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        """
+        Route confident service requests with the local intent classifier, skipping the LLM.
+        Everything else (other questions, ambiguous requests, language selection) goes to the LLM.
+        """
+        userdata = self.session.userdata
+        if not userdata.language_selected:
+            return
+
+        intent = load_intent_classifier().classify(new_message.text_content or "")
+        if intent is None:
+            return
+
+        logger.info(f"⚡ Local intent: {intent}")
+        chat_ctx = self.chat_ctx.copy()
+        chat_ctx.items.append(new_message)
+        await self.update_chat_ctx(chat_ctx)
+
+        await self._route_locally(intent)
+        raise StopResponse()
+
+    async def _route_locally(self, intent: str) -> None:
+        """Navigate the frontend and hand over to the form agent without a tool call."""
+        userdata = self.session.userdata
+        userdata.requested_route = ROUTES[intent]
+        await send_to_frontend(userdata.ctx.room, {"route": userdata.requested_route}, topic="navigation")
+
+        next_agent, _ = await self._transfer_to_agent(intent)
+        self.session.update_agent(next_agent)
+
+    def _cannot_help_message(self) -> str:
+        return CANNOT_HELP.get(self.session.userdata.preferred_language) or CANNOT_HELP["english"]
+
     async def _ask_for_service_intent(self, language):
         """Ask what service the user needs"""
         userdata = self.session.userdata
         userdata.preferred_language = (language or "english").lower()  # ✅ persist
 
-        messages = {
-            "english": (
-                "Great! How can I help you today? Just tell me what you need - "
-                "whether it's a general inquiry, complaint, or if you need permission for tree cutting. "
-                "What brings you here?"
-            ),
-            "kannada": (
-                "ಇಂದು ನಾನು ನಿಮಗೆ ಯಾವ ರೀತಿಯಲ್ಲಿ ಸಹಾಯ ಮಾಡಬಹುದು?"
-            ),
-        }
-        message = messages.get(userdata.preferred_language, messages["english"])
-        await self.session.say(message)
+        message = SERVICE_PROMPTS.get(userdata.preferred_language, SERVICE_PROMPTS["english"])
+        await self.say(message)
 
     @function_tool()
     async def set_language(
@@ -92,7 +140,7 @@ class GreeterAgent(BaseAgent):
     async def to_contact_form(self) -> str:
         """Called when user wants to fill a contact form for general inquiries."""
         userdata = self.session.userdata
-        userdata.requested_route = "/contact-form"
+        userdata.requested_route = ROUTES["contact"]
 
         # ✅ Send route update to frontend
         await send_to_frontend(
@@ -113,7 +161,7 @@ class GreeterAgent(BaseAgent):
     async def to_felling_form(self) -> tuple:
         """Called when user wants to fill a felling transit permission form."""
         userdata = self.session.userdata
-        userdata.requested_route = "/felling-transit-permission"
+        userdata.requested_route = ROUTES["felling"]
 
         # ✅ Correct send_to_frontend usage
         await send_to_frontend(
@@ -131,6 +179,23 @@ class GreeterAgent(BaseAgent):
     ) -> str:
         """Classify the user request into one of: contact, felling, unknown."""
 
+        # Local classifier first, the nested LLM call only for ambiguous requests
+        intent = load_intent_classifier().classify(user_request)
+        if intent is None:
+            intent = await self._detect_intent_with_llm(user_request)
+
+        # Route based on intent
+        if intent == "contact":
+            return await self.to_contact_form()
+
+        elif intent == "felling":
+            return await self.to_felling_form()
+
+        else:
+            return self._cannot_help_message()
+
+    async def _detect_intent_with_llm(self, user_request: str) -> str:
+        """LLM fallback for detect_intent."""
         prompt = f"""
         You are an intent classifier for Karnataka government services.
         Classify the following request into exactly one category:
@@ -153,17 +218,4 @@ class GreeterAgent(BaseAgent):
         except Exception as e:
             logger.error(f"Intent detection failed: {e}")
             intent = "unknown"
-
-        userdata = self.session.userdata
-
-        # Route based on intent
-        if intent == "contact":
-            return await self.to_contact_form()
-
-        elif intent == "felling":
-            return await self.to_felling_form()
-
-        else:
-            if userdata.preferred_language == "kannada":
-                return "ಕ್ಷಮಿಸಿ, ನಾನು ಆ ವಿಷಯದಲ್ಲಿ ಸಹಾಯ ಮಾಡಲು ಸಾಧ್ಯವಿಲ್ಲ. ನಾನು ಕೇವಲ ಸಾಮಾನ್ಯ ವಿಚಾರಣೆಗಳು ಮತ್ತು ಮರ ಕಡಿಯುವ ಅನುಮತಿಗಳಿಗೆ ಸಹಾಯ ಮಾಡಬಲ್ಲೆ."
-            return "I'm sorry, I can't help with that specific request. I can only assist with general inquiries and tree cutting permissions."
\ No newline at end of file
+        return intent
@@ -1,11 +1,143 @@
+import logging
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Type
+
+from livekit.agents.voice import Agent
+
+from models.registry import FORM_REGISTRY
+
+from .base_agent import BaseFormAgent
 from .greeter_agent import GreeterAgent
 from .contact_agent import ContactFormAgent
 from .felling_agent import FellingFormAgent
 
+logger = logging.getLogger(__name__)
+
 # Central registry of available agent classes
-# Each agent is instantiated per-session in main.py
+# Agents are built lazily per session through AgentProvider (see main.py)
 AGENT_REGISTRY = {
     "greeter": GreeterAgent,
     "contact": ContactFormAgent,
     "felling": FellingFormAgent,
-}
\ No newline at end of file
+}
+
+# Forms without a dedicated agent class get a generic schema-driven one
+for _form_name, _form_cls in FORM_REGISTRY.items():
+    if _form_name not in AGENT_REGISTRY:
+        AGENT_REGISTRY[_form_name] = type(
+            f"{_form_cls.__name__.removesuffix('Data')}Agent",
+            (BaseFormAgent,),
+            {"form_class": _form_cls},
+        )
+
+
+# -------------------------------------------------------------------
+# Per-process agent pool
+# -------------------------------------------------------------------
+
+class AgentPool:
+    """
+    Per-process pool of idle agent instances.
+
+    Each job process runs a single session and then exits, so agents are
+    never carried from one session to the next across processes. What does
+    carry over is prewarm: idle job processes are prewarmed before they are
+    handed a job, so prewarm() builds the agents there, off the session's
+    start. Agents released by a finished session are reset and kept for a
+    later session only where one process hosts several (e.g. a thread
+    executor or tests).
+    """
+
+    def __init__(self, registry: Dict[str, Type[Agent]], max_idle_per_agent: int = 4) -> None:
+        self.registry = registry
+        self.max_idle_per_agent = max_idle_per_agent
+        self._idle: Dict[str, List[Agent]] = {name: [] for name in registry}
+        self.created = 0
+        self.reused = 0
+
+    def prewarm(self, names: Optional[Iterable[str]] = None) -> int:
+        """Build one idle agent per name (all registered by default). Returns how many were built."""
+        built = 0
+        for name in names if names is not None else self.registry:
+            idle = self._idle[name]
+            if len(idle) < self.max_idle_per_agent:
+                idle.append(self.registry[name]())
+                built += 1
+        return built
+
+    def acquire(self, name: str) -> Agent:
+        """Return an idle agent for `name`, building one only if the pool is empty."""
+        idle = self._idle.get(name)
+        if idle is None:
+            raise KeyError(name)
+
+        if idle:
+            self.reused += 1
+            return idle.pop()
+
+        self.created += 1
+        logger.debug(f"🧱 Building new {self.registry[name].__name__}")
+        return self.registry[name]()
+
+    async def release(self, name: str, agent: Agent) -> None:
+        """Reset `agent` and keep it for a later session (dropped if the pool is full)."""
+        idle = self._idle.get(name)
+        if idle is None or len(idle) >= self.max_idle_per_agent:
+            return
+
+        try:
+            reset = getattr(agent, "reset", None)
+            if reset is not None:
+                await reset()
+        except Exception as e:
+            logger.warning(f"Discarding {name} agent, reset failed: {e}")
+            return
+
+        idle.append(agent)
+
+    def provider(self) -> "AgentProvider":
+        """Create a lazy, session-scoped view over this pool."""
+        return AgentProvider(self)
+
+
+class AgentProvider(Mapping):
+    """
+    Session-scoped mapping of agent name → agent instance.
+    Agents are only taken from the pool the first time they are looked up
+    (e.g. by `_transfer_to_agent` / `switch_agent`), so a room that goes
+    straight to one form never builds the others.
+    """
+
+    def __init__(self, pool: AgentPool) -> None:
+        self._pool = pool
+        self._agents: Dict[str, Agent] = {}
+
+    def __getitem__(self, name: str) -> Agent:
+        agent = self._agents.get(name)
+        if agent is None:
+            agent = self._pool.acquire(name)
+            self._agents[name] = agent
+        return agent
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._pool.registry
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pool.registry)
+
+    def __len__(self) -> int:
+        return len(self._pool.registry)
+
+    def get_built(self, name: str) -> Optional[Agent]:
+        """Return the agent for `name` only if this session already built it."""
+        return self._agents.get(name)
+
+    async def release(self) -> None:
+        """Hand every agent built by this session back to the pool (once the session has closed)."""
+        agents, self._agents = self._agents, {}
+        for name, agent in agents.items():
+            await self._pool.release(name, agent)
+
+
+# Shared pool for the current worker process
+AGENT_POOL = AgentPool(AGENT_REGISTRY)
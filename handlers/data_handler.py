@@ -1,70 +1,199 @@
 # handlers/data_handler.py
-import json
+"""
+Inbound frontend data.
+
+Field edits arrive on every keystroke while the user types in the React
+form. FrontendInbox keeps them off the hot path: a packet is decoded, its
+keys resolved through a precompiled per-form index, and the values parked
+in a pending dict (last writer wins per field). Once the user pauses for
+DEBOUNCE_SECONDS the batch is validated, applied to the current form in one
+step, and the active agent is notified once.
+
+Accepted packets (JSON or a negotiated compact encoding, utils/codec.py):
+
+    {"field": "pincode", "value": "571105"}
+    {"fields": {"pincode": "571105", "mobileNumber": "9876543210"}}
+    {"updates": [{"field": "pincode", "value": "571105"}, ...]}
+
+Keys may be field names, frontend keys or field IDs. An empty value
+clears the field.
+"""
+
+import asyncio
 import logging
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
 from livekit.agents import JobContext
+
+from models.registry import FORM_REGISTRY
+from models.schema import FieldSpec
 from models.userdata import UserData
+from utils.codec import decode_payload, hello_reply, negotiate
+from utils.frontend import FrontendOutbox, outbox_for, send_to_frontend
 
 logger = logging.getLogger(__name__)
 
+# Quiet period after the last keystroke before a batch is applied
+DEBOUNCE_SECONDS = 0.15
+
+
+@lru_cache(maxsize=None)
+def inbound_index(form_name: str) -> Dict[str, FieldSpec]:
+    """Field name, frontend key and field ID (as str) → FieldSpec for a registered form."""
+    form_cls = FORM_REGISTRY.get(form_name)
+    if form_cls is None:
+        return {}
+    index: Dict[str, FieldSpec] = {}
+    for position, spec in enumerate(form_cls.schema().fields):
+        index[str(position)] = spec
+        index[spec.frontend_key] = spec
+        index[spec.name] = spec
+    return index
+
+
+def parse_updates(obj: Dict[str, Any]) -> Iterable[Tuple[Any, Any]]:
+    """(key, value) pairs of a single, dict or list update packet."""
+    if isinstance(obj.get("fields"), dict):
+        return obj["fields"].items()
+    if isinstance(obj.get("updates"), list):
+        return ((item.get("field"), item.get("value")) for item in obj["updates"] if isinstance(item, dict))
+    if "field" in obj:
+        return ((obj["field"], obj.get("value")),)
+    return ()
+
+
+class FrontendInbox:
+    """Debounced, batched application of frontend field edits to the current form."""
+
+    def __init__(self, userdata: UserData, outbox: Optional[FrontendOutbox] = None, delay: float = DEBOUNCE_SECONDS) -> None:
+        self.userdata = userdata
+        self.outbox = outbox
+        self.delay = delay
+        self._pending: Dict[str, Any] = {}
+        self._form_name: Optional[str] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Agent notifications still running (kept so they are not garbage collected)
+        self._notifications: Set[asyncio.Task] = set()
+        self.received = 0
+        self.applied = 0
+        self.rejected = 0
+
+    def receive(self, obj: Dict[str, Any]) -> int:
+        """Park the packet's field values. Returns how many were recognised."""
+        form = self.userdata.current_form
+        if form is None:
+            logger.debug(f"Frontend update ignored, no active form ({self.userdata.agent_type})")
+            return 0
+        if self._form_name != form.form_name:
+            self._pending.clear()  # the form changed under a pending batch
+            self._form_name = form.form_name
+
+        index = inbound_index(form.form_name)
+        accepted = 0
+        for key, value in parse_updates(obj):
+            spec = index.get(str(key))
+            if spec is None:
+                logger.debug(f"Unknown field for {form.form_name} form: {key}")
+                continue
+            self._pending[spec.name] = value
+            accepted += 1
 
-def register_data_handler(ctx: JobContext, userdata: UserData):
+        self.received += accepted
+        if accepted:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self.flush)
+        return accepted
+
+    def flush(self) -> Dict[str, Any]:
+        """Validate and apply the pending batch now. Returns the applied values."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        form = self.userdata.current_form
+        if not pending or form is None or form.form_name != self._form_name:
+            return {}
+
+        cleared = {name: None for name, value in pending.items() if value is None or value == ""}
+        cleaned, errors = form.validate_updates({k: v for k, v in pending.items() if k not in cleared})
+        if errors:
+            self.rejected += len(errors)
+            logger.debug(f"Rejected frontend values: {errors}")
+
+        changes = {**cleaned, **cleared}
+        changes = {name: value for name, value in changes.items() if getattr(form, name, None) != value}
+        if not changes:
+            return {}
+
+        form.apply_updates(changes)
+        self.applied += len(changes)
+        if self.outbox is not None:
+            self.outbox.mark_known(changes)
+        logger.debug(f"Applied frontend update to {form.form_name}: {changes}")
+        self._notify_agent(changes)
+        return changes
+
+    def _notify_agent(self, changes: Dict[str, Any]) -> None:
+        agents = self.userdata.agents
+        get_built = getattr(agents, "get_built", None)
+        agent = get_built(self.userdata.agent_type) if get_built else agents.get(self.userdata.agent_type)
+        on_frontend_update = getattr(agent, "on_frontend_update", None)
+        if on_frontend_update is not None:
+            task = asyncio.ensure_future(on_frontend_update(changes))
+            self._notifications.add(task)
+            task.add_done_callback(self._notified)
+
+    def _notified(self, task: asyncio.Task) -> None:
+        self._notifications.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ Agent failed to handle frontend update: {task.exception()}")
+
+    def stats(self) -> dict:
+        return {"received": self.received, "applied": self.applied, "rejected": self.rejected}
+
+
+def register_data_handler(ctx: JobContext, userdata: UserData) -> FrontendInbox:
     """
     Register handlers for receiving frontend data events.
+    Also answers form-state resync requests and sends a snapshot to
+    participants that (re)join (see the sync protocol in utils/frontend.py).
     """
     from livekit import rtc
 
+    outbox = outbox_for(ctx.room)
+    outbox.bind_form(lambda: userdata.current_form)
+    inbox = FrontendInbox(userdata, outbox)
+
     def handle_data(packet: rtc.DataPacket):
         try:
-            obj = json.loads(packet.data.decode("utf-8"))
-            logger.info(f"received data: {obj}")
-            field = obj.get("field")
-            value = obj.get("value")
-            
-            if not field or not value:
+            obj = decode_payload(packet.data)
+            logger.debug(f"received data: {obj}")
+
+            # Wire format negotiation (utils/codec.py); the reply itself is JSON
+            if obj.get("type") == "hello":
+                outbox.codec = negotiate(obj)
+                logger.info(f"🗜️ Frontend encoding: {outbox.codec.encoding} (zlib={outbox.codec.compress})")
+                asyncio.create_task(send_to_frontend(ctx.room, hello_reply(outbox.codec), topic="sync", reliable=True))
+                return
+
+            # Frontend detected a version gap (or has no state yet)
+            if obj.get("type") == "resync":
+                logger.info(f"🔁 Resync requested at version {obj.get('version')}")
+                outbox.request_snapshot()
                 return
 
-            # Map frontend field names to userdata fields based on agent type
-            if userdata.agent_type == "contact":
-                field_mapping = {
-                    "company": "company",
-                    "subject": "subject", 
-                    "message": "message",
-                    "phone": "phone",
-                }
-                # Update contact form
-                if field in field_mapping:
-                    setattr(userdata.contact_form, field_mapping[field], value)
-                    logger.info(f"Updated contact form {field_mapping[field]}: {value}")
-                    
-            elif userdata.agent_type == "felling":
-                field_mapping = {
-                    "applicantName": "applicant_name",
-                    "fatherName": "father_name",
-                    "address": "address",
-                    "village": "village",
-                    "taluk": "taluk",
-                    "district": "district",
-                    "mobileNumber": "mobile_number",
-                    "emailId": "email_id",
-                    "khataNumber": "khata_number",
-                    "surveyNumber": "survey_number",
-                    "totalExtentAcres": "total_extent_acres",
-                    "guntas": "guntas",
-                    "anna": "anna",
-                    "treeSpecies": "tree_species",
-                    "treeAge": "tree_age",
-                    "treeGirth": "tree_girth",
-                    "pincode": "pincode",
-                }
-                # Update felling form
-                if field in field_mapping:
-                    setattr(userdata.felling_form, field_mapping[field], value)
-                    logger.info(f"Updated felling form {field_mapping[field]}: {value}")
-            else:
-                logger.warning(f"Unknown field for {userdata.agent_type} agent: {field}")
-                
+            inbox.receive(obj)
+
         except Exception as e:
             logger.error(f"Failed to parse data packet: {e}")
-    
-    # Register the handler
-    ctx.room.on("data_received", handle_data)
\ No newline at end of file
+
+    def handle_participant_connected(participant: rtc.RemoteParticipant):
+        logger.info(f"🔁 Participant joined ({participant.identity}), sending form snapshot")
+        outbox.request_snapshot()
+
+    # Register the handlers
+    ctx.room.on("data_received", handle_data)
+    ctx.room.on("participant_connected", handle_participant_connected)
+    return inbox
@@ -1,15 +1,29 @@
+import asyncio
 import json
 from config.settings import logger
 # Session creation is now handled directly in main.py
 from handlers.data_handler import register_data_handler
-from agents.registry import AGENT_REGISTRY
+from agents.form_engine import prewarm_bundles
+from agents.greeter_agent import ROUTES
+from agents.registry import AGENT_POOL, AGENT_REGISTRY
+from models.registry import FORM_REGISTRY
+from models.schema import SESSION_MIN_SILENCE
+from utils.applicants import APPLICANTS
+from utils.frontend import close_frontend, outbox_for, queue_to_frontend
+from utils.gazetteer import load_gazetteer
+from utils.intent import load_intent_classifier
+from utils.session_store import SESSIONS
+from utils.submissions import SUBMISSIONS
+from utils.metrics import LATENCY, agent_fields, bind_session, on_metrics_collected, start_metrics_export, start_metrics_server
+from utils.stt_manager import SESSION_PROFILE, STT_MANAGER
+from utils.tts_cache import PHRASE_CACHE
 from models.userdata import UserData
 from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import AgentSession
 from livekit.agents.voice.room_io import RoomInputOptions
-from livekit.plugins import openai, silero, soniox, elevenlabs
+from livekit.plugins import openai, silero, elevenlabs
 from livekit import rtc
-from config.settings import logger, DEFAULT_LLM, DEFAULT_STT, DEFAULT_TTS
+from config.settings import logger, DEFAULT_LLM, DEFAULT_TTS
 
 def extract_agent_type_from_room_name(room_name: str) -> str:
     """Extract agent type from room name that contains __agent=type"""
@@ -17,7 +31,7 @@ def extract_agent_type_from_room_name(room_name: str) -> str:
         if "__agent=" in room_name:
             agent_type = room_name.split("__agent=")[1].split("__")[0]
             # Return the specific agent type if it's valid
-            if agent_type in ["contact", "felling"]:
+            if agent_type in FORM_REGISTRY:
                 return agent_type
     except:
         pass
@@ -26,7 +40,33 @@ def extract_agent_type_from_room_name(room_name: str) -> str:
 
 def prewarm(proc: JobProcess):
     """Pre-warm Silero VAD model to avoid TLS issues during runtime"""
-    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["vad"] = silero.VAD.load(min_silence_duration=SESSION_MIN_SILENCE)
+    # Per-language instruction/STT bundles, built once per worker process
+    bundles = prewarm_bundles(AGENT_REGISTRY.values())
+    logger.info(f"🌐 Prewarmed {bundles} language bundles")
+    # One idle instance of each agent, taken by this process's (single) session
+    logger.info(f"🧱 Prewarmed {AGENT_POOL.prewarm()} agents")
+    # STT option sets per profile (session + agents with their own STT) and language
+    for agent_cls in AGENT_REGISTRY.values():
+        if getattr(agent_cls, "stt_context", None):
+            agent_cls.stt_profile()
+    speech_profiles = {spec.speech for form_cls in FORM_REGISTRY.values() for spec in form_cls.schema().fields}
+    logger.info(f"🎙️ Prewarmed {STT_MANAGER.prewarm(speech_profiles=speech_profiles | {None})} STT option sets")
+    # Greeter intent classifier (data/intent_model.json)
+    load_intent_classifier()
+    # Place-name index (data/gazetteer), memory-mapped and shared with the other workers
+    load_gazetteer()
+    # Session store (data/sessions.db), opened before the first restore
+    if SESSIONS.open_sync() is not None:
+        logger.info(f"💾 Opened session store {SESSIONS.spec}")
+    # Returning-applicant index (data/applicants.db), opened before the first lookup
+    if APPLICANTS.enabled:
+        logger.info(f"🔁 Opened applicant index {APPLICANTS.index.path}")
+    # Latency histograms for every agent/field/language, scraped from /metrics
+    series = LATENCY.preallocate(agent_fields(AGENT_REGISTRY.values()))
+    logger.info(f"📈 Preallocated {series} latency series")
+    # Merged into the worker's /metrics endpoint (see start_metrics_server below)
+    start_metrics_export()
 
 
 async def entrypoint(ctx: JobContext):
@@ -38,48 +78,95 @@ async def entrypoint(ctx: JobContext):
         # Initialize UserData with context
         userdata = UserData(ctx=ctx)
 
-        # Instantiate all agents from registry
-        agents = {name: cls() for name, cls in AGENT_REGISTRY.items()}
+        # Agents come from the per-process pool (prewarmed) on first use
+        agents = AGENT_POOL.provider()
         userdata.agents = agents
+        session = None
+
+        # Shutdown callbacks run concurrently (asyncio.gather), the session's
+        # own close among them, so the whole teardown is this one callback:
+        # 1. the session and its agent activity close (aclose() waits for a
+        #    close in progress), so nothing queues updates or forms any more
+        # 2. agents are reset and returned to the pool
+        # 3. queued frontend updates, the session store, confirmed forms and
+        #    applicant details are flushed
+        # 4. the session stats are logged, now that every count is final
+        async def _shutdown(reason: str) -> None:
+            if session is not None:
+                await session.aclose()
+            await agents.release()
+            flushes = (_close_outbox(), SESSIONS.release(ctx.room.name), _drain_submissions(), APPLICANTS.drain())
+            for error in await asyncio.gather(*flushes, return_exceptions=True):
+                if isinstance(error, Exception):
+                    logger.error(f"❌ Shutdown step failed: {error}")
+            _log_session_end(reason)
+
+        async def _close_outbox() -> None:
+            logger.info(f"📤 Frontend outbox: {await close_frontend(ctx.room)}")
+
+        async def _drain_submissions() -> None:
+            await SUBMISSIONS.drain()
+            logger.info(f"📮 Submissions: {SUBMISSIONS.stats()}")
+
+        def _log_session_end(reason: str) -> None:
+            logger.info(f"🔊 Phrase cache: {PHRASE_CACHE.stats()}")
+            logger.info(f"🎙️ STT switches: {STT_MANAGER.stats()}")
+            logger.info(f"⏱️ Turn latency per field: {STT_MANAGER.field_report()}")
+            logger.info(f"💾 Session store: {SESSIONS.stats()}")
+            logger.info(f"🔁 Returning applicants: {APPLICANTS.stats()}")
+            logger.info(f"🏁 Session ended for room: {ctx.room.name} ({reason})")
+
+        ctx.add_shutdown_callback(_shutdown)
 
         # Register data handlers
         register_data_handler(ctx, userdata)
 
+        # Determine which agent to start with based on room name
+        agent_type = extract_agent_type_from_room_name(ctx.room.name)
+        logger.info(f"🎯 Detected agent type from room name: {agent_type}")
+
+        # Resume a session lost to a crash or a dropped connection (same room,
+        # or the same participant in a new room), then keep it persisted.
+        # The participant may join after the agent: wait for its identity.
+        # A room that deep-links a form (__agent=) only resumes that form.
+        participant = await ctx.wait_for_participant()
+        resumed = await SESSIONS.restore(
+            userdata,
+            ctx.room.name,
+            participant.identity,
+            agent_type=agent_type if agent_type in FORM_REGISTRY else None,
+        )
+        if resumed:
+            outbox_for(ctx.room).request_snapshot()  # refill the frontend form
+        SESSIONS.track(userdata, ctx.room.name)  # released by _shutdown
+
+        # Deliver confirmed forms (including ones left pending by a crashed process;
+        # drained by _shutdown)
+        SUBMISSIONS.start()
+
         # Get pre-warmed VAD or load it with custom settings
         vad = ctx.proc.userdata.get("vad") or silero.VAD.load(
-            min_silence_duration=1.0,  # Wait 1 second of silence before ending
+            min_silence_duration=SESSION_MIN_SILENCE,  # Field speech profiles adjust this per field
             min_speech_duration=0.1,   # Minimum speech duration
-            speech_pad_ms=300,         # Add padding around speech
+            prefix_padding_duration=0.3,  # Add padding before speech
         )
 
-        # Configure initial Soniox STT
-        initial_soniox_options = soniox.STTOptions(
-            language_hints=["en", "kn"],  # Start with English and Kannada
-            context=(
-                "Karnataka Government voice assistant for language selection. "
-                "User will say 'English' or 'Kannada' to select language. "
-                "Wait for complete phrases - do not cut off speech early. "
-                "Services: Contact Form, Felling Transit Permission."
-            )
-        )
-
-        # Determine which agent to start with based on room name
-        agent_type = extract_agent_type_from_room_name(ctx.room.name)
-        logger.info(f"🎯 Detected agent type from room name: {agent_type}")
-
         # Set up userdata based on agent type
-        if agent_type == "contact":
-            userdata.agent_type = "contact"
-            userdata.language_selected = True  # Skip language selection
-            userdata.preferred_language = "english"  # Default to English
-            selected_agent = agents["contact"]
-        elif agent_type == "felling":
-            userdata.agent_type = "felling"
+        if resumed and userdata.agent_type in FORM_REGISTRY:
+            agent_type = userdata.agent_type
+            selected_agent = agents[agent_type]
+            # Back to the form page; the form resyncs when it mounts
+            if agent_type in ROUTES:
+                queue_to_frontend(ctx.room, {"route": ROUTES[agent_type]}, topic="navigation", reliable=True)
+        elif agent_type in FORM_REGISTRY:
+            userdata.agent_type = agent_type
             userdata.language_selected = True  # Skip language selection
-            userdata.preferred_language = "english"  # Default to English
-            selected_agent = agents["felling"]
+            userdata.preferred_language = userdata.preferred_language or "english"  # Default to English
+            userdata.resumed = False
+            selected_agent = agents[agent_type]
         else:
-            # Default to greeter for intent detection
+            # Default to greeter for intent detection (a resumed session keeps its language)
+            userdata.resumed = False
             selected_agent = agents["greeter"]
 
          
@@ -87,12 +174,19 @@ async def entrypoint(ctx: JobContext):
         session = AgentSession[UserData](
             userdata=userdata,
             llm=DEFAULT_LLM,
-            stt=DEFAULT_STT,
+            # Own STT client per session, switched in place on language selection
+            stt=STT_MANAGER.client(SESSION_PROFILE, userdata.preferred_language if resumed else None),
             tts=DEFAULT_TTS,
             vad=vad,
             turn_detection="vad",
             max_tool_steps=5,
         )
+        # Per-turn latency histograms, labelled with this session's agent/field/language
+        bind_session(session)
+        session.on("metrics_collected", on_metrics_collected)
+
+        # Render fixed prompts missing from the phrase cache (once per worker, in background)
+        PHRASE_CACHE.schedule_warm(DEFAULT_TTS)
 
         logger.info(f"🎙️ Starting with agent: {agent_type}")
         await session.start(
@@ -104,9 +198,9 @@ async def entrypoint(ctx: JobContext):
     except Exception as e:
         logger.error(f"❌ Error in entrypoint: {e}", exc_info=True)
         raise
-    finally:
-        logger.info(f"🏁 Session ended for room: {ctx.room.name}")
 
 
 if __name__ == "__main__":
+    # One /metrics endpoint per worker, in this (parent) process
+    start_metrics_server()
     cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
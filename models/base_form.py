@@ -1,50 +1,169 @@
 #models/base_form.py
-from dataclasses import asdict
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from utils.gazetteer import LEVELS, load_gazetteer
+from .schema import FieldSpec, FormSchema, ReturningApplicant, compile_schema
+
+# Longest answer the fast path searches for a place name; longer turns go to the LLM
+PLACE_CAPTURE_WORDS = 4
+
+
+class _SchemaAttribute:
+    """Class-level attribute read from the compiled form schema."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        return getattr(compile_schema(objtype or type(obj)), self.name)
+
 
 class BaseFormData:
     """
     Abstract base class for all form dataclasses.
     Provides shared validation and serialization helpers.
+    Fields are declared with models.schema.form_field(); everything below
+    is derived from that metadata.
+
+    Subclasses are declared with @dataclass(slots=True). Every assignment to
+    a schema field (constructor, set_field or plain attribute) updates:
+      - a filled-fields bitmask, so completeness checks are a mask test;
+      - a form version and the version each field last changed at (diff_since);
+      - the dirty set (a second bitmask) since the last mark_synced().
+    A change between two empty values (None, "", False) is not recorded.
+
+    Values pre-filled by infer_from() are marked inferred (and unconfirmed
+    until the user confirms them), values reused by prefill() are marked
+    inferred and confirmed. Any other assignment, e.g. the user
+    saying or typing the value, marks the field as spoken again.
     """
 
-    # ✅ List of required fields (child classes must override this)
-    required_fields: List[str] = []
+    __slots__ = ("_filled", "_version", "_changed", "_dirty", "_inferred", "_unconfirmed")
 
-    # ✅ Optional list of boolean flags (e.g. terms acceptance)
-    required_flags: List[str] = []
+    # ✅ Short form identifier ("contact", "felling"), used for agent_type and tool names
+    form_name: str = ""
+
+    # ✅ Per-language texts used by the generic form agent
+    form_title: Dict[str, str] = {}
+    intro: Dict[str, str] = {}
+    submitted_message: Dict[str, str] = {}
+
+    # ✅ Applicant details reused for returning applicants (None = not stored)
+    returning: Optional[ReturningApplicant] = None
+
+    # ✅ Required fields / boolean flags and question order (from field metadata)
+    required_fields = _SchemaAttribute()
+    required_flags = _SchemaAttribute()
+    field_order = _SchemaAttribute()
+
+    def __new__(cls, *args, **kwargs):
+        self = super().__new__(cls)
+        # Set before the dataclass __init__ assigns the fields
+        object.__setattr__(self, "_filled", 0)
+        object.__setattr__(self, "_version", 0)
+        object.__setattr__(self, "_changed", [0] * len(compile_schema(cls).field_order))
+        object.__setattr__(self, "_dirty", 0)
+        object.__setattr__(self, "_inferred", 0)
+        object.__setattr__(self, "_unconfirmed", 0)
+        return self
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        bit = compile_schema(type(self)).bits.get(name)
+        if bit is None:
+            object.__setattr__(self, name, value)
+            return
+
+        previous = getattr(self, name, None)
+        object.__setattr__(self, name, value)
+        if self._inferred & bit:
+            self._inferred &= ~bit
+            self._unconfirmed &= ~bit
+        if value == previous or not (value or previous):
+            return
+        if value:
+            self._filled |= bit
+        else:
+            self._filled &= ~bit
+        self._version += 1
+        self._changed[bit.bit_length() - 1] = self._version
+        self._dirty |= bit
+
+    @classmethod
+    def schema(cls) -> FormSchema:
+        """Compiled schema for this form class (built once per process)."""
+        return compile_schema(cls)
 
     def get_missing_fields(self) -> List[str]:
         """
-        Returns a list of missing required fields.
-        Required fields must be defined in child class.
+        Returns a list of missing required fields (then flags),
+        read from the filled-fields bitmask.
         """
-        missing = []
-        for field_name in self.required_fields:
-            value = getattr(self, field_name, None)
-            if not value:
-                missing.append(field_name)
+        schema = compile_schema(type(self))
+        missing = schema.required_mask & ~self._filled
+        if not missing:
+            return []
+        return [name for name, bit in schema.required_bits if missing & bit]
 
-        for flag in self.required_flags:
-            if not getattr(self, flag, False):
-                missing.append(flag)
+    def missing_count(self) -> int:
+        """Number of required fields and flags still missing."""
+        return (compile_schema(type(self)).required_mask & ~self._filled).bit_count()
+
+    def next_field(self, after: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the field the agent should ask for next:
+        the first unfilled field in `field_order` (after `after` if given),
+        falling back to any required field that is still missing.
+        """
+        schema = compile_schema(type(self))
+        unfilled = ~self._filled & ((1 << len(schema.field_order)) - 1)
+        after_bit = schema.bits.get(after)
+        if after_bit is not None:
+            unfilled &= -(after_bit << 1)  # only positions after `after`
+        if unfilled:
+            return schema.field_order[(unfilled & -unfilled).bit_length() - 1]
 
-        return missing
+        missing = self.get_missing_fields()
+        return missing[0] if missing else None
 
     def is_complete(self) -> bool:
         """Returns True if all required fields and flags are filled."""
-        return len(self.get_missing_fields()) == 0
+        required = compile_schema(type(self)).required_mask
+        return self._filled & required == required
 
     def to_dict(self) -> dict:
         """
         Convert form into a dictionary for serialization.
-        Uses dataclasses.asdict if available.
+        Shallow: values are not copied (files_uploaded is the form's own dict).
         """
-        try:
-            return asdict(self)  # works for dataclasses
-        except Exception:
-            # fallback: __dict__
-            return self.__dict__
+        return {name: getattr(self, name) for name in compile_schema(type(self)).all_fields}
+
+    # -----------------------------------------------------------------
+    # Change tracking
+    # -----------------------------------------------------------------
+
+    @property
+    def version(self) -> int:
+        """Incremented on every recorded field change."""
+        return self._version
+
+    def diff_since(self, version: int) -> Dict[str, Any]:
+        """Schema fields changed after `version`, with their current values."""
+        if version >= self._version:
+            return {}
+        order = compile_schema(type(self)).field_order
+        return {order[i]: getattr(self, order[i]) for i, changed in enumerate(self._changed) if changed > version}
+
+    @property
+    def dirty(self) -> Set[str]:
+        """Schema fields changed since the last mark_synced()."""
+        dirty = self._dirty
+        return {name for name, bit in compile_schema(type(self)).bits.items() if dirty & bit}
+
+    def mark_synced(self) -> Dict[str, Any]:
+        """Clear the dirty set. Returns the dirty fields with their current values."""
+        dirty = {name: getattr(self, name) for name in self.dirty}
+        self._dirty = 0
+        return dirty
 
     def update_field(self, field_name: str, value: Optional[str]) -> None:
         """
@@ -58,4 +177,250 @@ class BaseFormData:
         """
         Alias for update_field - used by data handler.
         """
-        self.update_field(field_name, value)
\ No newline at end of file
+        self.update_field(field_name, value)
+
+    # -----------------------------------------------------------------
+    # Bulk updates
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def fields_schema(cls) -> dict:
+        """
+        JSON schema (object) of every fillable field, in `field_order`.
+        Generated once per form class and used for the update_fields tool.
+        """
+        return compile_schema(cls).fields_schema
+
+    def _place_scope(self, spec: FieldSpec, pending: Dict[str, Any]) -> Tuple[Optional[str], ...]:
+        """Parent place values for a place field: pending updates first, then the form."""
+        return tuple(pending.get(parent) or getattr(self, parent, None) for parent in spec.place.parents)
+
+    def validate_updates(self, updates: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Validate a partial {field: value} mapping.
+        Returns (cleaned values, {field: error}) — nothing is applied here.
+
+        Place fields are snapped to the gazetteer name ("Mandiya" → "Mandya"),
+        outer levels first so a district in the same batch scopes its taluk.
+        Levels the gazetteer has no data for (villages) are kept as spoken.
+        """
+        specs = self.schema().by_name
+        cleaned: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+
+        def level_order(item) -> int:
+            spec = specs.get(item[0])
+            return -1 if spec is None or spec.place is None else LEVELS.index(spec.place.level)
+
+        for field_name, value in sorted(updates.items(), key=level_order):
+            spec = specs.get(field_name)
+            if spec is None:
+                errors[field_name] = "unknown field"
+                continue
+
+            if spec.type == "boolean":
+                if not isinstance(value, bool):
+                    errors[field_name] = "must be true or false"
+                    continue
+                cleaned[field_name] = value
+                continue
+
+            value = str(value).strip()
+            if spec.validator is not None:
+                checked = spec.validator(value)
+                if checked is None:
+                    errors[field_name] = f"invalid value '{value}'"
+                    continue
+                value = checked
+
+            if spec.place is not None and value:
+                gazetteer = load_gazetteer()
+                scope = self._place_scope(spec, cleaned)
+                if gazetteer is not None and gazetteer.known(spec.place.level, scope):
+                    place = gazetteer.match(spec.place.level, value, scope)
+                    if place is None:
+                        within = f" in {', '.join(p for p in scope if p)}" if any(scope) else ""
+                        errors[field_name] = f"'{value}' is not a known {spec.place.level}{within}"
+                        continue
+                    value = place.name
+            cleaned[field_name] = value
+
+        return cleaned, errors
+
+    def capture_value(self, field_name: str, transcript: str) -> Optional[str]:
+        """
+        Value for `field_name` parsed locally from a spoken answer, or None
+        (the LLM handles the turn). Place fields are looked up in the gazetteer.
+        """
+        spec = self.schema().by_name.get(field_name)
+        if spec is None:
+            return None
+        if spec.place is not None:
+            gazetteer = load_gazetteer()
+            scope = self._place_scope(spec, {})
+            if gazetteer is not None and gazetteer.known(spec.place.level, scope):
+                if len(transcript.split()) > PLACE_CAPTURE_WORDS:
+                    return None
+                place = gazetteer.find_in(spec.place.level, transcript, scope)
+                return place.name if place else None
+        return spec.capture(transcript) if spec.capture is not None else None
+
+    def apply_updates(self, updates: Dict[str, Any]) -> None:
+        """Apply already-validated updates in one step."""
+        for field_name, value in updates.items():
+            self.set_field(field_name, value)
+
+    # -----------------------------------------------------------------
+    # Inference
+    # -----------------------------------------------------------------
+
+    def infer_from(self, field_name: str) -> Dict[str, str]:
+        """
+        Pre-fill the fields derivable from `field_name` (district and taluk
+        from a pincode). Only empty or previously inferred fields are filled,
+        and nothing below a spoken value that disagrees. Returns what was filled.
+        """
+        schema = compile_schema(type(self))
+        spec = schema.by_name.get(field_name)
+        value = getattr(self, field_name, None)
+        if spec is None or spec.infers is None or not value:
+            return {}
+        gazetteer = load_gazetteer()
+        if gazetteer is None:
+            return {}
+
+        inferred: Dict[str, str] = {}
+        for target, place in zip(spec.infers.places, gazetteer.pincode(value)):
+            current = getattr(self, target)
+            if current and not self._inferred & schema.bits[target]:
+                if current != place.name:
+                    break  # the user said otherwise; don't infer inside it either
+                continue
+            inferred[target] = place.name
+
+        for target, place_name in inferred.items():
+            setattr(self, target, place_name)
+            self._inferred |= schema.bits[target]
+            self._unconfirmed |= schema.bits[target]
+        return inferred
+
+    def prefill(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fill empty fields with values the user accepted without saying them
+        (e.g. a returning applicant's stored details). Returns what was filled.
+        """
+        schema = compile_schema(type(self))
+        filled = {name: value for name, value in values.items() if name in schema.bits and value and not getattr(self, name)}
+        for name, value in filled.items():
+            setattr(self, name, value)
+            self._inferred |= schema.bits[name]
+        return filled
+
+    @property
+    def inferred(self) -> Set[str]:
+        """Fields whose current value was inferred or reused rather than given by the user."""
+        inferred = self._inferred
+        return {name for name, bit in compile_schema(type(self)).bits.items() if inferred & bit}
+
+    @property
+    def unconfirmed(self) -> List[str]:
+        """Inferred fields the user has not confirmed yet, in question order."""
+        unconfirmed = self._unconfirmed
+        return [name for name, bit in compile_schema(type(self)).bits.items() if unconfirmed & bit]
+
+    def confirm_inferred(self) -> List[str]:
+        """The user accepted the inferred values. Returns the confirmed fields."""
+        confirmed = self.unconfirmed
+        self._unconfirmed = 0
+        return confirmed
+
+    def reject_inferred(self) -> List[str]:
+        """The user rejected the inferred values: clear them to be asked. Returns the cleared fields."""
+        rejected = self.unconfirmed
+        for name in rejected:
+            setattr(self, name, None)
+        return rejected
+
+    def provenance(self) -> Dict[str, str]:
+        """"inferred" or "spoken" (said or typed by the user) for every filled schema field."""
+        schema = compile_schema(type(self))
+        filled, inferred = self._filled, self._inferred
+        return {
+            name: "inferred" if inferred & bit else "spoken"
+            for name, bit in schema.bits.items() if filled & bit
+        }
+
+# -------------------------------------------------------------------
+# Benchmark
+# -------------------------------------------------------------------
+
+def _legacy_class(form_cls: type) -> type:
+    """Plain (__dict__) dataclass with the same fields, i.e. the pre-slots form."""
+    from dataclasses import MISSING, field, fields, make_dataclass
+
+    declared = []
+    for f in fields(form_cls):
+        if f.default_factory is not MISSING:
+            declared.append((f.name, f.type, field(default_factory=f.default_factory)))
+        else:
+            declared.append((f.name, f.type, field(default=f.default)))
+    return make_dataclass(f"Legacy{form_cls.__name__}", declared)
+
+
+def _legacy_missing(form, schema: FormSchema) -> List[str]:
+    """The getattr scan get_missing_fields() used to do."""
+    missing = [name for name in schema.required_fields if not getattr(form, name, None)]
+    missing += [flag for flag in schema.required_flags if not getattr(form, flag, False)]
+    return missing
+
+
+def benchmark(form_cls: Optional[type] = None, rounds: int = 20000, sessions: int = 1000) -> Dict[str, Dict[str, float]]:
+    """µs per call of the per-turn form operations and bytes per form, slotted vs legacy."""
+    import timeit
+    import tracemalloc
+    from dataclasses import asdict
+
+    if form_cls is None:
+        from .felling_form import FellingFormData as form_cls
+
+    schema = form_cls.schema()
+    legacy_cls = _legacy_class(form_cls)
+    half = schema.field_order[: len(schema.field_order) // 2]
+    values = {name: "x" for name in half}
+    slotted, legacy = form_cls(**values), legacy_cls(**values)
+
+    def per_call(fn) -> float:
+        return round(timeit.timeit(fn, number=rounds) / rounds * 1e6, 3)
+
+    def per_form(cls) -> float:
+        tracemalloc.start()
+        forms = [cls(**values) for _ in range(sessions)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del forms
+        return round(size / sessions, 1)
+
+    return {
+        "slotted": {
+            "missing_us": per_call(slotted.get_missing_fields),
+            "is_complete_us": per_call(slotted.is_complete),
+            "next_field_us": per_call(slotted.next_field),
+            "to_dict_us": per_call(slotted.to_dict),
+            "set_field_us": per_call(lambda: slotted.set_field("pincode", "571105")),
+            "bytes_per_form": per_form(form_cls),
+        },
+        "legacy": {
+            "missing_us": per_call(lambda: _legacy_missing(legacy, schema)),
+            "is_complete_us": per_call(lambda: not _legacy_missing(legacy, schema)),
+            "next_field_us": per_call(lambda: next((n for n in schema.field_order if not getattr(legacy, n, None)), None)),
+            "to_dict_us": per_call(lambda: asdict(legacy)),
+            "set_field_us": per_call(lambda: setattr(legacy, "pincode", "571105")),
+            "bytes_per_form": per_form(legacy_cls),
+        },
+    }
+
+
+if __name__ == "__main__":
+    # python -m models.base_form
+    for path, row in benchmark().items():
+        print(f"{path:<8} " + "   ".join(f"{key} {value}" for key, value in row.items()))
@@ -1,16 +1,63 @@
 from dataclasses import dataclass
+from functools import partial
 from typing import Optional
+
+from utils.normalizers import parse_digits
 from .base_form import BaseFormData
+from .schema import DIGITS, LONG_TEXT, NAME, form_field
 
 
-@dataclass
+@dataclass(slots=True)
 class ContactFormData(BaseFormData):
     """Data structure for the Contact Form fields"""
 
-    company: Optional[str] = None
-    subject: Optional[str] = None
-    message: Optional[str] = None
-    phone: Optional[str] = None
+    form_name = "contact"
+    form_title = {
+        "english": "Karnataka Government Contact Form",
+        "kannada": "ಕರ್ನಾಟಕ ಸರ್ಕಾರದ ಸಂಪರ್ಕ ಫಾರ್ಮ್",
+    }
+    intro = {
+        "english": "Hello! I'll help you fill out the contact form.",
+        "kannada": "ನಮಸ್ಕಾರ! ಸಂಪರ್ಕ ಫಾರ್ಮ್ ಭರ್ತಿ ಮಾಡಲು ನಾನು ಸಹಾಯ ಮಾಡುತ್ತೇನೆ.",
+    }
+    submitted_message = {
+        "english": "Thank you! Your message has been submitted successfully.",
+        "kannada": "ಧನ್ಯವಾದಗಳು! ನಿಮ್ಮ ಸಂದೇಶ ಯಶಸ್ವಿಯಾಗಿ ಸಲ್ಲಿಸಲಾಗಿದೆ.",
+    }
 
-    # ✅ Required fields
-    required_fields = ["company", "subject", "message", "phone"]
\ No newline at end of file
+    # ✅ All fields are required, asked in declaration order
+    company: Optional[str] = form_field(
+        required=True,
+        description="The user's organization or department name",
+        label={"kannada": "ಸಂಸ್ಥೆ/ಇಲಾಖೆ"},
+        prompt={
+            "english": "What's your organization or department name?",
+            "kannada": "ನಿಮ್ಮ ಸಂಸ್ಥೆ ಅಥವಾ ಇಲಾಖೆಯ ಹೆಸರು ಏನು?",
+        },
+        speech=NAME,
+    )
+    subject: Optional[str] = form_field(
+        required=True,
+        description="The subject of the inquiry",
+        label={"kannada": "ವಿಷಯ"},
+        prompt={"english": "What's the subject of your inquiry?", "kannada": "ವಿಷಯ ಏನು?"},
+        speech=NAME,
+    )
+    phone: Optional[str] = form_field(
+        required=True,
+        description="The customer's phone number",
+        label={"kannada": "ಫೋನ್ ಸಂಖ್ಯೆ"},
+        prompt={"english": "What's your phone number?", "kannada": "ನಿಮ್ಮ ಫೋನ್ ಸಂಖ್ಯೆ ಏನು?"},
+        capture=partial(parse_digits, min_length=6),
+        speech=DIGITS,
+    )
+    message: Optional[str] = form_field(
+        required=True,
+        description="The user's message or inquiry details",
+        label={"kannada": "ಸಂದೇಶ"},
+        prompt={
+            "english": "Please tell me your message or inquiry details.",
+            "kannada": "ದಯವಿಟ್ಟು ನಿಮ್ಮ ಸಂದೇಶವನ್ನು ಹೇಳಿ.",
+        },
+        speech=LONG_TEXT,
+    )
@@ -1,90 +1,316 @@
 from dataclasses import dataclass, field
+from functools import partial
 from typing import Optional
+
+from utils.normalizers import parse_digits, parse_email, parse_number, parse_yes_no
 from .base_form import BaseFormData
+from .schema import DIGITS, LONG_TEXT, NAME, SHORT_ANSWER, YES_NO, PincodeLookup, PlaceLookup, ReturningApplicant, form_field
 
 
-@dataclass
+@dataclass(slots=True)
 class FellingFormData(BaseFormData):
     """
     Data structure for Tree Felling Permission Form.
     Matches the frontend TreeFellingFormData interface.
+    Fields are asked in declaration order. The mobile number opens the
+    applicant section (a returning applicant's details are offered from it),
+    and the pincode comes before the district and taluk inferred from it.
     """
 
+    form_name = "felling"
+    form_title = {
+        "english": "Karnataka Forest Department Tree Felling Permission form",
+        "kannada": "ಕರ್ನಾಟಕ ಅರಣ್ಯ ಇಲಾಖೆಯ ಮರ ಕಡಿಯುವ ಅನುಮತಿ ಫಾರ್ಮ್",
+    }
+    intro = {
+        "english": "Hello! I'll help you with the Tree Felling Permission form.",
+        "kannada": "ನಮಸ್ಕಾರ! ವೃಕ್ಷ ಕಡಿಯುವ ಅನುಮತಿ ಫಾರ್ಮ್‌ಗಾಗಿ ನಿಮಗೆ ಸಹಾಯ ಮಾಡುತ್ತೇನೆ.",
+    }
+    submitted_message = {
+        "english": "Thank you! Your tree felling permission form has been submitted successfully.",
+        "kannada": "ಧನ್ಯವಾದಗಳು! ನಿಮ್ಮ ವೃಕ್ಷ ಕಡಿಯುವ ಅನುಮತಿ ಫಾರ್ಮ್ ಯಶಸ್ವಿಯಾಗಿ ಸಲ್ಲಿಸಲಾಗಿದೆ.",
+    }
+    returning = ReturningApplicant(
+        key="mobile_number",
+        fields=(
+            "applicant_type", "applicant_name", "father_name", "address",
+            "pincode", "applicant_district", "applicant_taluk", "email_id",
+        ),
+        name="applicant_name",
+    )
+
     # Section 1: Location details
-    in_area_type: Optional[str] = None
-    district: Optional[str] = None
-    taluk: Optional[str] = None
-    village: Optional[str] = None
-    khata_number: Optional[str] = None
-    survey_number: Optional[str] = None
-    total_extent_acres: Optional[str] = None
-    guntas: Optional[str] = None
-    anna: Optional[str] = None
+    in_area_type: Optional[str] = form_field(
+        section=1, required=True,
+        description="Type of area",
+        label={"kannada": "ಪ್ರದೇಶದ ಪ್ರಕಾರ"},
+        prompt={
+            "english": "Please tell me the type of area (e.g., forest, private land, revenue land).",
+            "kannada": "ದಯವಿಟ್ಟು ಸ್ಥಳದ ಪ್ರಕಾರವನ್ನು ಹೇಳಿ (ಉದಾ: ಅರಣ್ಯ, ಖಾಸಗಿ ಭೂಮಿ, ಆದಾಯ ಭೂಮಿ).",
+        },
+        speech=SHORT_ANSWER,
+    )
+    district: Optional[str] = form_field(
+        section=1, required=True,
+        description="District name",
+        label={"kannada": "ಜಿಲ್ಲೆ"},
+        prompt={"english": "Which district is the land located in?", "kannada": "ನಿಮ್ಮ ಜಿಲ್ಲೆ ಯಾವುದು?"},
+        speech=NAME,
+        place=PlaceLookup("district"),
+    )
+    taluk: Optional[str] = form_field(
+        section=1, required=True,
+        description="Taluk name",
+        label={"kannada": "ತಾಲೂಕು"},
+        prompt={"english": "Which taluk?", "kannada": "ನಿಮ್ಮ ತಾಲೂಕು ಯಾವುದು?"},
+        speech=NAME,
+        place=PlaceLookup("taluk", ("district",)),
+    )
+    village: Optional[str] = form_field(
+        section=1, required=True,
+        description="Village name",
+        label={"kannada": "ಗ್ರಾಮ"},
+        prompt={"english": "What is the village name?", "kannada": "ನಿಮ್ಮ ಗ್ರಾಮದ ಹೆಸರು ಏನು?"},
+        speech=NAME,
+        place=PlaceLookup("village", ("district", "taluk")),
+    )
+    khata_number: Optional[str] = form_field(
+        section=1, required=True,
+        description="Khata number, must be numeric only",
+        label={"kannada": "ಖಾತೆ ಸಂಖ್ಯೆ"},
+        prompt={"english": "What is the Khata number?", "kannada": "ಖಾತೆ ಸಂಖ್ಯೆ ಏನು?"},
+        validator=parse_digits,
+        capture=parse_digits,
+        error={
+            "english": "Please enter a valid numeric Khata number (e.g., 12345).",
+            "kannada": "ದಯವಿಟ್ಟು ಅಂಕೆಗಳಲ್ಲೇ ಖಾತಾ ಸಂಖ್ಯೆ ನಮೂದಿಸಿ (ಉದಾ: 12345).",
+        },
+        speech=DIGITS,
+    )
+    survey_number: Optional[str] = form_field(
+        section=1, required=True,
+        description="Survey number",
+        label={"kannada": "ಸರ್ವೇ ಸಂಖ್ಯೆ"},
+        prompt={"english": "What is the survey number?", "kannada": "ಸರ್ವೇ ಸಂಖ್ಯೆ ಏನು?"},
+        speech=DIGITS,
+    )
+    total_extent_acres: Optional[str] = form_field(
+        section=1, required=True,
+        description="Total extent in acres",
+        label={"kannada": "ಒಟ್ಟು ಎಕರೆ"},
+        prompt={"english": "What is the total extent in acres?", "kannada": "ಒಟ್ಟು ಎಕರೆ ಎಷ್ಟು?"},
+        speech=DIGITS,
+    )
+    guntas: Optional[str] = form_field(
+        section=1, required=True,
+        description="Extent in guntas",
+        label={"kannada": "ಗುಂಟೆ"},
+        prompt={"english": "How many guntas?", "kannada": "ಗುಂಟೆ ಎಷ್ಟು?"},
+        capture=parse_number,
+        speech=DIGITS,
+    )
+    anna: Optional[str] = form_field(
+        section=1, required=True,
+        description="Extent in anna",
+        label={"kannada": "ಅಣ್ಣಾ"},
+        prompt={"english": "How many annas?", "kannada": "ಅಣ್ಣಾ ಎಷ್ಟು?"},
+        capture=parse_number,
+        speech=DIGITS,
+    )
 
     # Section 2: Applicant details
-    applicant_type: Optional[str] = None
-    applicant_name: Optional[str] = None
-    father_name: Optional[str] = None
-    address: Optional[str] = None
-    applicant_district: Optional[str] = None
-    applicant_taluk: Optional[str] = None
-    pincode: Optional[str] = None
-    mobile_number: Optional[str] = None
-    email_id: Optional[str] = None
+    mobile_number: Optional[str] = form_field(
+        section=2, required=True,
+        description="Mobile number",
+        label={"kannada": "ಮೊಬೈಲ್ ಸಂಖ್ಯೆ"},
+        prompt={"english": "What is your mobile number?", "kannada": "ನಿಮ್ಮ ಮೊಬೈಲ್ ಸಂಖ್ಯೆ ಏನು?"},
+        validator=partial(parse_digits, length=10),
+        capture=partial(parse_digits, length=10),
+        error={
+            "english": "Please provide a valid 10-digit mobile number.",
+            "kannada": "ದಯವಿಟ್ಟು ಮಾನ್ಯವಾದ 10 ಅಂಕಿಗಳ ಮೊಬೈಲ್ ಸಂಖ್ಯೆ ಹೇಳಿ.",
+        },
+        speech=DIGITS,
+    )
+    applicant_type: Optional[str] = form_field(
+        section=2, required=True,
+        description="Applicant type",
+        label={"kannada": "ಅರ್ಜಿದಾರರ ಪ್ರಕಾರ"},
+        prompt={
+            "english": "What is the applicant type (e.g., individual, institution)?",
+            "kannada": "ಅರ್ಜಿದಾರರ ಪ್ರಕಾರ ಏನು?",
+        },
+        speech=SHORT_ANSWER,
+    )
+    applicant_name: Optional[str] = form_field(
+        section=2, required=True,
+        description="Applicant name",
+        label={"kannada": "ಅರ್ಜಿದಾರರ ಹೆಸರು"},
+        prompt={"english": "What is your full name?", "kannada": "ನಿಮ್ಮ ಪೂರ್ಣ ಹೆಸರು ಏನು?"},
+        speech=NAME,
+    )
+    father_name: Optional[str] = form_field(
+        section=2, required=True,
+        description="Father's name",
+        label={"kannada": "ತಂದೆಯ ಹೆಸರು"},
+        prompt={"english": "What is your father's name?", "kannada": "ನಿಮ್ಮ ತಂದೆಯ ಹೆಸರು ಏನು?"},
+        speech=NAME,
+    )
+    address: Optional[str] = form_field(
+        section=2, required=True,
+        description="Applicant address",
+        label={"kannada": "ವಿಳಾಸ"},
+        prompt={"english": "What is your address?", "kannada": "ನಿಮ್ಮ ವಿಳಾಸ ಏನು?"},
+        speech=LONG_TEXT,
+    )
+    pincode: Optional[str] = form_field(
+        section=2, required=True,
+        description="Pincode",
+        label={"kannada": "ಪಿನ್ ಕೋಡ್"},
+        prompt={"english": "What is your pincode?", "kannada": "ಪಿನ್‌ ಕೋಡ್ ಏನು?"},
+        validator=partial(parse_digits, length=6),
+        capture=partial(parse_digits, length=6),
+        error={
+            "english": "Please provide a valid 6-digit pincode.",
+            "kannada": "ದಯವಿಟ್ಟು ಮಾನ್ಯವಾದ 6 ಅಂಕಿಗಳ ಪಿನ್ ಕೋಡ್ ಹೇಳಿ.",
+        },
+        speech=DIGITS,
+        infers=PincodeLookup(("applicant_district", "applicant_taluk")),
+    )
+    applicant_district: Optional[str] = form_field(
+        section=2, required=True,
+        description="Applicant district",
+        label={"kannada": "ಅರ್ಜಿದಾರರ ಜಿಲ್ಲೆ"},
+        prompt={"english": "Which is your applicant district?", "kannada": "ಅರ್ಜಿದಾರರ ಜಿಲ್ಲೆ ಯಾವುದು?"},
+        speech=NAME,
+        place=PlaceLookup("district"),
+    )
+    applicant_taluk: Optional[str] = form_field(
+        section=2, required=True,
+        description="Applicant taluk",
+        label={"kannada": "ಅರ್ಜಿದಾರರ ತಾಲೂಕು"},
+        prompt={"english": "Which is your applicant taluk?", "kannada": "ಅರ್ಜಿದಾರರ ತಾಲೂಕು ಯಾವುದು?"},
+        speech=NAME,
+        place=PlaceLookup("taluk", ("applicant_district",)),
+    )
+    email_id: Optional[str] = form_field(
+        section=2,
+        description="Email ID provided by the user",
+        label={"kannada": "ಇಮೇಲ್ ಐಡಿ"},
+        prompt={"english": "What is your email ID?", "kannada": "ನಿಮ್ಮ ಇಮೇಲ್ ಐಡಿ ಏನು?"},
+        validator=parse_email,
+        capture=parse_email,
+        error={
+            "english": "Please provide a valid email address.",
+            "kannada": "ದಯವಿಟ್ಟು ಮಾನ್ಯವಾದ ಇಮೇಲ್ ವಿಳಾಸವನ್ನು ನಮೂದಿಸಿ.",
+        },
+    )
 
     # Section 3: Tree details
-    tree_species: Optional[str] = None
-    tree_age: Optional[str] = None
-    tree_girth: Optional[str] = None
+    tree_species: Optional[str] = form_field(
+        section=3, required=True,
+        description="Tree species",
+        label={"kannada": "ಮರದ ಪ್ರಭೇದ"},
+        prompt={"english": "What tree species do you want to fell?", "kannada": "ಯಾವ ಮರವನ್ನು ಕಡಿಯಲು ಬಯಸುತ್ತೀರಿ?"},
+        speech=NAME,
+    )
+    tree_age: Optional[str] = form_field(
+        section=3, required=True,
+        description="Tree age in years",
+        label={"kannada": "ಮರದ ವಯಸ್ಸು"},
+        prompt={"english": "What is the age of the tree?", "kannada": "ಮರದ ವಯಸ್ಸು ಎಷ್ಟು?"},
+        speech=DIGITS,
+    )
+    tree_girth: Optional[str] = form_field(
+        section=3, required=True,
+        description="Tree girth",
+        label={"kannada": "ಮರದ ಸುತ್ತಳತೆ"},
+        prompt={"english": "What is the girth of the tree in cm?", "kannada": "ಮರದ ಸುತ್ತಳತೆ ಎಷ್ಟು ಸೆಂ.ಮೀ.?"},
+        speech=DIGITS,
+    )
 
     # Section 4: Site boundary details
-    east: Optional[str] = None
-    west: Optional[str] = None
-    north: Optional[str] = None
-    south: Optional[str] = None
+    east: Optional[str] = form_field(
+        section=4, required=True,
+        description="East boundary",
+        label={"kannada": "ಪೂರ್ವ ಗಡಿ"},
+        prompt={"english": "What is on the east boundary?", "kannada": "ಭೂಮಿಯ ಪೂರ್ವ ಗಡಿ ಏನು?"},
+        speech=LONG_TEXT,
+    )
+    west: Optional[str] = form_field(
+        section=4, required=True,
+        description="West boundary",
+        label={"kannada": "ಪಶ್ಚಿಮ ಗಡಿ"},
+        prompt={"english": "What is on the west boundary?", "kannada": "ಪಶ್ಚಿಮ ಗಡಿ ಏನು?"},
+        speech=LONG_TEXT,
+    )
+    north: Optional[str] = form_field(
+        section=4, required=True,
+        description="North boundary",
+        label={"kannada": "ಉತ್ತರ ಗಡಿ"},
+        prompt={"english": "What is on the north boundary?", "kannada": "ಉತ್ತರ ಗಡಿ ಏನು?"},
+        speech=LONG_TEXT,
+    )
+    south: Optional[str] = form_field(
+        section=4, required=True,
+        description="South boundary",
+        label={"kannada": "ದಕ್ಷಿಣ ಗಡಿ"},
+        prompt={"english": "What is on the south boundary?", "kannada": "ದಕ್ಷಿಣ ಗಡಿ ಏನು?"},
+        speech=LONG_TEXT,
+    )
 
     # Section 5: Other details
-    purpose_of_felling: Optional[str] = None
-    boundary_demarcated: Optional[str] = None
-    tree_reserved_to_gov: Optional[str] = None
-    unconditional_consent: Optional[str] = None
-    license_enclosed: Optional[str] = None
+    purpose_of_felling: Optional[str] = form_field(
+        section=5, required=True,
+        description="Purpose of felling",
+        label={"kannada": "ಕಡಿಯುವ ಉದ್ದೇಶ"},
+        prompt={"english": "What is the purpose of felling?", "kannada": "ಮರವನ್ನು ಕಡಿಯುವ ಉದ್ದೇಶ ಏನು?"},
+        speech=LONG_TEXT,
+    )
+    boundary_demarcated: Optional[str] = form_field(
+        section=5,
+        description="Boundary demarcated (Yes/No)",
+        label={"kannada": "ಗಡಿ ಗುರುತು ಮಾಡಿದ್ದೀರಾ"},
+        prompt={"english": "Is the boundary demarcated?", "kannada": "ಭೂಮಿಯ ಗಡಿ ಗುರುತು ಮಾಡಿದ್ದೀರಾ?"},
+        capture=parse_yes_no,
+        speech=YES_NO,
+    )
+    tree_reserved_to_gov: Optional[str] = form_field(
+        section=5,
+        description="Tree reserved to govt? (Yes/No)",
+        label={"kannada": "ಮರ ಸರ್ಕಾರಕ್ಕೆ ಮೀಸಲಾಗಿದೆಯೇ"},
+        prompt={"english": "Is the tree reserved to government?", "kannada": "ಮರ ಸರ್ಕಾರಕ್ಕೆ ಮೀಸಲಾಗಿದೆಯೇ?"},
+        capture=parse_yes_no,
+        speech=YES_NO,
+    )
+    unconditional_consent: Optional[str] = form_field(
+        section=5,
+        description="Unconditional consent? (Yes/No)",
+        label={"kannada": "ನಿರ್ವಿಘ್ನ ಅನುಮತಿ"},
+        prompt={"english": "Is unconditional consent given?", "kannada": "ನಿರ್ವಿಘ್ನ ಅನುಮತಿ ಇದೆಯೇ?"},
+        capture=parse_yes_no,
+        speech=YES_NO,
+    )
+    license_enclosed: Optional[str] = form_field(
+        section=5,
+        description="License enclosed? (Yes/No)",
+        label={"kannada": "ಪರವಾನಗಿ ಲಗತ್ತಿಸಿದ್ದೀರಾ"},
+        prompt={"english": "Is license enclosed?", "kannada": "ಪರವಾನಗಿ ಲಗತ್ತಿಸಿದ್ದೀರಾ?"},
+        capture=parse_yes_no,
+        speech=YES_NO,
+    )
 
     # File uploads (only track status: uploaded / not uploaded)
     files_uploaded: dict[str, bool] = field(default_factory=dict)
 
     # Terms acceptance
-    agree_terms: bool = False
-
-    # -----------------------------------------------------------------
-    # Validation config (used by BaseFormData)
-    # -----------------------------------------------------------------
-    required_fields = [
-        "in_area_type",
-        "district",
-        "taluk",
-        "village",
-        "khata_number",
-        "survey_number",
-        "total_extent_acres",
-        "guntas",
-        "anna",
-        "applicant_type",
-        "applicant_name",
-        "father_name",
-        "address",
-        "applicant_district",
-        "applicant_taluk",
-        "pincode",
-        "mobile_number",
-        "tree_species",
-        "tree_age",
-        "tree_girth",
-        "east",
-        "west",
-        "north",
-        "south",
-        "purpose_of_felling",
-    ]
-
-    required_flags = ["agree_terms"]
\ No newline at end of file
+    agree_terms: bool = form_field(
+        section=5, required=True, default=False,
+        description="Agree to terms",
+        label={"kannada": "ನಿಯಮ/ಷರತ್ತುಗಳನ್ನು ಒಪ್ಪುತ್ತೀರಾ"},
+        prompt={
+            "english": "Do you agree to the terms and conditions?",
+            "kannada": "ನೀವು ನಿಯಮ ಮತ್ತು ಷರತ್ತುಗಳನ್ನು ಒಪ್ಪುತ್ತೀರಾ?",
+        },
+        speech=YES_NO,
+    )
@@ -0,0 +1,10 @@
+from .contact_form import ContactFormData
+from .felling_form import FellingFormData
+
+# Central registry of form models, keyed by form_name.
+# Adding a form = declaring its dataclass and registering it here;
+# a generic form agent is generated for it in agents/registry.py.
+FORM_REGISTRY = {
+    form_cls.form_name: form_cls
+    for form_cls in (ContactFormData, FellingFormData)
+}
@@ -0,0 +1,329 @@
+# models/schema.py
+"""
+Field metadata for form dataclasses.
+
+Form fields are declared with `form_field(...)`, which stores the field's
+description, bilingual prompt/label, validator, local capture parser,
+frontend key, speech profile and order in the dataclass field metadata.
+
+`compile_schema(FormClass)` turns that metadata into a FormSchema once per
+process. Agents, tool schemas, instructions, next-question sequencing and
+the inbound frontend mapping are all generated from it.
+
+Place fields (district / taluk / village) carry a PlaceLookup: their values
+are snapped to gazetteer names, scoped by the parent fields already filled.
+A pincode field carries a PincodeLookup naming the place fields its
+(district, taluk) pre-fills.
+
+Each schema field also gets a bit (its position in `field_order`), which
+BaseFormData uses to track filled fields as one integer.
+"""
+
+import os
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+FORM_METADATA_KEY = "form"
+
+Parser = Callable[[str], Optional[str]]
+
+
+# -------------------------------------------------------------------
+# Speech profiles
+# -------------------------------------------------------------------
+
+# VAD silence that ends a turn outside any profile (silero's default); main.py
+# loads the VAD with it, and each field's profile shortens or lengthens it
+SESSION_MIN_SILENCE = float(os.getenv("VAD_MIN_SILENCE", "0.55"))
+# Soniox max_endpoint_delay_ms outside any profile (plugin default)
+SESSION_ENDPOINT_DELAY_MS = 2000
+
+
+@dataclass(frozen=True)
+class SpeechProfile:
+    """
+    How to listen while a field is being asked. None = session default.
+
+    min_silence: VAD silence (seconds) that ends the user's turn; shorter than
+        SESSION_MIN_SILENCE for quick answers, longer where a pause is not the end
+        (names, free text).
+    endpoint_delay_ms: Soniox max_endpoint_delay_ms (500-3000), likewise around
+        SESSION_ENDPOINT_DELAY_MS.
+    language_hints: Soniox language hints, instead of the agent's language bundle.
+    phrases: Expected vocabulary; replaces the agent's STT context for this field.
+    """
+
+    min_silence: Optional[float] = None
+    endpoint_delay_ms: Optional[int] = None
+    language_hints: Tuple[str, ...] = ()
+    phrases: Tuple[str, ...] = ()
+
+    def silence(self, baseline: float = SESSION_MIN_SILENCE) -> float:
+        """VAD silence while this profile is active (`baseline` if it sets none)."""
+        return baseline if self.min_silence is None else self.min_silence
+
+    def endpoint_delay(self, baseline: int = SESSION_ENDPOINT_DELAY_MS) -> int:
+        """Soniox endpoint delay while this profile is active (`baseline` if it sets none)."""
+        return baseline if self.endpoint_delay_ms is None else self.endpoint_delay_ms
+
+
+# Single-word and single-choice answers
+SHORT_ANSWER = SpeechProfile(min_silence=0.5, endpoint_delay_ms=800)
+# Yes/no questions
+YES_NO = SpeechProfile(
+    min_silence=0.4,
+    endpoint_delay_ms=700,
+    phrases=("yes", "no", "ಹೌದು", "ಇಲ್ಲ", "ಸರಿ", "ಬೇಡ"),
+)
+# Numbers: pincode, mobile, khata/survey numbers, extents (pauses between digit groups)
+DIGITS = SpeechProfile(
+    min_silence=0.6,
+    endpoint_delay_ms=1000,
+    phrases=(
+        "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+        "double", "triple", "hundred", "thousand", "point", "slash", "hyphen",
+        "ಸೊನ್ನೆ", "ಒಂದು", "ಎರಡು", "ಮೂರು", "ನಾಲ್ಕು", "ಐದು", "ಆರು", "ಏಳು", "ಎಂಟು", "ಒಂಬತ್ತು",
+    ),
+)
+# Names and places: a pause between first and last name must not end the turn
+NAME = SpeechProfile(min_silence=0.8, endpoint_delay_ms=1500)
+# Addresses, purpose of felling and other free text
+LONG_TEXT = SpeechProfile(min_silence=1.4, endpoint_delay_ms=3000)
+
+
+# -------------------------------------------------------------------
+# Place lookups
+# -------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class PlaceLookup:
+    """
+    Gazetteer level of a place field (utils.gazetteer.LEVELS).
+
+    parents: Fields holding the enclosing places, outermost first,
+    e.g. ("district", "taluk") for a village.
+    """
+
+    level: str
+    parents: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class PincodeLookup:
+    """
+    Place fields inferred from a pincode field, outermost first,
+    e.g. ("applicant_district", "applicant_taluk").
+    """
+
+    places: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ReturningApplicant:
+    """
+    Form-level: the fields stored per applicant and reused when the
+    applicant gives the same `key` again (utils/applicants.py).
+    `name` is the field read back when offering the stored details.
+    """
+
+    key: str
+    fields: Tuple[str, ...]
+    name: Optional[str] = None
+
+
+# -------------------------------------------------------------------
+# Field declaration
+# -------------------------------------------------------------------
+
+def form_field(
+    *,
+    description: str,
+    prompt: Dict[str, str],
+    label: Optional[Dict[str, str]] = None,
+    section: int = 1,
+    order: Optional[int] = None,
+    required: bool = False,
+    validator: Optional[Parser] = None,
+    capture: Optional[Parser] = None,
+    error: Optional[Dict[str, str]] = None,
+    frontend_key: Optional[str] = None,
+    speech: Optional[SpeechProfile] = None,
+    place: Optional[PlaceLookup] = None,
+    infers: Optional[PincodeLookup] = None,
+    default: Any = None,
+):
+    """
+    Declare a form field with its metadata.
+
+    Args:
+        description: Tool parameter description shown to the LLM.
+        prompt: Question asked for this field, per language ("english" / "kannada").
+        label: Short display name per language (english defaults to the field name).
+        section: Form section number, used to group fields in instructions.
+        order: Position in the question sequence (defaults to declaration order).
+        required: Whether the field must be filled before submission.
+        validator: Returns the cleaned value, or None if the value is invalid.
+        capture: Local parser for spoken answers (pre-LLM fast path).
+        error: Message per language when validation fails.
+        frontend_key: Key used by the React form (defaults to camelCase name).
+        speech: Endpointing / STT biasing while this field is asked.
+        place: Gazetteer lookup for district / taluk / village fields.
+        infers: Fields pre-filled from this field's value (asked only to confirm).
+    """
+    metadata = {
+        FORM_METADATA_KEY: {
+            "description": description,
+            "prompt": prompt,
+            "label": label or {},
+            "section": section,
+            "order": order,
+            "required": required,
+            "validator": validator,
+            "capture": capture,
+            "error": error or {},
+            "frontend_key": frontend_key,
+            "speech": speech,
+            "place": place,
+            "infers": infers,
+        }
+    }
+    return field(default=default, metadata=metadata)
+
+
+def to_camel_case(name: str) -> str:
+    head, *rest = name.split("_")
+    return head + "".join(part.capitalize() for part in rest)
+
+
+# -------------------------------------------------------------------
+# Compiled schema
+# -------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class FieldSpec:
+    name: str
+    type: str  # "string" | "boolean"
+    description: str
+    prompt: Dict[str, str]
+    label: Dict[str, str]
+    section: int
+    required: bool
+    frontend_key: str
+    validator: Optional[Parser] = None
+    capture: Optional[Parser] = None
+    error: Dict[str, str] = field(default_factory=dict)
+    speech: Optional[SpeechProfile] = None
+    place: Optional[PlaceLookup] = None
+    infers: Optional[PincodeLookup] = None
+
+    def prompt_for(self, language: Optional[str]) -> str:
+        return self.prompt.get(language or "english") or self.prompt["english"]
+
+    def label_for(self, language: Optional[str]) -> str:
+        return self.label.get(language or "english") or self.label.get("english") or self.name
+
+    def error_for(self, language: Optional[str]) -> str:
+        message = self.error.get(language or "english") or self.error.get("english")
+        if message:
+            return message
+        if language == "kannada":
+            return f"ದಯವಿಟ್ಟು ಮಾನ್ಯವಾದ {self.label_for(language)} ಹೇಳಿ."
+        return f"Please provide a valid {self.name.replace('_', ' ')}."
+
+    def tool_schema(self) -> dict:
+        """Raw function schema for this field's update_<name> tool."""
+        return {
+            "name": f"update_{self.name}",
+            "description": f"Save the {self.name.replace('_', ' ')} given by the user.",
+            "parameters": {
+                "type": "object",
+                "properties": {self.name: {"type": self.type, "description": self.description}},
+                "required": [self.name],
+                "additionalProperties": False,
+            },
+        }
+
+
+@dataclass(frozen=True)
+class FormSchema:
+    """Everything generated from one form dataclass. Built once per class."""
+
+    name: str
+    form_cls: type
+    fields: Tuple[FieldSpec, ...]
+    by_name: Dict[str, FieldSpec]
+    by_frontend_key: Dict[str, FieldSpec]
+    field_order: List[str]
+    required_fields: List[str]
+    required_flags: List[str]
+    fields_schema: dict
+    # Completeness tracking: field name → bit (1 << position in field_order)
+    bits: Dict[str, int]
+    # (name, bit) of required fields then flags, the get_missing_fields() order
+    required_bits: Tuple[Tuple[str, int], ...]
+    required_mask: int
+    # Every dataclass field (schema or not, e.g. files_uploaded), for to_dict()
+    all_fields: Tuple[str, ...]
+
+    def sections(self) -> Dict[int, List[FieldSpec]]:
+        grouped: Dict[int, List[FieldSpec]] = {}
+        for spec in self.fields:
+            grouped.setdefault(spec.section, []).append(spec)
+        return grouped
+
+
+@lru_cache(maxsize=None)
+def compile_schema(form_cls: type) -> FormSchema:
+    """Build the FormSchema for a form dataclass (cached per process)."""
+    declared = []
+    for index, f in enumerate(fields(form_cls)):
+        meta = f.metadata.get(FORM_METADATA_KEY)
+        if meta is None:
+            continue  # plain dataclass field, e.g. files_uploaded
+
+        is_bool = f.type in (bool, "bool")
+        spec = FieldSpec(
+            name=f.name,
+            type="boolean" if is_bool else "string",
+            description=meta["description"],
+            prompt=meta["prompt"],
+            label=meta["label"],
+            section=meta["section"],
+            required=meta["required"],
+            frontend_key=meta["frontend_key"] or to_camel_case(f.name),
+            validator=meta["validator"],
+            capture=meta["capture"],
+            error=meta["error"],
+            speech=meta.get("speech"),
+            place=meta.get("place"),
+            infers=meta.get("infers"),
+        )
+        position = meta["order"] if meta["order"] is not None else index
+        declared.append((position, index, spec))
+
+    specs = tuple(spec for _, _, spec in sorted(declared, key=lambda item: item[:2]))
+    bits = {spec.name: 1 << position for position, spec in enumerate(specs)}
+    required = [s.name for s in specs if s.required and s.type != "boolean"]
+    flags = [s.name for s in specs if s.required and s.type == "boolean"]
+    required_bits = tuple((name, bits[name]) for name in (*required, *flags))
+
+    return FormSchema(
+        name=getattr(form_cls, "form_name", form_cls.__name__),
+        form_cls=form_cls,
+        fields=specs,
+        by_name={spec.name: spec for spec in specs},
+        by_frontend_key={spec.frontend_key: spec for spec in specs},
+        field_order=[spec.name for spec in specs],
+        required_fields=required,
+        required_flags=flags,
+        fields_schema={
+            "type": "object",
+            "properties": {s.name: {"type": s.type, "description": s.description} for s in specs},
+            "additionalProperties": False,
+        },
+        bits=bits,
+        required_bits=required_bits,
+        required_mask=sum(bit for _, bit in required_bits),
+        all_fields=tuple(f.name for f in fields(form_cls)),
+    )
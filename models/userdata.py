@@ -1,11 +1,13 @@
 from dataclasses import dataclass, field
-from typing import Optional, Dict
+from typing import Dict, Optional, Mapping
 
 from livekit.agents import JobContext
 from livekit.agents.voice import Agent
 
+from .base_form import BaseFormData
 from .contact_form import ContactFormData
 from .felling_form import FellingFormData
+from .registry import FORM_REGISTRY
 
 
 @dataclass
@@ -25,6 +27,10 @@ class UserData:
     language_selected: bool = False
     awaiting_confirmation: bool = False
     should_submit: bool = False
+    # Field the active form agent asked last
+    current_field: Optional[str] = None
+    # Restored from the session store (utils/session_store.py) after a crash/reconnect
+    resumed: bool = False
 
     # ------------------------------------------------------------
     # Form-specific state
@@ -32,21 +38,37 @@ class UserData:
     contact_form: ContactFormData = field(default_factory=ContactFormData)
     felling_form: FellingFormData = field(default_factory=FellingFormData)
 
+    # Forms registered in FORM_REGISTRY without a dedicated attribute above
+    forms: Dict[str, BaseFormData] = field(default_factory=dict)
+
     # Track which form/service is active: "contact" | "felling" | "greeter"
     agent_type: Optional[str] = None
 
     # ------------------------------------------------------------
     # Agent navigation
     # ------------------------------------------------------------
-    agents: Dict[str, Agent] = field(default_factory=dict)
+    # Filled lazily per session by agents.registry.AgentProvider
+    agents: Mapping[str, Agent] = field(default_factory=dict)
     prev_agent: Optional[Agent] = None
     requested_route: Optional[str] = None
 
+    def get_form(self, name: Optional[str]) -> Optional[BaseFormData]:
+        """Get the form registered as `name`, creating it on first use"""
+        if name == "contact":
+            return self.contact_form
+        elif name == "felling":
+            return self.felling_form
+        elif name in FORM_REGISTRY:
+            if name not in self.forms:
+                self.forms[name] = FORM_REGISTRY[name]()
+            return self.forms[name]
+        return None
+
+    def all_forms(self) -> Dict[str, BaseFormData]:
+        """Every form instance of this session, by form name"""
+        return {"contact": self.contact_form, "felling": self.felling_form, **self.forms}
+
     @property
     def current_form(self):
         """Get the currently active form based on agent_type"""
-        if self.agent_type == "contact":
-            return self.contact_form
-        elif self.agent_type == "felling":
-            return self.felling_form
-        return None
\ No newline at end of file
+        return self.get_form(self.agent_type)
@@ -0,0 +1,72 @@
+import pytest
+from agents.registry import AgentPool
+
+
+class FakeAgent:
+    instances = 0
+
+    def __init__(self):
+        FakeAgent.instances += 1
+        self.reset_calls = 0
+
+    async def reset(self):
+        self.reset_calls += 1
+
+
+@pytest.fixture
+def pool():
+    FakeAgent.instances = 0
+    return AgentPool({"greeter": FakeAgent, "felling": FakeAgent}, max_idle_per_agent=1)
+
+
+# Test 1: Agents are only built when first looked up
+def test_provider_is_lazy(pool):
+    agents = pool.provider()
+    assert "felling" in agents
+    assert len(agents) == 2
+    assert FakeAgent.instances == 0
+
+    felling = agents["felling"]
+    assert agents["felling"] is felling
+    assert FakeAgent.instances == 1
+    assert agents.get_built("greeter") is None
+
+
+# Test 2: Released agents are reset and reused by the next session
+@pytest.mark.asyncio
+async def test_released_agents_are_reused(pool):
+    first = pool.provider()
+    agent = first["felling"]
+    await first.release()
+    assert agent.reset_calls == 1
+
+    second = pool.provider()
+    assert second["felling"] is agent
+    assert pool.created == 1
+    assert pool.reused == 1
+
+
+# Test 3: Pool keeps at most max_idle_per_agent instances
+@pytest.mark.asyncio
+async def test_pool_is_bounded(pool):
+    a, b = pool.provider(), pool.provider()
+    a["greeter"], b["greeter"]
+    await a.release()
+    await b.release()
+    assert len(pool._idle["greeter"]) == 1
+
+
+# Test 4: Unknown agent names raise KeyError like a dict
+def test_unknown_agent(pool):
+    with pytest.raises(KeyError):
+        pool.provider()["billing"]
+
+
+# Test 5: prewarm builds idle agents that the first session takes without building
+def test_prewarm_fills_the_pool(pool):
+    assert pool.prewarm() == 2
+    assert pool.prewarm() == 0  # already at max_idle_per_agent
+    agents = pool.provider()
+    agents["greeter"], agents["felling"]
+    assert FakeAgent.instances == 2
+    assert pool.created == 0 and pool.reused == 2
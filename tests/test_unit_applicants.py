@@ -0,0 +1,80 @@
+import asyncio
+import json
+import time
+
+from models.felling_form import FellingFormData
+from utils.applicants import ApplicantIndex, ApplicantProfiles, backfill
+
+APPLICANT = {
+    "mobile_number": "9876543210", "applicant_type": "individual", "applicant_name": "Ramesh Kumar",
+    "father_name": "Krishnappa", "address": "2nd Cross, Hunsur", "pincode": "571105",
+    "applicant_district": "Mysuru", "applicant_taluk": "Hunsur",
+}
+
+
+# Test 1: Upserts keep the newest applicant section per number and form
+def test_index_round_trip(tmp_path):
+    index = ApplicantIndex(str(tmp_path / "applicants.db"))
+    assert index.put_many([
+        ("felling", "9876543210", {"applicant_name": "Ramesh"}, 2.0),
+        ("felling", "9876543210", {"applicant_name": "Old"}, 1.0),  # older, ignored
+        ("felling", "not a number", {"applicant_name": "X"}, 1.0),
+    ]) == 2
+    assert index.get("felling", "9876543210") == {"applicant_name": "Ramesh"}
+    assert index.get("contact", "9876543210") is None
+    assert index.get("felling", "9000000000") is None
+    assert index.count() == 1
+
+
+# Test 2: A confirmed form is remembered, then offered and prefilled for the same number
+def test_remember_and_prefill(tmp_path):
+    async def _run():
+        profiles = ApplicantProfiles(str(tmp_path / "applicants.db"))
+        first = FellingFormData(**APPLICANT, survey_number="45")
+        profiles.remember("felling", first)  # write not awaited by the caller
+        await profiles.drain()
+        assert not profiles._writes
+        first.applicant_name = "Changed later"  # the stored copy was taken at confirmation
+
+        profile = await profiles.lookup("felling", "9876543210")
+        assert profile["applicant_name"] == "Ramesh Kumar"
+        assert "survey_number" not in profile and "mobile_number" not in profile
+        assert await profiles.lookup("felling", "9000000000") is None
+        assert profiles.stats() == {"lookups": 2, "hits": 1, "timeouts": 0, "stored": 1}
+        return profile
+
+    profile = asyncio.run(_run())
+    form = FellingFormData(mobile_number="9876543210", address="New address")
+    reused = form.prefill(profile)
+    assert "address" not in reused and form.address == "New address"
+    assert form.next_field(after="mobile_number") == "email_id"
+    assert form.provenance()["applicant_name"] == "inferred"
+    assert form.unconfirmed == []
+
+
+# Test 3: A slow lookup gives up instead of holding the turn
+def test_lookup_deadline(tmp_path):
+    class SlowProfiles(ApplicantProfiles):
+        def _get(self, form_name, key):
+            time.sleep(0.2)
+            return super()._get(form_name, key)
+
+    async def _run():
+        profiles = SlowProfiles(str(tmp_path / "applicants.db"), timeout=0.01)
+        assert await profiles.lookup("felling", "9876543210") is None
+        assert profiles.timeouts == 1
+
+    asyncio.run(_run())
+
+
+# Test 4: Backfill from the file sink output
+def test_backfill(tmp_path):
+    source = tmp_path / "submissions.jsonl"
+    lines = [
+        {"key": "a", "form": "felling", "session": "room-a", "values": APPLICANT, "created_at": 1.0},
+        {"key": "b", "form": "contact", "session": "room-b", "values": {"phone": "9876543210"}, "created_at": 2.0},
+    ]
+    source.write_text("".join(json.dumps(line) + "\n" for line in lines) + '{"torn', encoding="utf-8")
+    path = str(tmp_path / "applicants.db")
+    assert backfill(str(source), path) == 1
+    assert ApplicantIndex(path).get("felling", "9876543210")["pincode"] == "571105"
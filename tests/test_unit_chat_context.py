@@ -0,0 +1,76 @@
+from livekit.agents.llm import ChatContext, FunctionCall, FunctionCallOutput
+
+from agents.chat_context import FORM_STATE_MESSAGE_ID, INSTRUCTIONS_MESSAGE_ID, ContextCompactor
+
+
+def _exchange(chat_ctx: ChatContext, n: int) -> None:
+    """One form turn: user answer, tool call + output, assistant question."""
+    chat_ctx.add_message(role="user", content=f"answer {n:02d}")
+    chat_ctx.items.append(FunctionCall(call_id=f"call_{n:02d}", name="update_village", arguments=f'{{"village": "v{n:02d}"}}'))
+    chat_ctx.items.append(FunctionCallOutput(call_id=f"call_{n:02d}", name="update_village", output=f"question {n + 1:02d}", is_error=False))
+    chat_ctx.add_message(role="assistant", content=f"question {n + 1:02d}")
+
+
+def _session(turns: int) -> ChatContext:
+    chat_ctx = ChatContext.empty()
+    chat_ctx.add_message(id=INSTRUCTIONS_MESSAGE_ID, role="system", content="Fill the form.")
+    for n in range(turns):
+        _exchange(chat_ctx, n)
+    return chat_ctx
+
+
+# Test 1: Only the last N exchanges are kept, behind instructions and one state message
+def test_keeps_last_exchanges():
+    compacted = ContextCompactor(keep_exchanges=2, max_tokens=10_000).compact(_session(10), "state")
+
+    items = compacted.items
+    assert items[0].id == INSTRUCTIONS_MESSAGE_ID
+    assert items[1].id == FORM_STATE_MESSAGE_ID and items[1].text_content == "state"
+    assert [i.text_content for i in items if i.type == "message" and i.role == "user"] == ["answer 08", "answer 09"]
+    assert len(items) == 2 + 2 * 4
+
+
+# Test 2: The state message is replaced in place, never duplicated
+def test_state_message_replaced():
+    compactor = ContextCompactor(keep_exchanges=2, max_tokens=10_000)
+    chat_ctx = compactor.compact(_session(5), "old state")
+    _exchange(chat_ctx, 5)
+    chat_ctx = compactor.compact(chat_ctx, "new state")
+
+    states = [item for item in chat_ctx.items if item.id == FORM_STATE_MESSAGE_ID]
+    assert [s.text_content for s in states] == ["new state"]
+
+
+# Test 3: Token ceiling drops older exchanges but always keeps the newest one
+def test_token_ceiling():
+    compacted = ContextCompactor(keep_exchanges=5, max_tokens=1).compact(_session(10), "state")
+    users = [i.text_content for i in compacted.items if i.type == "message" and i.role == "user"]
+    assert users == ["answer 09"]
+
+
+# Test 4: Prompt size stays flat as the session grows
+def test_size_is_flat():
+    compactor = ContextCompactor(keep_exchanges=3, max_tokens=10_000)
+    short = compactor.total_tokens(compactor.compact(_session(5), "state"))
+    long = compactor.total_tokens(compactor.compact(_session(30), "state"))
+    assert short == long
+
+
+# Test 5: Identity and frontend-update messages survive compaction, ahead of the state
+def test_pinned_messages_survive():
+    from agents.chat_context import AGENT_IDENTITY_MESSAGE_ID, FRONTEND_UPDATE_MESSAGE_ID
+
+    chat_ctx = _session(1)
+    chat_ctx.add_message(id=AGENT_IDENTITY_MESSAGE_ID, role="system", content="You are felling agent.")
+    _exchange(chat_ctx, 1)
+    chat_ctx.add_message(id=FRONTEND_UPDATE_MESSAGE_ID, role="system", content="The user edited the form.")
+    for n in range(2, 10):
+        _exchange(chat_ctx, n)
+
+    compactor = ContextCompactor(keep_exchanges=2, max_tokens=10_000)
+    compacted = compactor.compact(compactor.compact(chat_ctx, "state"), "state")
+    ids = [item.id for item in compacted.items[:4]]
+    assert ids == [INSTRUCTIONS_MESSAGE_ID, AGENT_IDENTITY_MESSAGE_ID, FRONTEND_UPDATE_MESSAGE_ID, FORM_STATE_MESSAGE_ID]
+    assert [i.text_content for i in compacted.items if i.type == "message" and i.role == "user"] == ["answer 08", "answer 09"]
+    created = [item.created_at for item in compacted.items]
+    assert created[1:] == sorted(created[1:])
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from utils.codec import (
+    JSON_CODEC, WireCodec, available_encodings, decode_payload, field_table, hello_reply, negotiate, sample_messages,
+)
+
+
+def test_ids_round_trip_and_size():
+    messages = sample_messages()
+    codec = WireCodec("ids", compress=True)
+
+    for message in messages.values():
+        # Test 1: compact payloads decode back to the original message
+        payload = codec.encode(message)
+        assert decode_payload(payload) == message
+        # Test 2: smaller than the JSON path
+        assert len(payload) < len(JSON_CODEC.encode(message))
+
+    # Test 3: only snapshot-sized payloads are compressed
+    assert codec.encode(messages["delta"])[0] == 0x02
+    assert codec.encode(messages["snapshot"])[0] == 0x82
+
+
+def test_field_table_from_schema():
+    table = field_table("felling")
+    # Test 4: IDs are schema positions; unknown fields keep their name
+    assert table[0] == "in_area_type"
+    message = {"version": 1, "form": "felling", "delta": {"pincode": "571105", "extra": 1}}
+    compact = json.loads(WireCodec("ids").encode(message)[1:])
+    assert compact == {"v": 1, "f": "felling", "d": {str(table.index("pincode")): "571105", "extra": 1}}
+
+
+def test_legacy_json_and_negotiation():
+    # Test 5: legacy JSON packets still decode
+    assert decode_payload(b'{"field": "phone", "value": "1"}') == {"field": "phone", "value": "1"}
+    for lead in (b" ", b"\n", b"\t", b"\r\n"):
+        assert decode_payload(lead + b'{"type": "resync"}') == {"type": "resync"}
+    assert decode_payload(b"\n[1, 2]") == [1, 2]
+    with pytest.raises(ValueError):
+        decode_payload(b"\x05garbage")
+
+    # Test 6: best offered encoding wins, JSON without a match
+    assert negotiate({"encodings": ["ids", "json"], "zlib": True}).encoding == "ids"
+    assert negotiate({"encodings": ["ids"], "zlib": True}).compress
+    assert negotiate({"encodings": ["cbor"]}) is JSON_CODEC
+    assert negotiate({}) is JSON_CODEC
+
+    reply = hello_reply(WireCodec("ids"), forms=["contact"])
+    assert reply["encoding"] == "ids" and reply["fields"]["contact"][0] == "company"
+
+
+def test_msgpack_round_trip():
+    if "msgpack" not in available_encodings():
+        pytest.skip("msgpack not installed")
+    # Test 7: msgpack codec round trip
+    message = sample_messages()["snapshot"]
+    assert decode_payload(WireCodec("msgpack", compress=True).encode(message)) == message
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from agents.form_engine import build_instructions, form_tools
+from models.base_form import BaseFormData
+from models.contact_form import ContactFormData
+from models.felling_form import FellingFormData
+from models.schema import compile_schema, form_field
+
+
+@dataclass
+class FeedbackFormData(BaseFormData):
+    form_name = "feedback"
+    form_title = {"english": "Feedback Form"}
+
+    rating: Optional[str] = form_field(
+        required=True,
+        description="Rating from 1 to 5",
+        prompt={"english": "How would you rate us?"},
+    )
+    comments: Optional[str] = form_field(
+        description="Free-text comments",
+        prompt={"english": "Any comments?"},
+        order=-1,
+    )
+
+
+# Test 1: One update tool per field plus update_fields and confirm, built once
+def test_contact_tools_generated_from_schema():
+    names = [tool.info.name for tool in form_tools(ContactFormData)]
+    assert names == [
+        "update_company", "update_subject", "update_phone", "update_message",
+        "update_fields", "confirm_and_submit_contact_form",
+    ]
+    assert form_tools(ContactFormData) is form_tools(ContactFormData)
+
+
+# Test 2: Instructions list the fields section by section in both languages
+def test_felling_instructions_follow_sections():
+    instructions = build_instructions(FellingFormData)
+    assert "1. in_area_type → district → taluk → village" in instructions
+    assert "5. purpose_of_felling → boundary_demarcated" in instructions
+    assert "confirm_and_submit_felling_form()" in instructions
+    assert "ಜಿಲ್ಲೆ" in instructions
+
+
+# Test 3: A new form is just a model — order, required fields and frontend keys come from metadata
+def test_new_form_needs_only_a_model():
+    schema = compile_schema(FeedbackFormData)
+    assert schema.field_order == ["comments", "rating"]
+    assert FeedbackFormData.required_fields == ["rating"]
+    assert set(schema.by_frontend_key) == {"rating", "comments"}
+    assert [tool.info.name for tool in form_tools(FeedbackFormData)][-1] == "confirm_and_submit_feedback_form"
+
+    form = FeedbackFormData()
+    assert form.next_field() == "comments"
+    assert form.get_missing_fields() == ["rating"]
+
+
+# Test 4: Frontend camelCase keys map back to model fields
+def test_frontend_keys():
+    by_key = FellingFormData.schema().by_frontend_key
+    assert by_key["mobileNumber"].name == "mobile_number"
+    assert by_key["totalExtentAcres"].name == "total_extent_acres"
+
+
+# Test 5: Dynamic tool exposure sends the next fields' setters and update_fields, widening returns everything
+def test_tools_for_turn_window():
+    from agents.contact_agent import ContactFormAgent
+
+    agent = ContactFormAgent()
+    form = ContactFormData(company="Forest Dept")
+    names = [tool.info.name for tool in agent.tools_for_turn(form)]
+    assert names == [
+        "set_language", "to_greeter", "update_subject", "update_phone", "update_fields", "confirm_and_submit_contact_form",
+    ]
+
+    widened = agent.tools_for_turn(form, widen=True)
+    assert len(widened) == 2 + len(form_tools(ContactFormData))
+
+
+# Test 6: Per-language bundles only carry the selected language and are built once
+def test_language_bundles():
+    from agents.felling_agent import FellingFormAgent
+    from agents.form_engine import language_bundle
+
+    english = language_bundle(FellingFormAgent, "english")
+    kannada = language_bundle(FellingFormAgent, "kannada")
+    bilingual = language_bundle(FellingFormAgent)
+
+    assert "ಜಿಲ್ಲೆ" not in english.instructions
+    assert "ಜಿಲ್ಲೆ (district)" in kannada.instructions
+    assert english.language_hints == ("en",)
+    assert bilingual.language_hints == ("en", "kn")
+    assert bilingual.stt_context == f"{english.stt_context}\n\n{kannada.stt_context}"
+    assert language_bundle(FellingFormAgent, "english") is english
+
+
+# Test 7: Direct replies keep the output for the LLM context but request no follow-up
+def test_tool_reply_direct_mode():
+    from livekit.agents.llm import ToolResult
+
+    from agents.contact_agent import ContactFormAgent
+
+    agent = ContactFormAgent()
+    result = agent.tool_reply("Saved company. Next question: What's the subject of your inquiry?",
+                              speech="What's the subject of your inquiry?")
+    assert isinstance(result, ToolResult) and result.reply_required is False
+    assert agent._pending_reply == "What's the subject of your inquiry?"
+
+    agent.direct_reply = False
+    assert agent.tool_reply("What's your phone number?") == "What's your phone number?"
@@ -0,0 +1,104 @@
+import pytest
+from models.contact_form import ContactFormData
+from models.felling_form import FellingFormData
+
+
+@pytest.fixture
+def felling():
+    return FellingFormData()
+
+
+# Test 1: Forms are slotted (no per-instance __dict__)
+def test_forms_are_slotted(felling):
+    assert not hasattr(felling, "__dict__")
+    assert not hasattr(ContactFormData(), "__dict__")
+    with pytest.raises(AttributeError):
+        felling.not_a_field = "x"
+
+
+# Test 2: Missing-fields bitmask follows every kind of assignment
+def test_missing_mask_tracks_assignments(felling):
+    required = felling.required_fields + felling.required_flags
+    assert felling.get_missing_fields() == required
+    assert felling.missing_count() == len(required)
+
+    felling.in_area_type = "forest"
+    felling.set_field("district", "Mandya")
+    felling.apply_updates({"taluk": "Maddur"})
+    assert felling.get_missing_fields() == required[3:]
+
+    felling.district = ""  # cleared again
+    assert "district" in felling.get_missing_fields()
+    assert felling.next_field() == "district"
+    assert felling.next_field(after="district") == "village"
+
+    for name in required:
+        setattr(felling, name, True if name == "agree_terms" else "x")
+    assert felling.is_complete()
+    assert felling.get_missing_fields() == []
+
+
+# Test 3: Constructor values count as filled
+def test_constructor_values_are_tracked():
+    form = ContactFormData(company="ACME", subject="Lost ID", phone="9876543210", message="Help")
+    assert form.is_complete()
+    assert form.next_field() is None
+
+
+# Test 4: Versions, diff_since and the dirty set
+def test_diff_since_and_dirty(felling):
+    assert felling.version == 0
+    assert felling.dirty == set()
+
+    felling.pincode = "571105"
+    checkpoint = felling.version
+    felling.mobile_number = "9876543210"
+    felling.pincode = "571105"  # unchanged, not recorded
+    felling.email_id = None  # empty → empty, not recorded
+
+    assert felling.version == checkpoint + 1
+    assert felling.diff_since(checkpoint) == {"mobile_number": "9876543210"}
+    assert felling.diff_since(0) == {"pincode": "571105", "mobile_number": "9876543210"}
+    assert felling.diff_since(felling.version) == {}
+
+    assert felling.mark_synced() == {"pincode": "571105", "mobile_number": "9876543210"}
+    assert felling.dirty == set()
+    felling.pincode = None
+    assert felling.dirty == {"pincode"}
+
+
+# Test 5: to_dict is shallow and keeps non-schema fields
+def test_to_dict_shallow(felling):
+    felling.files_uploaded["khata"] = True
+    data = felling.to_dict()
+    assert list(data) == [name for name in FellingFormData.__dataclass_fields__]
+    assert data["files_uploaded"] is felling.files_uploaded
+    assert data["agree_terms"] is False
+
+
+# Test 6: A pincode pre-fills district and taluk, marked inferred until spoken or confirmed
+def test_pincode_inference_and_provenance(felling):
+    felling.pincode = "571105"
+    assert felling.infer_from("pincode") == {"applicant_district": "Mysuru", "applicant_taluk": "Hunsur"}
+    assert felling.next_field(after="pincode") == "email_id"
+    assert felling.unconfirmed == ["applicant_district", "applicant_taluk"]
+    assert felling.provenance() == {"pincode": "spoken", "applicant_district": "inferred", "applicant_taluk": "inferred"}
+
+    felling.applicant_taluk = "Piriyapatna"  # corrected by the user
+    assert felling.inferred == {"applicant_district"}
+    assert felling.confirm_inferred() == ["applicant_district"]
+    assert felling.unconfirmed == [] and felling.inferred == {"applicant_district"}
+
+    # A spoken value is never overwritten, nor anything below a disagreeing one
+    felling.pincode = "580020"  # Hubballi, Dharwad
+    assert felling.infer_from("pincode") == {"applicant_district": "Dharwad"}  # spoken taluk kept
+    felling.applicant_district = "Mandya"
+    felling.applicant_taluk = None
+    assert felling.infer_from("pincode") == {}
+
+    felling.pincode = "560001"  # city pincode: district only
+    felling.applicant_district = None
+    assert felling.infer_from("pincode") == {"applicant_district": "Bengaluru Urban"}
+    assert felling.reject_inferred() == ["applicant_district"]
+    assert felling.applicant_district is None
+    assert felling.infer_from("village") == {}
@@ -0,0 +1,158 @@
+from models.contact_form import ContactFormData
+from models.felling_form import FellingFormData
+
+
+# Test 1: Schema lists every field in question order
+def test_fields_schema_follows_field_order():
+    schema = FellingFormData.fields_schema()
+    assert list(schema["properties"]) == FellingFormData.field_order
+    assert schema["properties"]["agree_terms"]["type"] == "boolean"
+    assert schema["properties"]["pincode"]["type"] == "string"
+    assert FellingFormData.fields_schema() is schema  # built once per class
+
+
+# Test 2: Valid bulk update is cleaned and applied together
+def test_bulk_update_applies_all_fields():
+    form = FellingFormData()
+    cleaned, errors = form.validate_updates({"survey_number": "45", "total_extent_acres": 2, "pincode": "560 001"})
+    assert errors == {}
+    assert cleaned == {"survey_number": "45", "total_extent_acres": "2", "pincode": "560001"}
+
+    form.apply_updates(cleaned)
+    assert form.survey_number == "45"
+    assert form.pincode == "560001"
+
+
+# Test 3: Invalid or unknown fields are reported and nothing is cleaned for them
+def test_bulk_update_reports_errors():
+    form = FellingFormData()
+    cleaned, errors = form.validate_updates({"pincode": "12", "agree_terms": "yes", "favourite_colour": "red", "anna": "1"})
+    assert set(errors) == {"pincode", "agree_terms", "favourite_colour"}
+    assert cleaned == {"anna": "1"}
+
+
+# Test 4: Contact form schema only has its own fields
+def test_contact_schema():
+    assert list(ContactFormData.fields_schema()["properties"]) == ["company", "subject", "phone", "message"]
+
+
+# Test 5: The planner skips fields typed in the frontend and counts them
+def test_planner_skips_frontend_filled_fields():
+    from agents.contact_agent import ContactFormAgent
+
+    form = ContactFormData(company="Forest Dept", phone="9876543210")
+
+    class Agent(ContactFormAgent):
+        @property
+        def form(self):
+            return form
+
+    agent = Agent()
+    agent._frontend_filled.update({"phone"})
+    assert agent.plan_next_field() == "subject"
+    assert agent.questions_skipped == 0  # company was answered by voice
+
+    assert agent.plan_next_field(after="subject") == "message"
+    assert agent.questions_skipped == 1
+    assert agent._frontend_filled == set()
+
+
+class TurnAgent:
+    """Felling agent on a fake session: runs user turns through the pre-LLM stage."""
+
+    @staticmethod
+    def create(**values):
+        from types import SimpleNamespace
+
+        from agents.felling_agent import FellingFormAgent
+        from models.userdata import UserData
+
+        userdata = UserData(ctx=SimpleNamespace(room=None), agent_type="felling", preferred_language="english")
+        userdata.felling_form.apply_updates(values)
+        session = SimpleNamespace(userdata=userdata, stt=None, vad=None)
+
+        class Agent(FellingFormAgent):
+            @property
+            def session(self):
+                return session
+
+            def say(self, text, **kwargs):
+                self.said.append(text)
+
+            async def update_chat_ctx(self, chat_ctx):
+                pass
+
+            async def _expose_tools(self, widen=False):
+                self.widened = widen
+
+            async def _compact_chat_ctx(self, turn_ctx):
+                pass
+
+        agent = Agent()
+        agent.said = []
+        agent.widened = False
+        return agent
+
+
+def _turn(agent, text):
+    """Reply spoken without the LLM, or None if the turn went to the LLM."""
+    import asyncio
+
+    from livekit.agents.llm import ChatContext, ChatMessage, StopResponse
+
+    message = ChatMessage(role="user", content=[text])
+    try:
+        asyncio.run(agent.on_user_turn_completed(ChatContext.empty(), message))
+    except StopResponse:
+        return agent.said[-1]
+    return None
+
+
+# Test 6: "yes, that's correct" answers a yes/no field locally instead of being taken as a correction
+def test_yes_correct_answers_yes_no_field():
+    agent = TurnAgent.create()
+    agent._expected_field = "boundary_demarcated"
+    assert _turn(agent, "Yes, that's correct.") is not None
+    assert agent.form.boundary_demarcated == "Yes"
+    assert not agent.widened
+
+    # A real correction still goes to the LLM with every tool
+    agent._expected_field = "tree_reserved_to_gov"
+    assert _turn(agent, "sorry, the district was wrong") is None
+    assert agent.widened
+
+
+# Test 7: "yes, correct" to the inferred district and taluk read-back ("... Is that correct?") confirms them locally
+def test_yes_correct_confirms_inferred_place():
+    agent = TurnAgent.create()
+    agent._expected_field = "pincode"
+    prompt = _turn(agent, "571105")
+    assert prompt.endswith("Is that correct?")
+    assert agent._confirming == "pincode"
+
+    assert _turn(agent, "yes, correct") is not None
+    assert agent._confirming is None
+    assert agent.form.applicant_district == "Mysuru"
+    assert agent.form.applicant_taluk == "Hunsur"
+    assert not agent.widened
+
+
+# Test 8: "yes, that's correct" accepts a returning applicant's stored details
+def test_yes_correct_accepts_returning_offer(monkeypatch):
+    import agents.base_agent
+
+    class Profiles:
+        async def lookup(self, form_name, key):
+            return {"applicant_name": "Ramesh Kumar", "father_name": "Krishnappa"}
+
+    monkeypatch.setattr(agents.base_agent, "APPLICANTS", Profiles())
+    agent = TurnAgent.create()
+    agent._expected_field = "mobile_number"
+    assert "Welcome back, Ramesh Kumar" in _turn(agent, "9876543210")
+    assert agent._returning_offer is not None
+
+    assert _turn(agent, "yes, that's correct") is not None
+    assert agent._returning_offer is None
+    assert agent.form.applicant_name == "Ramesh Kumar"
+    assert agent.form.father_name == "Krishnappa"
+    assert not agent.widened
@@ -0,0 +1,244 @@
+import asyncio
+import json
+
+from utils.frontend import FrontendOutbox, close_frontend, flush_frontend, queue_to_frontend
+
+
+class FakeParticipant:
+    def __init__(self, fail=False):
+        self.packets = []
+        self.fail = fail
+
+    async def publish_data(self, payload, topic=None, reliable=False):
+        if self.fail:
+            raise RuntimeError("data channel closed")
+        self.packets.append((topic, json.loads(payload), reliable))
+
+
+class FakeRoom:
+    def __init__(self, fail=False):
+        self.local_participant = FakeParticipant(fail)
+
+
+def test_field_updates_are_coalesced():
+    async def _run():
+        room = FakeRoom()
+        outbox = FrontendOutbox(room, window=0.01)
+        outbox.put({"district": "Mysuru"})
+        outbox.put({"taluk": "Hunsur"})
+        outbox.put({"district": "Mandya"})
+        await outbox.flush()
+
+        # Test 1: one payload, last value wins
+        assert room.local_participant.packets == [
+            ("formUpdate", {"version": 1, "form": None, "delta": {"district": "Mandya", "taluk": "Hunsur"}}, False)
+        ]
+        assert outbox.stats()["coalesced"] == 2
+
+    asyncio.run(_run())
+
+
+def test_unchanged_values_are_suppressed():
+    async def _run():
+        room = FakeRoom()
+        outbox = FrontendOutbox(room, window=0.0)
+        outbox.put({"pincode": "570001"})
+        await outbox.flush()
+        outbox.put({"pincode": "570001", "village": "Bilikere"})
+        await outbox.flush()
+
+        # Test 2: the repeated pincode is not sent again
+        deltas = [data["delta"] for _, data, _ in room.local_participant.packets]
+        assert deltas == [{"pincode": "570001"}, {"village": "Bilikere"}]
+        assert outbox.stats()["suppressed"] == 1
+
+    asyncio.run(_run())
+
+
+def test_order_and_bound():
+    async def _run():
+        room = FakeRoom()
+        outbox = FrontendOutbox(room, window=0.01, max_pending=2)
+        outbox.put({"a": 1})
+        outbox.put({"route": "/x"}, topic="navigation")
+        outbox.put({"b": 2})  # not merged across the navigation message
+        await outbox.flush()
+
+        # Test 3: bounded queue drops the oldest unreliable payload, order is kept
+        assert [topic for topic, _, _ in room.local_participant.packets] == ["navigation", "formUpdate"]
+        assert outbox.stats()["dropped"] == 1
+
+    asyncio.run(_run())
+
+
+def test_queue_returns_immediately_and_failures_do_not_stall():
+    async def _run():
+        room = FakeRoom(fail=True)
+        # Test 4: enqueue is synchronous, publish errors are logged and skipped
+        assert queue_to_frontend(room, {"phone": "9876543210"}) is None
+        await flush_frontend(room)
+        stats = await close_frontend(room)
+        assert stats["published"] == 0 and stats["failed"] == 1
+        assert room.local_participant.packets == []
+
+        # A value that never went out is not treated as known by the frontend
+        outbox = FrontendOutbox(room, window=0.0)
+        outbox.put({"phone": "9876543210"})
+        await outbox.flush()
+        room.local_participant.fail = False
+        outbox.put({"phone": "9876543210"})
+        await outbox.flush()
+        assert [data["delta"] for _, data, _ in room.local_participant.packets] == [{"phone": "9876543210"}]
+        assert outbox.stats()["suppressed"] == 0
+
+    asyncio.run(_run())
+
+
+def test_versions_and_snapshot():
+    from models.contact_form import ContactFormData
+
+    async def _run():
+        room = FakeRoom()
+        form = ContactFormData(company="Forest Dept")
+        outbox = FrontendOutbox(room, window=0.01)
+        outbox.bind_form(lambda: form)
+        outbox.put({"company": "Forest Dept"})
+        await outbox.flush()
+        form.phone = "9876543210"
+        outbox.put({"phone": "9876543210"})
+        # Test 5: a resync request sends one reliable snapshot superseding queued deltas
+        outbox.request_snapshot()
+        await outbox.flush()
+
+        packets = room.local_participant.packets
+        assert [data["version"] for _, data, _ in packets] == [1, 2]
+        topic, snapshot, reliable = packets[-1]
+        assert reliable and snapshot["form"] == "contact"
+        assert snapshot["snapshot"]["phone"] == "9876543210"
+
+        # Test 6: values in the snapshot (or typed by the user) are not echoed back
+        outbox.mark_known({"subject": "Permit"})
+        outbox.put({"phone": "9876543210", "subject": "Permit"})
+        await outbox.flush()
+        assert len(packets) == 2
+
+    asyncio.run(_run())
+
+
+def test_data_handler_resync_and_reconnect():
+    from handlers.data_handler import register_data_handler
+    from models.userdata import UserData
+
+    class EventRoom(FakeRoom):
+        def __init__(self):
+            super().__init__()
+            self.handlers = {}
+
+        def on(self, event, handler):
+            self.handlers[event] = handler
+
+    async def _run():
+        room = EventRoom()
+        ctx = type("Ctx", (), {"room": room})()
+        userdata = UserData()
+        userdata.agent_type = "contact"
+        register_data_handler(ctx, userdata)
+
+        packet = type("Packet", (), {"data": json.dumps({"type": "resync", "version": 3}).encode()})()
+        # Test 7: resync message and participant reconnect both produce a snapshot
+        room.handlers["data_received"](packet)
+        await flush_frontend(room)
+        room.handlers["participant_connected"](type("P", (), {"identity": "web"})())
+        await flush_frontend(room)
+
+        snapshots = [data for _, data, _ in room.local_participant.packets if "snapshot" in data]
+        assert len(snapshots) == 2 and snapshots[0]["form"] == "contact"
+        await close_frontend(room)
+
+    asyncio.run(_run())
+
+
+def test_inbox_batches_debounces_and_clears():
+    from handlers.data_handler import FrontendInbox, inbound_index
+    from models.userdata import UserData
+
+    class Agent:
+        def __init__(self):
+            self.calls = []
+
+        async def on_frontend_update(self, changes):
+            self.calls.append(changes)
+
+    async def _run():
+        agent = Agent()
+        userdata = UserData()
+        userdata.agent_type = "felling"
+        userdata.agents = {"felling": agent}
+        inbox = FrontendInbox(userdata, delay=0.01)
+
+        # Test 8: precompiled index resolves names, frontend keys and field IDs
+        index = inbound_index("felling")
+        assert index["mobileNumber"].name == "mobile_number"
+        assert index["0"].name == "in_area_type"
+
+        # Test 9: keystroke flood → last writer wins, one apply, one notification
+        for partial in ("5", "57", "571", "5711", "57110", "571105"):
+            inbox.receive({"field": "pincode", "value": partial})
+        inbox.receive({"fields": {"mobileNumber": "9876543210", "village": "Bilikere"}})
+        await asyncio.sleep(0.05)
+        form = userdata.felling_form
+        assert (form.pincode, form.mobile_number, form.village) == ("571105", "9876543210", "Bilikere")
+        assert len(agent.calls) == 1
+
+        # Test 10: invalid values are rejected, empty values clear the field
+        inbox.receive({"updates": [{"field": "pincode", "value": "12"}, {"field": "village", "value": ""}]})
+        assert inbox.flush() == {"village": None}
+        assert form.pincode == "571105" and form.village is None
+        assert inbox.stats()["rejected"] == 1
+
+    asyncio.run(_run())
+
+
+def test_submit_trigger_is_awaited_on_close():
+    from utils.frontend import schedule_form_submit
+
+    async def _run():
+        room = FakeRoom()
+        queue_to_frontend(room, {"phone": "9876543210"})
+        task = schedule_form_submit(room, "sub-1")
+
+        # Test 11: closing the outbox waits for the trigger, sent after the queued fields
+        await close_frontend(room)
+        assert task.done()
+        assert [data for _, data, _ in room.local_participant.packets] == [
+            {"version": 1, "form": None, "delta": {"phone": "9876543210"}},
+            {"should_submit": True, "submission_id": "sub-1"},
+        ]
+
+    asyncio.run(_run())
+
+
+def test_failed_agent_notification_is_logged(caplog):
+    from handlers.data_handler import FrontendInbox
+    from models.userdata import UserData
+
+    class BrokenAgent:
+        async def on_frontend_update(self, changes):
+            raise RuntimeError("planner crashed")
+
+    async def _run():
+        userdata = UserData()
+        userdata.agent_type = "felling"
+        userdata.agents = {"felling": BrokenAgent()}
+        inbox = FrontendInbox(userdata)
+
+        # Test 12: the notification task is kept until done and its failure logged
+        inbox.receive({"field": "village", "value": "Bilikere"})
+        inbox.flush()
+        assert len(inbox._notifications) == 1
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert not inbox._notifications
+
+    asyncio.run(_run())
+    assert "planner crashed" in caplog.text
@@ -0,0 +1,83 @@
+import pytest
+from models.felling_form import FellingFormData
+from utils.gazetteer import Gazetteer, build_index, phonetic_key
+
+SOURCE = {
+    "districts": [
+        {
+            "name": "Mysuru", "kannada": "ಮೈಸೂರು", "aliases": ["Mysore"],
+            "taluks": [
+                {"name": "Hunsur", "kannada": "ಹುಣಸೂರು", "villages": [{"name": "Bilikere"}, {"name": "Hosahalli"}]},
+                "Nanjangud",
+            ],
+        },
+        {
+            "name": "Mandya", "kannada": "ಮಂಡ್ಯ",
+            "taluks": [{"name": "Maddur", "kannada": "ಮದ್ದೂರು", "villages": [{"name": "Hosahalli"}]}],
+        },
+    ],
+    "pincodes": {"571105": ["Mysore", "Hunsuru"], "571401": ["Mandya"], "560001": ["Bengaluru Urban"]},
+}
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    path = str(tmp_path / "test.idx")
+    build_index(SOURCE, path)
+    gazetteer = Gazetteer(path)
+    yield gazetteer
+    gazetteer.close()
+
+
+# Test 1: Both scripts and common respellings share a phonetic key
+@pytest.mark.parametrize("a, b", [
+    ("Mysuru", "ಮೈಸೂರು"),
+    ("Mandya", "ಮಂಡ್ಯ"),
+    ("Maddur", "ಮದ್ದೂರು"),
+    ("Mysuru", "mysooru"),
+])
+def test_phonetic_key_across_scripts(a, b):
+    assert phonetic_key(a) == phonetic_key(b)
+
+
+# Test 2: Misheard, Kannada and old names resolve to the canonical place
+@pytest.mark.parametrize("text", ["Mysuru", "Mysore", "ಮೈಸೂರು", "Maisuru"])
+def test_match_district(gazetteer, text):
+    place = gazetteer.match("district", text)
+    assert (place.level, place.name, place.kannada) == ("district", "Mysuru", "ಮೈಸೂರು")
+
+
+# Test 3: Lookups are scoped by the parent places
+def test_scoped_match(gazetteer):
+    assert gazetteer.match("taluk", "Hunsuru", ("Mysuru",)).name == "Hunsur"
+    assert gazetteer.match("taluk", "Hunsur", ("Mandya",)) is None
+    # Same village name in two taluks: ambiguous unless scoped
+    assert gazetteer.match("village", "Hosahalli") is None
+    assert gazetteer.match("village", "Hosahalli", ("Mandya", "Maddur")).id != \
+        gazetteer.match("village", "Hosahalli", ("Mysuru", "Hunsur")).id
+    assert gazetteer.find_in("village", "it is bilikere village", ("Mysuru", "Hunsur")).name == "Bilikere"
+    assert gazetteer.known("village", ("Mysuru", "Nanjangud")) is False
+
+
+# Test 4: Pincodes resolve to (district, taluk), or the district alone
+def test_pincode_lookup(gazetteer):
+    assert [(p.level, p.name) for p in gazetteer.pincode("571105")] == [("district", "Mysuru"), ("taluk", "Hunsur")]
+    assert [p.name for p in gazetteer.pincode("571401")] == ["Mandya"]
+    assert gazetteer.pincode("560001") == ()  # unknown district, skipped at build
+    assert gazetteer.pincode("57110") == ()
+
+
+# Test 5: Form validation snaps place fields, rejects unknown ones, passes villages through
+def test_form_place_fields():
+    form = FellingFormData()
+    cleaned, errors = form.validate_updates({"taluk": "ಮದ್ದೂರು", "district": "Mandiya", "village": "Bidarahalli"})
+    assert errors == {}
+    assert cleaned == {"district": "Mandya", "taluk": "Maddur", "village": "Bidarahalli"}
+
+    form.apply_updates({"district": "Mysuru"})
+    cleaned, errors = form.validate_updates({"taluk": "Maddur"})
+    assert cleaned == {} and errors == {"taluk": "'Maddur' is not a known taluk in Mysuru"}
+
+    assert form.capture_value("taluk", "hunsuru") == "Hunsur"
+    assert form.capture_value("district", "I live in the district called Mandya") is None  # LLM turn
+    assert form.capture_value("pincode", "five seven one one zero five") == "571105"
@@ -0,0 +1,51 @@
+import pytest
+
+from utils.intent import IntentClassifier, TRAINING_PHRASES, greeter_test_phrases, load_intent_classifier
+
+
+# Test 1: Confident service requests are routed locally in both languages
+@pytest.mark.parametrize("text, expected", [
+    ("I want to make a complaint about a department service", "contact"),
+    ("I need a tree cutting permission", "felling"),
+    ("ಮರ ಕಡಿಯಬೇಕು", "felling"),
+    ("ದೂರು ಕೊಡಬೇಕು", "contact"),
+])
+def test_confident_intents(text, expected):
+    assert load_intent_classifier().classify(text) == expected
+
+
+# Test 2: Ambiguous, off-topic or non-request turns are left to the LLM
+@pytest.mark.parametrize("text", [
+    "hello", "yes", "I want to cut the grass", "I want permission for my shop",
+    "what can you help me with", "Can you tell me the stock price of NVIDIA?",
+])
+def test_ambiguous_falls_back(text):
+    assert load_intent_classifier().classify(text) is None
+
+
+# Test 3: The shipped model file matches the training phrases and the live test phrases
+def test_model_file_and_benchmark_phrases():
+    trained = IntentClassifier.train(TRAINING_PHRASES)
+    shipped = load_intent_classifier()
+    assert shipped.vocabulary == trained.vocabulary
+
+    phrases = greeter_test_phrases()
+    assert {intent for _, intent in phrases} == {"contact", "felling", "unknown"}
+    assert all(shipped.classify(text) == (intent if intent != "unknown" else None) for text, intent in phrases)
+
+
+# Test 4: The benchmark corpus mentions every field of every form and is never misrouted
+def test_benchmark_corpus():
+    from models.registry import FORM_REGISTRY
+    from utils.intent import benchmark, benchmark_corpus
+
+    corpus = benchmark_corpus()
+    assert len(corpus) == len(set(corpus)) == 500 and benchmark_corpus() == corpus
+    for form_name, form_cls in FORM_REGISTRY.items():
+        texts = [text for text, intent in corpus if intent == form_name]
+        for name in form_cls.schema().field_order:
+            label = form_cls.schema().by_name[name].label.get("kannada")
+            assert any(name.replace("_", " ") in text or (label and label in text) for text in texts), name
+
+    results = benchmark(load_intent_classifier(), corpus, repeat=1)
+    assert results["misroute_rate"] == 0.0
@@ -0,0 +1,33 @@
+import pytest
+from utils.language import SAMPLES, clean_text, force_kannada_scripting, normalize_batch, normalize_text
+
+
+# Test 1: Whitespace is collapsed and trimmed
+@pytest.mark.parametrize("raw, expected", [
+    ("  Ramesh   Kumar\t", "Ramesh Kumar"),
+    ("ಮೈಸೂರು\n ಮಂಡ್ಯ", "ಮೈಸೂರು ಮಂಡ್ಯ"),
+    ("", ""),
+])
+def test_clean_text(raw, expected):
+    assert clean_text(raw) == expected
+
+
+# Test 2: English keeps ASCII only; text without Latin letters is not transliterated
+def test_normalize_scripts():
+    arabic, kannada, latin = SAMPLES
+    assert normalize_text(latin, "english") == "Aftaab Hussain"
+    assert normalize_text("Mysuru  ಮೈಸೂರು", "english") == "Mysuru "
+    assert normalize_text(kannada, "kannada") == kannada
+    assert force_kannada_scripting(f" {arabic} ") == arabic
+    assert normalize_text("  a  b ", "other") == "a b"
+
+
+# Test 3: Batches keep order and normalize each distinct text once
+def test_normalize_batch():
+    normalize_text.cache_clear()
+    texts = ["Mysuru", " Mysuru ", "Mysuru", "Ramesh  Kumar"]
+    assert normalize_batch(texts, "english") == ["Mysuru", "Mysuru", "Mysuru", "Ramesh Kumar"]
+    assert normalize_text.cache_info().misses == 3
+
+    normalize_batch(texts, "english")
+    assert normalize_text.cache_info().misses == 3
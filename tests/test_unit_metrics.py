@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+import urllib.request
+from types import SimpleNamespace
+
+from utils.metrics import LatencyHistograms, agent_fields, bind_session, collect, current_labels, start_metrics_server
+
+
+def test_histogram_buckets_and_render():
+    histograms = LatencyHistograms(buckets=(0.1, 0.5, 1.0))
+    histograms.observe("llm_ttft", 0.05, "FellingFormAgent", "pincode", "english")
+    histograms.observe("llm_ttft", 0.5, "FellingFormAgent", "pincode", "english")
+    histograms.observe("llm_ttft", 3.0, "FellingFormAgent", "pincode", "english")
+    histograms.observe("llm_ttft", -1, "FellingFormAgent", "pincode", "english")  # not measured
+
+    # Test 1: cumulative buckets, sum and count in Prometheus text format
+    text = histograms.render()
+    labels = 'stage="llm_ttft",agent="FellingFormAgent",field="pincode",language="english"'
+    assert "# TYPE voice_turn_stage_seconds histogram" in text
+    assert f'voice_turn_stage_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'voice_turn_stage_seconds_bucket{{{labels},le="0.5"}} 2' in text
+    assert f'voice_turn_stage_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+    assert f"voice_turn_stage_seconds_count{{{labels}}} 3" in text
+
+
+def test_preallocated_series():
+    from agents.registry import AGENT_REGISTRY
+
+    histograms = LatencyHistograms()
+    # Test 2: one series per stage × agent × (field or none) × language, nothing rendered yet
+    total = histograms.preallocate([("A", ["x", "y"])], languages=("", "english"))
+    assert total == 6 * 3 * 2
+    assert histograms.preallocate([("A", ["x", "y"])], languages=("", "english")) == total
+    assert "_bucket" not in histograms.render()
+
+    fields = dict(agent_fields(AGENT_REGISTRY.values()))
+    assert fields["GreeterAgent"] == []
+    assert "pincode" in fields["FellingFormAgent"]
+
+
+def test_labels_from_bound_session():
+    agent = SimpleNamespace(_turn_field=None, _expected_field="phone")
+    session = SimpleNamespace(current_agent=agent, userdata=SimpleNamespace(preferred_language="kannada"))
+
+    # Test 3: labels follow the active agent, asked field and language
+    bind_session(session)
+    assert current_labels() == ("SimpleNamespace", "phone", "kannada")
+    bind_session(None)
+    assert current_labels() == ("", "", "")
+
+
+def _finished_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_scrape_endpoint(tmp_path):
+    from utils.metrics import export_metrics
+
+    job = LatencyHistograms()
+    job.observe("tool_exec", 0.02, "ExportedAgent", "phone", "english")
+    export_metrics(str(tmp_path), job)
+    (tmp_path / f"{_finished_pid()}-1.json").write_text(json.dumps(job.snapshot()))  # a finished job process
+
+    # Test 4: snapshots of every job process are merged
+    labels = 'stage="tool_exec",agent="ExportedAgent",field="phone",language="english"'
+    assert f"voice_turn_stage_seconds_count{{{labels}}} 2" in collect(str(tmp_path)).render()
+
+    # Test 5: the worker's endpoint serves the merged histograms (its directory is cleared on start)
+    port = start_metrics_server(port=19464, directory=str(tmp_path))
+    assert port is not None
+    export_metrics(str(tmp_path), job)
+    body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+    assert f"voice_turn_stage_seconds_count{{{labels}}} 1" in body
+
+
+def test_finished_snapshots_are_folded(tmp_path):
+    from utils.metrics import CUMULATIVE_FILE, export_metrics, fold_finished
+
+    job = LatencyHistograms()
+    job.observe("tool_exec", 0.02, "FoldedAgent", "phone", "english")
+    live = os.path.basename(export_metrics(str(tmp_path), job))
+    for n in range(3):
+        (tmp_path / f"{_finished_pid()}-{n}.json").write_text(json.dumps(job.snapshot()))
+
+    # Test 6: exited processes' snapshots become one cumulative file, live ones stay; counts are kept
+    labels = 'stage="tool_exec",agent="FoldedAgent",field="phone",language="english"'
+    assert f"voice_turn_stage_seconds_count{{{labels}}} 4" in collect(str(tmp_path)).render()
+    assert sorted(os.listdir(tmp_path)) == sorted([CUMULATIVE_FILE, live])
+
+    (tmp_path / f"{_finished_pid()}-9.json").write_text(json.dumps(job.snapshot()))
+    assert fold_finished(str(tmp_path)) == 1
+    assert fold_finished(str(tmp_path)) == 0
+    assert f"voice_turn_stage_seconds_count{{{labels}}} 5" in collect(str(tmp_path)).render()
@@ -0,0 +1,69 @@
+import pytest
+from utils.normalizers import is_correction, parse_digits, parse_email, parse_number, parse_yes_no
+
+
+# Test 1: Spoken digit strings
+@pytest.mark.parametrize("text, length, expected", [
+    ("nine eight four five zero one two three four five", 10, "9845012345"),
+    ("my number is 98450 12345", 10, "9845012345"),
+    ("double nine eight 4 5 triple zero 1 2", 10, "9984500012"),
+    ("five six zero zero zero one", 6, "560001"),
+    ("೫೬೦೦೦೧", 6, "560001"),
+    ("ಐದು ಆರು ಸೊನ್ನೆ ಸೊನ್ನೆ ಸೊನ್ನೆ ಒಂದು", 6, "560001"),
+    ("five six zero", 6, None),
+    ("near the temple", None, None),
+])
+def test_parse_digits(text, length, expected):
+    assert parse_digits(text, length=length) == expected
+
+
+# Test 2: Small quantities
+@pytest.mark.parametrize("text, expected", [
+    ("twenty five", "25"),
+    ("10 guntas", "10"),
+    ("ಹತ್ತು ಗುಂಟೆ", "10"),
+    ("one hundred twenty five", "125"),
+    ("two three", None),
+    ("about ten", None),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+
+# Test 3: Spoken email addresses
+@pytest.mark.parametrize("text, expected", [
+    ("john dot doe at gmail dot com", "john.doe@gmail.com"),
+    ("my email is ravi_k at yahoo dot co dot in", "ravi_k@yahoo.co.in"),
+    ("ravi@gmail.com.", "ravi@gmail.com"),
+    ("ravi kumar at gmail dot com", None),
+    ("at gmail dot com", None),
+])
+def test_parse_email(text, expected):
+    assert parse_email(text) == expected
+
+
+# Test 4: Yes / No in both languages
+@pytest.mark.parametrize("text, expected", [
+    ("yes", "Yes"),
+    ("ಹೌದು", "Yes"),
+    ("no sir", "No"),
+    ("ಇಲ್ಲ", "No"),
+    ("yes no", None),
+    ("Yes, that is correct.", "Yes"),
+    ("I think the boundary was never marked", None),
+])
+def test_parse_yes_no(text, expected):
+    assert parse_yes_no(text) == expected
+
+
+# Test 5: Corrections to an earlier answer
+@pytest.mark.parametrize("text, expected", [
+    ("sorry, the district was wrong", True),
+    ("actually my pincode is 560001", True),
+    ("ತಪ್ಪು, ಗ್ರಾಮ ಬದಲಾಯಿಸಿ", True),
+    ("yes, that's correct", False),
+    ("560001", False),
+    ("", False),
+])
+def test_is_correction(text, expected):
+    assert is_correction(text) == expected
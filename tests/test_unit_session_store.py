@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+from models.userdata import UserData
+from utils.session_store import FileSessionStore, SessionPersister, SessionRecord, SQLiteSessionStore
+
+
+def _record(key, participant="user-1", **forms):
+    return SessionRecord(
+        key=key, participant=participant, agent_type="felling", preferred_language="kannada",
+        language_selected=True, current_field="pincode", forms=forms, updated_at=time.time(),
+    )
+
+
+@pytest.fixture(params=["sqlite", "file"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    return FileSessionStore(str(tmp_path / "sessions.jsonl"))
+
+
+# Test 1: Deltas merge per field; lookup by room, then by participant
+def test_store_round_trip(store):
+    store.write([_record("room-a", felling={"district": "Mysuru", "pincode": None})])
+    store.write([_record("room-a", felling={"pincode": "571105"})])
+
+    record = store.load("room-a")
+    assert record.forms == {"felling": {"district": "Mysuru", "pincode": "571105"}}
+    assert (record.agent_type, record.preferred_language, record.current_field) == ("felling", "kannada", "pincode")
+
+    assert store.load("room-b", participant="user-1").key == "room-a"
+    assert store.load("room-b", participant="user-2") is None
+
+    store.delete(["room-a"])
+    assert store.load("room-a") is None
+
+
+# Test 2: A torn last line (crash mid-append) is ignored
+def test_file_store_torn_line(tmp_path):
+    store = FileSessionStore(str(tmp_path / "sessions.jsonl"))
+    store.write([_record("room-a", felling={"district": "Mysuru"})])
+    with open(store.path, "a", encoding="utf-8") as f:
+        f.write('{"key": "room-a", "forms": {"fel')
+    assert store.load("room-a").forms == {"felling": {"district": "Mysuru"}}
+    assert store.compact() == 1
+
+
+# Test 3: Write-behind only writes changes, then resume restores the form
+def test_persister_write_behind_and_resume(tmp_path):
+    async def _run():
+        persister = SessionPersister(f"sqlite:{tmp_path / 'sessions.db'}", interval=60)
+        assert persister.open_sync() is await persister.open() is not None  # as prewarm, then a session
+        userdata = UserData(agent_type="felling", preferred_language="english", language_selected=True)
+        persister.track(userdata, "room-a")
+
+        userdata.felling_form.district = "Mysuru"
+        userdata.current_field = "taluk"
+        await persister.flush()
+        await persister.flush()  # nothing changed
+        assert persister.stats()["records"] == 1
+
+        userdata.felling_form.taluk = "Hunsur"
+        await persister.release("room-a")
+        assert persister.stats()["records"] == 2
+
+        # A room deep-linking another form does not resume this one
+        other = UserData()
+        assert not await persister.restore(other, "room-a", agent_type="contact")
+        assert not other.resumed and other.felling_form.district is None
+
+        # New process, same room
+        restored = UserData()
+        assert await persister.restore(restored, "room-a", agent_type="felling")
+        assert restored.resumed and restored.agent_type == "felling"
+        assert restored.current_field == "taluk"
+        assert restored.felling_form.district == "Mysuru"
+        assert restored.felling_form.next_field(after="taluk") == "village"
+        assert restored.felling_form.dirty == set()
+
+        # Submitted sessions are removed
+        persister.track(restored, "room-a")
+        restored.should_submit = True
+        await persister.release("room-a")
+        assert not await persister.restore(UserData(), "room-a")
+
+    asyncio.run(_run())
@@ -0,0 +1,179 @@
+import asyncio
+import os
+
+os.environ.setdefault("SONIOX_API_KEY", "test-key")
+
+from agents.felling_agent import FellingFormAgent
+from utils.language import update_stt_language
+from utils.stt_manager import SESSION_PROFILE, ManagedSTT, SttManager
+
+
+class FakeSession:
+    def __init__(self, stt):
+        self.stt = stt
+
+
+class FakeWs:
+    pass
+
+
+def test_options_are_prebuilt_once():
+    manager = SttManager()
+    # Test 1: same (profile, language) → same options object
+    assert manager.options(SESSION_PROFILE, "english") is manager.options(SESSION_PROFILE, "english")
+    assert manager.options(SESSION_PROFILE, "english").language_hints == ["en"]
+    assert manager.options(SESSION_PROFILE, "kannada").language_hints == ["kn", "en"]
+    assert manager.options(SESSION_PROFILE).language_hints == ["en", "kn"]
+
+    # Test 2: prewarm builds every profile × language
+    manager.register("custom", lambda language: (["en"], f"ctx {language}"))
+    assert manager.prewarm() == 6
+    assert manager.options("custom", "kannada").context == "ctx kannada"
+
+
+def test_switch_without_stream_swaps_options():
+    manager = SttManager()
+    stt = manager.client()
+    assert isinstance(stt, ManagedSTT)
+
+    # Test 3: no live stream → options swapped, nothing reconnects
+    assert manager.switch(stt, "kannada") == 0
+    assert stt._params is manager.options(SESSION_PROFILE, "kannada")
+    assert manager.stats()["switches"] == 1 and manager.stats()["reconnects"] == 0
+
+    # Test 4: switching to the current language is a no-op
+    assert manager.switch(stt, "kannada") == 0
+    assert manager.stats()["switches"] == 1
+
+
+def test_switch_reconnects_live_stream():
+    async def _run():
+        manager = SttManager()
+        stt = manager.client()
+        stream = stt.stream()
+        stream._ws = FakeWs()  # connected
+
+        # Test 5: the same stream is asked to reconnect, timed on connect
+        assert manager.switch(stt, "english") == 1
+        assert stream._reconnect_event.is_set()
+        assert manager.stats()["switches"] == 0
+
+        stt._stream_connected(stream)
+        stats = manager.stats()
+        assert stats["switches"] == 1 and stats["reconnects"] == 1
+        assert stats["last_ms"] >= 0
+        await stream.aclose()
+
+    asyncio.run(_run())
+
+
+def test_agents_and_session_use_managed_clients():
+    from utils.stt_manager import STT_MANAGER
+
+    # Test 6: form agents with stt_context get a managed client on their own profile
+    agent = FellingFormAgent()
+    assert isinstance(agent.stt, ManagedSTT)
+    assert agent.stt.profile == "FellingFormAgent"
+    assert agent.stt._params is STT_MANAGER.options("FellingFormAgent", None)
+
+    asyncio.run(agent.apply_language("kannada"))
+    assert agent.stt._params is STT_MANAGER.options("FellingFormAgent", "kannada")
+    assert "kn" in agent.stt._params.language_hints
+
+    # Test 7: update_stt_language switches the session client in place
+    stt = STT_MANAGER.client(SESSION_PROFILE)
+    asyncio.run(update_stt_language(FakeSession(stt), "English"))
+    assert stt._params.language_hints == ["en"]
+    assert stt.language == "english"
+
+
+def test_speech_profiles_focus_the_stt():
+    from models.felling_form import FellingFormData
+    from models.schema import DIGITS, YES_NO
+
+    schema = FellingFormData.schema()
+    # Test 8: the schema carries per-field speech profiles
+    assert schema.by_name["pincode"].speech is DIGITS
+    assert schema.by_name["boundary_demarcated"].speech is YES_NO
+
+    manager = SttManager()
+    stt = manager.client()
+    manager.switch(stt, "english")
+
+    # Test 9: focus keeps the language, sets endpoint delay and the field vocabulary
+    manager.focus(stt, DIGITS)
+    assert stt._params is manager.options(SESSION_PROFILE, "english", DIGITS)
+    assert stt._params.max_endpoint_delay_ms == DIGITS.endpoint_delay_ms
+    assert stt._params.language_hints == ["en"]
+    assert "nine" in stt._params.context
+
+    # Test 10: same profile for the next field → no switch
+    switches = manager.stats()["switches"]
+    assert manager.focus(stt, DIGITS) == 0
+    assert manager.stats()["switches"] == switches
+
+    # Test 11: language switch keeps the field focus
+    manager.switch(stt, "kannada")
+    assert stt._params is manager.options(SESSION_PROFILE, "kannada", DIGITS)
+
+
+def test_field_latency_report():
+    manager = SttManager()
+    manager.record_turn("pincode", 0.9, 0.4)
+    manager.record_turn("pincode", 0.7, 0.4)
+
+    # Test 12: per-field mean end of utterance delay and silence saved
+    report = manager.field_report()["pincode"]
+    assert report == {"turns": 2, "mean_eou_ms": 800.0, "saved_ms": 800.0}
+    assert manager.stats()["saved_ms"] == 800.0
+
+
+def test_focus_keeps_live_stream():
+    async def _run():
+        manager = SttManager()
+        stt = manager.client()
+        stream = stt.stream()
+        stream._ws = FakeWs()  # connected
+
+        # Test 13: a field focus swaps options but does not reconnect the stream
+        from models.schema import DIGITS
+
+        assert manager.focus(stt, DIGITS) == 0
+        assert not stream._reconnect_event.is_set()
+        assert stt._params is manager.options(SESSION_PROFILE, None, DIGITS)
+        assert manager.stats()["reconnects"] == 0
+        await stream.aclose()
+
+    asyncio.run(_run())
+
+
+def test_profiles_shorten_or_lengthen_the_session_silence():
+    from models.schema import LONG_TEXT, NAME, SESSION_ENDPOINT_DELAY_MS, SESSION_MIN_SILENCE, SpeechProfile, YES_NO
+
+    # Test 14: profiles wait less (yes/no) or more (names, free text) than the session VAD / endpoint delay
+    assert YES_NO.silence() == 0.4 < SESSION_MIN_SILENCE
+    assert SESSION_MIN_SILENCE < NAME.silence() == 0.8 < LONG_TEXT.silence() == 1.4
+    assert SpeechProfile().silence() == SESSION_MIN_SILENCE
+    assert LONG_TEXT.endpoint_delay() == 3000 > SESSION_ENDPOINT_DELAY_MS
+    assert SttManager().options(SESSION_PROFILE, None, LONG_TEXT).max_endpoint_delay_ms == 3000
+
+
+def test_focus_reconnects_for_longer_endpoint():
+    async def _run():
+        from models.schema import LONG_TEXT, NAME, YES_NO
+
+        manager = SttManager()
+        stt = manager.client()
+        stream = stt.stream()
+        stream._ws = FakeWs()  # connected with the session options
+        stream.endpoint_delay_ms = stt._params.max_endpoint_delay_ms
+
+        # Test 15: a shorter endpoint delay waits for the next connect, a longer one reconnects
+        assert manager.focus(stt, YES_NO) == 0
+        assert manager.focus(stt, NAME) == 0  # 1500 ms, the socket still has 2000
+        assert manager.focus(stt, LONG_TEXT) == 1
+        assert stream._reconnect_event.is_set()
+        assert stt._pending.get(stream) is not None
+        await stream.aclose()
+
+    asyncio.run(_run())
@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+from utils.submissions import FileSink, StubSink, SubmissionPipeline, idempotency_key
+
+VALUES = {"company": "ACME", "subject": "Lost ID", "phone": "9876543210", "message": "Help"}
+
+
+# Test 1: Same session/form/values → one stored submission, one delivery
+def test_idempotent_enqueue_and_batch_delivery(tmp_path):
+    async def _run():
+        sink = StubSink()
+        pipeline = SubmissionPipeline(sink, path=str(tmp_path / "submissions.db"))
+        first = await pipeline.submit("contact", VALUES, session="room-a")
+        again = await pipeline.submit("contact", dict(VALUES), session="room-a")
+        other = await pipeline.submit("contact", VALUES, session="room-b")
+        assert first == again == idempotency_key("room-a", "contact", VALUES)
+        assert other != first
+
+        await pipeline.drain()
+        await pipeline.close()
+        assert [s.key for s in sink.delivered] == [first, other]
+        assert pipeline.stats()["duplicates"] == 1
+        assert pipeline.outbox.counts() == {"delivered": 2}
+
+    asyncio.run(_run())
+
+
+# Test 2: Failed batches are retried with backoff, then given up
+def test_retry_and_dead_letter(tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.submissions.backoff", lambda attempts: 0.0)
+
+    async def _run():
+        sink = StubSink(failures=1)
+        pipeline = SubmissionPipeline(sink, path=str(tmp_path / "submissions.db"), max_attempts=3)
+        await pipeline.submit("contact", VALUES, session="room-a")
+        await pipeline.close()
+
+        assert await pipeline.deliver_due() == 0  # first attempt fails
+        assert await pipeline.deliver_due() == 1
+        assert pipeline.stats()["retried"] == 1
+
+        sink.failures = 5
+        await pipeline.submit("contact", VALUES, session="room-b")
+        await pipeline.close()
+        for _ in range(3):
+            await pipeline.deliver_due()
+        assert pipeline.outbox.counts() == {"delivered": 1, "dead": 1}
+
+    asyncio.run(_run())
+
+
+# Test 3: Pending submissions survive the process and go to the file sink
+def test_pending_survive_restart(tmp_path):
+    path = str(tmp_path / "submissions.db")
+
+    async def _run():
+        crashed = SubmissionPipeline(StubSink(failures=1), path=path)
+        key = await crashed.submit("felling", {"district": "Mysuru"}, session="room-a")
+        await crashed.close()  # never delivered
+
+        restarted = SubmissionPipeline(FileSink(str(tmp_path / "out.jsonl")), path=path)
+        assert await restarted.deliver_due() == 1
+        return key
+
+    key = asyncio.run(_run())
+    with open(tmp_path / "out.jsonl", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [(line["key"], line["values"]) for line in lines] == [(key, {"district": "Mysuru"})]
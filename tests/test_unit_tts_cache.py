@@ -0,0 +1,141 @@
+import asyncio
+from types import SimpleNamespace
+
+from livekit import rtc
+
+from utils.tts_cache import CachedAudio, PhraseCache, phrase_key, prompt_catalogue, tts_identity
+
+
+class FakeStream:
+    def __init__(self, frames):
+        self._frames = frames
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        async def _gen():
+            for frame in self._frames:
+                yield SimpleNamespace(frame=frame)
+        return _gen()
+
+
+class FakeTTS:
+    model = "fake-tts"
+
+    def __init__(self):
+        self._opts = SimpleNamespace(voice="alloy")
+        self.calls = 0
+
+    def synthesize(self, text):
+        self.calls += 1
+        frame = rtc.AudioFrame(data=b"\x01\x00" * 480, sample_rate=24000, num_channels=1, samples_per_channel=480)
+        return FakeStream([frame, frame])
+
+
+class FakeSession:
+    def __init__(self, tts):
+        self.tts = tts
+        self.userdata = SimpleNamespace(preferred_language="english")
+        self.said = []
+
+    def say(self, text, audio=None, **kwargs):
+        self.said.append((text, audio is not None))
+
+
+def _audio(n_bytes):
+    return CachedAudio(b"\x00" * n_bytes, 24000, 1)
+
+
+# Test 1: Keys depend on text, voice, model and language
+def test_phrase_key():
+    key = phrase_key("Which taluk?", "alloy", "gpt-4o-mini-tts", "english")
+    assert key == phrase_key(" Which taluk? ", "alloy", "gpt-4o-mini-tts", "english")
+    assert key != phrase_key("Which taluk?", "verse", "gpt-4o-mini-tts", "english")
+    assert key != phrase_key("Which taluk?", "alloy", "gpt-4o-mini-tts", "kannada")
+    assert tts_identity(FakeTTS()) == ("alloy", "fake-tts")
+
+
+# Test 2: Stored audio survives a new process (disk) and memory is LRU bounded
+def test_disk_roundtrip_and_memory_lru(tmp_path):
+    cache = PhraseCache(str(tmp_path), max_memory_bytes=2000)
+    cache.put("a" * 64, _audio(960))
+    cache.put("b" * 64, _audio(960))
+    cache.put("c" * 64, _audio(960))
+    assert "a" * 64 not in cache._memory  # evicted from memory, still on disk
+
+    fresh = PhraseCache(str(tmp_path))
+    assert fresh.get("a" * 64) == _audio(960)
+
+
+# Test 3: Disk store drops the least recently used files
+def test_disk_eviction(tmp_path):
+    import os
+
+    cache = PhraseCache(str(tmp_path), max_disk_bytes=2500)
+    cache.put("a" * 64, _audio(960))
+    os.utime(cache._path("a" * 64), (1, 1))
+    cache.put("b" * 64, _audio(960))
+    cache.put("c" * 64, _audio(960))
+    assert cache.sweep() == 1
+    assert not os.path.exists(cache._path("a" * 64))
+    assert os.path.exists(cache._path("c" * 64))
+
+
+# Test 4: Catalogued misses are rendered in the background, then played from cache
+def test_say_hit_and_miss(tmp_path):
+    async def run():
+        tts = FakeTTS()
+        session = FakeSession(tts)
+        cache = PhraseCache(str(tmp_path))
+        cache._catalogue.add("Which taluk?")
+
+        cache.say(session, "Which taluk?")
+        await cache.drain()
+        cache.say(session, "Which taluk?")
+
+        frames = [frame async for frame in cache.stream(cache.get(phrase_key("Which taluk?", "alloy", "fake-tts", "english")))]
+        return tts, session, cache, frames
+
+    tts, session, cache, frames = asyncio.run(run())
+    assert tts.calls == 1
+    assert session.said == [("Which taluk?", False), ("Which taluk?", True)]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(frames) == 2 and frames[0].samples_per_channel == 480
+
+
+# Test 5: Catalogue covers greetings, intros and every field prompt
+def test_prompt_catalogue():
+    from models.felling_form import FellingFormData
+
+    phrases = set(prompt_catalogue())
+    taluk = FellingFormData.schema().by_name["taluk"]
+    assert (taluk.prompt_for("english"), "english") in phrases
+    assert (taluk.prompt_for("kannada"), "kannada") in phrases
+    texts = {text for text, _ in phrases}
+    assert any("Would you prefer to continue in English or Kannada" in text for text in texts)
+
+
+# Test 6: Before language selection phrases are looked up as English; disk-only entries load in the background
+def test_say_without_language_and_background_load(tmp_path):
+    async def run():
+        tts = FakeTTS()
+        session = FakeSession(tts)
+        session.userdata.preferred_language = None
+        PhraseCache(str(tmp_path)).put(phrase_key("Hello", "alloy", "fake-tts", "english"), _audio(960))
+
+        cache = PhraseCache(str(tmp_path))
+        cache._catalogue.add("Hello")
+        cache.say(session, "Hello")  # on disk only: spoken live, loaded for next time
+        assert cache._tasks
+        await cache.drain()
+        cache.say(session, "Hello")
+        return tts, session, cache
+
+    tts, session, cache = asyncio.run(run())
+    assert tts.calls == 0
+    assert session.said == [("Hello", False), ("Hello", True)]
+    assert not cache._tasks
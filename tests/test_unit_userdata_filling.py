@@ -108,4 +108,17 @@ def test_partial_form_defaults(empty_userdata):
     u.agent_type = "felling"
     form = u.current_form
     assert form.files_uploaded == {}
-    assert form.agree_terms is False
\ No newline at end of file
+    assert form.agree_terms is False
+
+# Test 7: Next expected field follows field_order
+def test_next_field_follows_order(empty_userdata):
+    form = empty_userdata.felling_form
+    assert form.next_field() == "in_area_type"
+
+    form.in_area_type = "forest"
+    form.district = "Mandya"
+    assert form.next_field() == "taluk"
+
+    for field in form.field_order:
+        setattr(form, field, True if field == "agree_terms" else "x")
+    assert form.next_field() is None
@@ -0,0 +1,304 @@
+# utils/applicants.py
+"""
+Returning applicants.
+
+When a form is confirmed, its applicant section (the fields named by the
+form's `returning` spec, see models/schema.py) is stored under the
+applicant's mobile number. When the same number is given again, the agent
+offers to reuse those details in one yes/no turn instead of asking for the
+name, father's name, address and pincode again.
+
+Storage is a local SQLite table (WAL, memory-mapped reads) whose primary
+key is (mobile_number, form), declared WITHOUT ROWID: the table is itself
+the b-tree on mobile_number, so the index covers the lookup and a hit is a
+single seek, whatever the number of rows.
+
+Lookups run in a worker thread with a deadline (APPLICANT_LOOKUP_MS). If
+the disk is slow, the conversation goes on as for a new applicant, so the
+hot path never waits on I/O. Confirmed forms are written the same way, in
+the background.
+
+APPLICANT_INDEX is the database path; "none" disables the feature.
+
+    python -m utils.applicants backfill [data/submissions.jsonl]
+    python -m utils.applicants benchmark [rows]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+APPLICANT_INDEX = os.getenv("APPLICANT_INDEX", os.path.join(DATA_DIR, "applicants.db"))
+# Longest a lookup may delay the next question
+LOOKUP_TIMEOUT = float(os.getenv("APPLICANT_LOOKUP_MS", "50")) / 1000
+
+
+def _number(key: Any) -> Optional[int]:
+    """Mobile numbers are stored as integers (smaller keys, faster compares)."""
+    key = str(key or "").strip()
+    return int(key) if key.isdigit() else None
+
+
+class ApplicantIndex:
+    """SQLite table of stored applicant sections. Called from worker threads."""
+
+    def __init__(self, path: str = APPLICANT_INDEX) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("PRAGMA mmap_size=268435456")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS applicants (
+                    mobile_number INTEGER NOT NULL,
+                    form TEXT NOT NULL,
+                    profile TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (mobile_number, form)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def put_many(self, rows: Iterable[Tuple[str, str, Dict[str, Any], float]]) -> int:
+        """Upsert (form, mobile number, profile, updated_at) rows. Returns how many were written."""
+        values = [
+            (number, form_name, json.dumps(profile, ensure_ascii=False), updated_at)
+            for form_name, key, profile, updated_at in rows
+            if (number := _number(key)) is not None
+        ]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT INTO applicants VALUES (?, ?, ?, ?) ON CONFLICT (mobile_number, form) DO UPDATE SET "
+                    "profile = excluded.profile, updated_at = excluded.updated_at WHERE excluded.updated_at >= updated_at",
+                    values,
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return len(values)
+
+    def get(self, form_name: str, key: str) -> Optional[Dict[str, Any]]:
+        number = _number(key)
+        if number is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT profile FROM applicants WHERE mobile_number = ? AND form = ?", (number, form_name)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM applicants").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def profile_of(form) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """(mobile number, applicant section) of a filled form, None if it has no returning spec or key."""
+    returning = type(form).returning
+    if returning is None:
+        return None
+    key = getattr(form, returning.key, None)
+    profile = {name: getattr(form, name) for name in returning.fields if getattr(form, name, None)}
+    if not key or not profile:
+        return None
+    return key, profile
+
+
+class ApplicantProfiles:
+    """Async front of the index: deadline-bounded lookups, background writes."""
+
+    def __init__(self, path: str = APPLICANT_INDEX, timeout: float = LOOKUP_TIMEOUT) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._index: Optional[ApplicantIndex] = None
+        self._open_lock = threading.Lock()
+        # Background writes still running, awaited by drain() before shutdown
+        self._writes: Set[asyncio.Future] = set()
+        self.lookups = 0
+        self.hits = 0
+        self.timeouts = 0
+        self.stored = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path != "none"
+
+    @property
+    def index(self) -> ApplicantIndex:
+        """Opened on first use; touches the disk, so only from a worker thread or prewarm."""
+        with self._open_lock:
+            if self._index is None:
+                self._index = ApplicantIndex(self.path)
+        return self._index
+
+    def _get(self, form_name: str, key: str) -> Optional[Dict[str, Any]]:
+        return self.index.get(form_name, key)
+
+    async def lookup(self, form_name: str, key: str) -> Optional[Dict[str, Any]]:
+        """Stored applicant section for `key`, or None (unknown, disabled, error or too slow)."""
+        if not self.enabled:
+            return None
+        self.lookups += 1
+        try:
+            profile = await asyncio.wait_for(asyncio.to_thread(self._get, form_name, key), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"⚠️ Applicant lookup took over {self.timeout * 1000:.0f} ms, skipped")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Applicant lookup failed: {e}")
+            return None
+        if profile:
+            self.hits += 1
+        return profile
+
+    def remember(self, form_name: str, form) -> Optional[asyncio.Future]:
+        """Store the applicant section of a confirmed form, in the background (returns the write task)."""
+        entry = profile_of(form) if self.enabled else None
+        if entry is None:
+            return None
+        key, profile = entry  # taken now, before the form changes
+        task = asyncio.ensure_future(self._store(form_name, key, profile))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+        return task
+
+    async def drain(self, timeout: float = 5.0) -> None:
+        """Wait for the background writes started by remember() (the job process exits after shutdown)."""
+        if not self._writes:
+            return
+        done, pending = await asyncio.wait(set(self._writes), timeout=timeout)
+        if pending:
+            logger.warning(f"⚠️ {len(pending)} applicant writes still running at shutdown")
+
+    async def _store(self, form_name: str, key: str, profile: Dict[str, Any]) -> None:
+        try:
+            rows = [(form_name, key, profile, time.time())]
+            self.stored += await asyncio.to_thread(lambda: self.index.put_many(rows))
+        except Exception as e:
+            logger.error(f"❌ Could not store applicant details: {e}")
+
+    def stats(self) -> dict:
+        return {"lookups": self.lookups, "hits": self.hits, "timeouts": self.timeouts, "stored": self.stored}
+
+
+# Shared index for the current worker process
+APPLICANTS = ApplicantProfiles()
+
+
+# -------------------------------------------------------------------
+# Backfill and benchmark
+# -------------------------------------------------------------------
+
+def backfill(submissions_path: str = os.path.join(DATA_DIR, "submissions.jsonl"), path: str = APPLICANT_INDEX) -> int:
+    """Fill the index from delivered submissions (file sink output). Returns rows written."""
+    from models.registry import FORM_REGISTRY
+
+    rows: List[Tuple[str, str, Dict[str, Any], float]] = []
+    with open(submissions_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                submission = json.loads(line)
+            except ValueError:
+                continue
+            form_cls = FORM_REGISTRY.get(submission.get("form"))
+            if form_cls is None or form_cls.returning is None:
+                continue
+            entry = profile_of(form_cls(**{
+                name: value for name, value in submission["values"].items() if name in form_cls.__dataclass_fields__
+            }))
+            if entry is not None:
+                rows.append((submission["form"], entry[0], entry[1], submission.get("created_at", 0.0)))
+    index = ApplicantIndex(path)
+    written = index.put_many(rows)
+    index.close()
+    return written
+
+
+def benchmark(rows: int = 1_000_000, lookups: int = 20000) -> Dict[str, float]:
+    """Lookup latency (µs) on an index of `rows` applicants, built in a temporary file."""
+    import random
+    import statistics
+    import tempfile
+
+    profile = {"applicant_name": "Ramesh Kumar", "father_name": "Krishnappa", "address": "2nd Cross, Hunsur", "pincode": "571105"}
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ApplicantIndex(os.path.join(tmp, "applicants.db"))
+        numbers = random.sample(range(6_000_000_000, 9_999_999_999), rows)
+        started = time.perf_counter()
+        for start in range(0, rows, 50000):
+            index.put_many(("felling", str(n), profile, 0.0) for n in numbers[start:start + 50000])
+        build = time.perf_counter() - started
+
+        def timed(keys) -> List[float]:
+            samples = []
+            for key in keys:
+                t = time.perf_counter()
+                index.get("felling", key)
+                samples.append((time.perf_counter() - t) * 1e6)
+            return sorted(samples)
+
+        hits = timed(str(random.choice(numbers)) for _ in range(lookups))
+        misses = timed(str(random.randrange(1_000_000_000, 5_999_999_999)) for _ in range(lookups))
+
+        async def async_lookups() -> List[float]:
+            profiles = ApplicantProfiles(index.path)
+            profiles._index = index
+            samples = []
+            for _ in range(2000):
+                t = time.perf_counter()
+                await profiles.lookup("felling", str(random.choice(numbers)))
+                samples.append((time.perf_counter() - t) * 1e6)
+            return sorted(samples)
+
+        awaited = asyncio.run(async_lookups())
+        size = os.path.getsize(index.path)
+        index.close()
+
+    def p(samples: List[float], q: float) -> float:
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))], 1)
+
+    return {
+        "rows": rows,
+        "build_s": round(build, 1),
+        "db_mb": round(size / 1e6, 1),
+        "hit_p50_us": round(statistics.median(hits), 1),
+        "hit_p99_us": p(hits, 0.99),
+        "miss_p50_us": round(statistics.median(misses), 1),
+        "miss_p99_us": p(misses, 0.99),
+        "async_p50_us": round(statistics.median(awaited), 1),
+        "async_p99_us": p(awaited, 0.99),
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "backfill"
+    if command == "backfill":
+        source = sys.argv[2] if len(sys.argv) > 2 else os.path.join(DATA_DIR, "submissions.jsonl")
+        print(f"Stored {backfill(source)} applicants in {APPLICANT_INDEX}")
+    elif command == "benchmark":
+        for name, value in benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000).items():
+            print(f"  {name:<14} {value}")
@@ -0,0 +1,222 @@
+# utils/codec.py
+"""
+Wire encodings for data-channel payloads.
+
+  json     json.dumps(...).encode("utf-8"), what every client understands
+  ids      compact JSON: envelope keys shortened, form fields replaced by
+           their position in the form schema (field-ID table)
+  msgpack  the same compact message in msgpack (needs the msgpack package)
+
+Compact payloads start with a marker byte, and the 0x80 bit of the marker
+means the rest is zlib-compressed. Markers are control bytes that valid JSON
+never starts with, so anything else (including JSON led by whitespace) is
+decoded as legacy JSON.
+Compression is only applied above `compress_threshold` bytes, i.e. to
+snapshot-sized messages.
+
+Clients opt in with {"type": "hello", "encodings": [...], "zlib": true}
+(see handlers/data_handler.py). The answer names the chosen encoding and
+carries the field-ID tables. Without a hello everything stays JSON.
+
+    python -m utils.codec benchmark
+"""
+
+import json
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    # binary wire format for clients that negotiate it
+    import msgpack
+except ImportError:
+    msgpack = None  # fallback: compact JSON ("ids")
+
+# Preference order when negotiating
+ENCODINGS = ("msgpack", "ids", "json")
+
+MARKERS = {"msgpack": 0x01, "ids": 0x02}
+COMPRESSED = 0x80
+COMPRESS_THRESHOLD = 512
+
+# Sync envelope keys (see utils/frontend.py) and their compact form
+ENVELOPE_KEYS = {"version": "v", "form": "f", "delta": "d", "snapshot": "s"}
+_ENVELOPE_NAMES = {short: name for name, short in ENVELOPE_KEYS.items()}
+
+
+@lru_cache(maxsize=None)
+def field_table(form_name: str) -> Tuple[str, ...]:
+    """Field names of a registered form, indexed by field ID."""
+    from models.registry import FORM_REGISTRY
+
+    form_cls = FORM_REGISTRY.get(form_name)
+    return tuple(form_cls.schema().field_order) if form_cls is not None else ()
+
+
+@lru_cache(maxsize=None)
+def _field_ids(form_name: str) -> Dict[str, int]:
+    return {name: index for index, name in enumerate(field_table(form_name))}
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return tuple(name for name in ENCODINGS if name != "msgpack" or msgpack is not None)
+
+
+def compact_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Short envelope keys, field names → field IDs (unknown fields keep their name)."""
+    ids = _field_ids(message.get("form") or "")
+    compact = {}
+    for key, value in message.items():
+        if key in ("delta", "snapshot") and isinstance(value, dict):
+            value = {ids.get(name, name): item for name, item in value.items()}
+        compact[ENVELOPE_KEYS.get(key, key)] = value
+    return compact
+
+
+def expand_message(compact: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of compact_message()."""
+    message = {_ENVELOPE_NAMES.get(key, key): value for key, value in compact.items()}
+    table = field_table(message.get("form") or "")
+    for key in ("delta", "snapshot"):
+        values = message.get(key)
+        if isinstance(values, dict):
+            message[key] = {resolve_field(table, name): item for name, item in values.items()}
+    return message
+
+
+def resolve_field(table: Tuple[str, ...], key: Any) -> Any:
+    """Field name for a field ID (int or numeric string), else `key` unchanged."""
+    if isinstance(key, str) and key.isdigit():
+        key = int(key)
+    if isinstance(key, int) and 0 <= key < len(table):
+        return table[key]
+    return key
+
+
+class WireCodec:
+    """Encoder for one negotiated (encoding, compression) pair."""
+
+    def __init__(self, encoding: str = "json", compress: bool = False, compress_threshold: int = COMPRESS_THRESHOLD) -> None:
+        if encoding not in available_encodings():
+            raise ValueError(f"Unsupported encoding: {encoding}")
+        self.encoding = encoding
+        self.compress = compress
+        self.compress_threshold = compress_threshold
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        if self.encoding == "json":
+            return json.dumps(message).encode("utf-8")
+
+        compact = compact_message(message)
+        if self.encoding == "msgpack":
+            body = msgpack.packb(compact, use_bin_type=True)
+        else:
+            body = json.dumps(compact, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        marker = MARKERS[self.encoding]
+        if self.compress and len(body) > self.compress_threshold:
+            body = zlib.compress(body, 6)
+            marker |= COMPRESSED
+        return bytes((marker,)) + body
+
+
+def decode_payload(data: bytes) -> Dict[str, Any]:
+    """Decode any payload: legacy JSON or a compact (optionally compressed) one."""
+    marker = data[0] if data else None
+    if marker is None or marker & ~COMPRESSED not in MARKERS.values():
+        return json.loads(data.decode("utf-8"))
+
+    body = data[1:]
+    if marker & COMPRESSED:
+        body = zlib.decompress(body)
+    if marker & ~COMPRESSED == MARKERS["msgpack"]:
+        if msgpack is None:
+            raise ValueError("msgpack payload received but msgpack is not installed")
+        compact = msgpack.unpackb(body, raw=False, strict_map_key=False)
+    else:
+        compact = json.loads(body.decode("utf-8"))
+    return expand_message(compact)
+
+
+JSON_CODEC = WireCodec("json")
+
+
+def negotiate(hello: Dict[str, Any]) -> WireCodec:
+    """Best encoding offered by the client's hello (JSON if none match)."""
+    offered = hello.get("encodings") or []
+    for encoding in available_encodings():
+        if encoding in offered:
+            return WireCodec(encoding, compress=bool(hello.get("zlib")) and encoding != "json")
+    return JSON_CODEC
+
+
+def hello_reply(codec: WireCodec, forms: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Answer to a client hello: chosen encoding and the field-ID tables."""
+    if forms is None:
+        from models.registry import FORM_REGISTRY
+
+        forms = FORM_REGISTRY
+    return {
+        "type": "hello",
+        "encoding": codec.encoding,
+        "zlib": codec.compress,
+        "fields": {name: list(field_table(name)) for name in forms},
+    }
+
+
+# -------------------------------------------------------------------
+# Benchmark
+# -------------------------------------------------------------------
+
+def sample_messages() -> Dict[str, Dict[str, Any]]:
+    """Representative felling-form delta and snapshot envelopes."""
+    from models.felling_form import FellingFormData
+
+    form = FellingFormData(
+        in_area_type="private land", district="Mysuru", taluk="Hunsur", village="Bilikere",
+        khata_number="12345", survey_number="45/2", total_extent_acres="2", guntas="10", anna="4",
+        applicant_type="individual", applicant_name="Aftaab Hussain", father_name="Mohammed Khasim",
+        address="No 12, 3rd Cross, Bilikere, Hunsur Taluk", applicant_district="Mysuru",
+        applicant_taluk="Hunsur", pincode="571105", mobile_number="9876543210",
+        email_id="aftaab@example.com", tree_species="Teak", tree_age="25", tree_girth="120",
+        east="Road", west="Canal", north="Survey 44", south="Survey 46",
+        purpose_of_felling="Construction of house", boundary_demarcated="yes",
+    )
+    return {
+        "delta": {"version": 17, "form": "felling", "delta": {"pincode": "571105", "mobile_number": "9876543210"}},
+        "snapshot": {"version": 18, "form": "felling", "snapshot": form.to_dict()},
+    }
+
+
+def benchmark(rounds: int = 20000) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Bytes and encode/decode µs per message for each encoding."""
+    import timeit
+
+    codecs = {"json": JSON_CODEC, "ids": WireCodec("ids"), "ids+zlib": WireCodec("ids", compress=True)}
+    if msgpack is not None:
+        codecs["msgpack"] = WireCodec("msgpack")
+        codecs["msgpack+zlib"] = WireCodec("msgpack", compress=True)
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for kind, message in sample_messages().items():
+        for name, codec in codecs.items():
+            payload = codec.encode(message)
+            assert decode_payload(payload) == json.loads(json.dumps(message))
+            encode = timeit.timeit(lambda: codec.encode(message), number=rounds) / rounds
+            decode = timeit.timeit(lambda: decode_payload(payload), number=rounds) / rounds
+            results.setdefault(kind, {})[name] = {
+                "bytes": len(payload),
+                "encode_us": round(encode * 1e6, 2),
+                "decode_us": round(decode * 1e6, 2),
+            }
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    if (sys.argv[1] if len(sys.argv) > 1 else "benchmark") == "benchmark":
+        for kind, rows in benchmark().items():
+            print(kind)
+            for name, row in rows.items():
+                print(f"  {name:<13} {row['bytes']:>5} B   encode {row['encode_us']:>6} µs   decode {row['decode_us']:>6} µs")
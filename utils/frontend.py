@@ -3,39 +3,307 @@
 Frontend communication utilities.
 Provides helpers for agents to send structured updates to the frontend (React).
 All data is published over LiveKit's data channel with JSON payloads.
+
+Form tools don't publish inline: queue_to_frontend() hands the update to the
+room's FrontendOutbox and returns. The outbox task waits a short coalescing
+window, merges consecutive formUpdate payloads into one, drops values the
+frontend already has, and publishes in order. flush_frontend() is the
+explicit flush point (e.g. before should_submit).
+
+Form state sync protocol (formUpdate topic, agent → frontend):
+
+    {"version": 7, "form": "felling", "delta": {"pincode": "570001"}}
+    {"version": 8, "form": "felling", "snapshot": {...every field...}}
+
+Every delta/snapshot gets the next version. The frontend applies a delta
+only when its version is last + 1, and any snapshot. On a gap it sends
+{"type": "resync"} (handled in handlers/data_handler.py), which is answered
+with a reliable snapshot. A snapshot also goes out when a participant
+(re)joins, so unreliable deltas are enough for convergence.
+Control messages such as {"should_submit": true} are not versioned.
+
+Clients that negotiated a compact encoding (utils/codec.py) get outbox
+payloads in it; direct send_to_frontend() calls stay JSON, which every
+client must keep accepting.
 """
 
-import json
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+import os
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Set
+
+from utils.codec import JSON_CODEC, WireCodec
+from utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
+FORM_UPDATE_TOPIC = "formUpdate"
+# Updates arriving within this window go out as one payload
+COALESCE_WINDOW = float(os.getenv("FRONTEND_COALESCE_MS", "40")) / 1000
+# Bound on queued payloads; the oldest unreliable one is dropped when full
+MAX_PENDING = 64
+# A publish taking longer than this is abandoned (the outbox moves on)
+PUBLISH_TIMEOUT = 5.0
+
+_MISSING = object()
+
 
 # -------------------------------------------------------------------
 # Core Sender
 # -------------------------------------------------------------------
 
-async def send_to_frontend(room, data: Dict[str, Any], topic: str = "formUpdate", reliable: bool = False):
+async def send_to_frontend(
+    room,
+    data: Dict[str, Any],
+    topic: str = "formUpdate",
+    reliable: bool = False,
+    codec: Optional[WireCodec] = None,
+) -> bool:
     """
     Publish structured JSON data to the frontend via LiveKit data channel.
+    Failures are logged, not raised; returns whether the data was published.
     
     Args:
         room: LiveKit Room instance (server-side).
         data: dict payload to send.
         topic: string topic to categorize data (default "formUpdate").
         reliable: whether delivery must be guaranteed (default False).
+        codec: wire encoding negotiated with the client (default JSON).
     """
     if not room:
         logger.warning("send_to_frontend called with no room instance")
-        return
+        return False
 
     try:
-        payload = json.dumps(data).encode("utf-8")
-        await room.local_participant.publish_data(payload, topic=topic, reliable=reliable)
+        payload = (codec or JSON_CODEC).encode(data)
+        with timed("frontend_publish"):
+            await room.local_participant.publish_data(payload, topic=topic, reliable=reliable)
         logger.debug(f"✅ Sent to frontend [{topic}]: {data}")
+        return True
     except Exception as e:
         logger.error(f"❌ Failed to send data to frontend: {e}")
+        return False
+
+
+# -------------------------------------------------------------------
+# Outbox
+# -------------------------------------------------------------------
+
+@dataclass
+class _Entry:
+    topic: str
+    data: Dict[str, Any]
+    reliable: bool
+
+
+class FrontendOutbox:
+    """Per-room queue of frontend payloads, published by one background task."""
+
+    def __init__(self, room, window: float = COALESCE_WINDOW, max_pending: int = MAX_PENDING) -> None:
+        self.room = room
+        self.window = window
+        self.max_pending = max_pending
+        self._entries: Deque[_Entry] = deque()
+        # Last published value per formUpdate key
+        self._sent: Dict[str, Any] = {}
+        self._wake = asyncio.Event()
+        self._flush = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+        # Sends scheduled outside the queue (e.g. the submit trigger), awaited by close()
+        self._background: Set[asyncio.Task] = set()
+        # Wire encoding negotiated with the client (hello), JSON until then
+        self.codec: WireCodec = JSON_CODEC
+        # Sync protocol: last version sent and where snapshots come from
+        self.version = 0
+        self._form_source: Optional[Callable[[], Any]] = None
+        self._snapshot_requested = False
+        self.snapshots = 0
+        self.published = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.suppressed = 0
+        self.dropped = 0
+
+    def put(self, data: Dict[str, Any], topic: str = FORM_UPDATE_TOPIC, reliable: bool = False) -> None:
+        """Queue `data` for publishing. Never blocks."""
+        if topic == FORM_UPDATE_TOPIC:
+            tail = self._entries[-1] if self._entries and self._entries[-1].topic == topic else None
+            pending = tail.data if tail is not None else {}
+            changed = {k: v for k, v in data.items() if k in pending or self._sent.get(k, _MISSING) != v}
+            self.suppressed += len(data) - len(changed)
+            if not changed:
+                return
+            if tail is not None:
+                tail.data.update(changed)
+                tail.reliable = tail.reliable or reliable
+                self.coalesced += 1
+                return
+            data = changed
+
+        if len(self._entries) >= self.max_pending:
+            self._drop_one()
+        self._entries.append(_Entry(topic, dict(data), reliable))
+        self._idle.clear()
+        self._wake.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def bind_form(self, source: Callable[[], Any]) -> None:
+        """`source()` returns the form currently shown (None if no form is active)."""
+        self._form_source = source
+
+    def request_snapshot(self) -> None:
+        """Send the full form state as soon as possible (resync / reconnect)."""
+        self._snapshot_requested = True
+        self._idle.clear()
+        self._wake.set()
+        self._flush.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def mark_known(self, values: Dict[str, Any]) -> None:
+        """Values the frontend already has (e.g. typed by the user); never echoed back."""
+        self._sent.update(values)
+
+    def _form(self):
+        return self._form_source() if self._form_source is not None else None
+
+    def _envelope(self, key: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        self.version += 1
+        form = self._form()
+        return {"version": self.version, "form": getattr(form, "form_name", None), key: data}
+
+    async def _publish(self, data: Dict[str, Any], topic: str, reliable: bool) -> bool:
+        """Whether `data` went out; only then may `_sent` assume the frontend has it."""
+        try:
+            sent = await asyncio.wait_for(
+                send_to_frontend(self.room, data, topic=topic, reliable=reliable, codec=self.codec),
+                timeout=PUBLISH_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"❌ Frontend publish timed out [{topic}]")
+            sent = False
+        if not sent:
+            self.failed += 1
+            return False
+        self.published += 1
+        return True
+
+    async def _send_snapshot(self) -> None:
+        self._snapshot_requested = False
+        form = self._form()
+        if form is None:
+            return
+        values = form.to_dict()
+        # The snapshot supersedes every queued delta
+        self._entries = deque(entry for entry in self._entries if entry.topic != FORM_UPDATE_TOPIC)
+        if await self._publish(self._envelope("snapshot", values), FORM_UPDATE_TOPIC, reliable=True):
+            self._sent = dict(values)
+            self.snapshots += 1
+            logger.debug(f"🔁 Sent {form.form_name} snapshot v{self.version}")
+
+    def _drop_one(self) -> None:
+        victim = next((entry for entry in self._entries if not entry.reliable), self._entries[0])
+        self._entries.remove(victim)
+        self.dropped += 1
+        logger.warning(f"⚠️ Frontend outbox full, dropped a [{victim.topic}] update")
+
+    async def flush(self) -> None:
+        """Publish everything queued so far, skipping the coalescing window."""
+        if self._idle.is_set():
+            return
+        self._flush.set()
+        await self._idle.wait()
+
+    def track(self, task: asyncio.Task) -> None:
+        """Keep `task` until it is done, log its failure, and let close() wait for it."""
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ Frontend send failed: {task.exception()}")
+
+    async def close(self) -> None:
+        if self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            try:
+                await asyncio.wait_for(self._flush.wait(), timeout=self.window)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            self._flush.clear()
+
+            if self._snapshot_requested:
+                await self._send_snapshot()
+            while self._entries:
+                entry = self._entries.popleft()
+                if entry.topic != FORM_UPDATE_TOPIC:
+                    await self._publish(entry.data, entry.topic, entry.reliable)
+                elif await self._publish(self._envelope("delta", entry.data), entry.topic, entry.reliable):
+                    self._sent.update(entry.data)
+            if not self._snapshot_requested:
+                self._idle.set()
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "snapshots": self.snapshots,
+            "published": self.published,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "suppressed": self.suppressed,
+            "dropped": self.dropped,
+        }
+
+
+_OUTBOXES: "weakref.WeakKeyDictionary[Any, FrontendOutbox]" = weakref.WeakKeyDictionary()
+
+
+def outbox_for(room) -> FrontendOutbox:
+    outbox = _OUTBOXES.get(room)
+    if outbox is None:
+        outbox = _OUTBOXES[room] = FrontendOutbox(room)
+    return outbox
+
+
+def queue_to_frontend(room, data: Dict[str, Any], topic: str = FORM_UPDATE_TOPIC, reliable: bool = False) -> None:
+    """Non-blocking send_to_frontend() through the room's coalescing outbox."""
+    if not room:
+        logger.warning("queue_to_frontend called with no room instance")
+        return
+    outbox_for(room).put(data, topic=topic, reliable=reliable)
+
+
+async def flush_frontend(room) -> None:
+    """Wait until every queued update for `room` has been published."""
+    outbox = _OUTBOXES.get(room) if room else None
+    if outbox is not None:
+        await outbox.flush()
+
+
+async def close_frontend(room) -> Optional[dict]:
+    """Finish pending sends, flush and stop the room's outbox. Returns its stats."""
+    outbox = _OUTBOXES.get(room) if room else None
+    if outbox is None:
+        return None
+    await outbox.close()
+    _OUTBOXES.pop(room, None)
+    return outbox.stats()
 
 
 # -------------------------------------------------------------------
@@ -61,11 +329,26 @@ async def send_bulk_update(room, updates: Dict[str, Any]):
     await send_to_frontend(room, updates, topic="formUpdate")
 
 
-async def trigger_form_submit(room):
+async def trigger_form_submit(room, submission_id: Optional[str] = None):
     """
     Tell frontend to submit the form (end of flow).
+    `submission_id` is the idempotency key of the server-side submission, if queued.
     """
-    await send_to_frontend(room, {"should_submit": True}, topic="formUpdate", reliable=True)
+    await flush_frontend(room)
+    payload: Dict[str, Any] = {"should_submit": True}
+    if submission_id:
+        payload["submission_id"] = submission_id
+    await send_to_frontend(room, payload, topic="formUpdate", reliable=True)
+
+
+def schedule_form_submit(room, submission_id: Optional[str] = None) -> Optional[asyncio.Task]:
+    """trigger_form_submit() in the background, tracked by the room's outbox (awaited on close)."""
+    if not room:
+        logger.warning("schedule_form_submit called with no room instance")
+        return None
+    task = asyncio.create_task(trigger_form_submit(room, submission_id))
+    outbox_for(room).track(task)
+    return task
 
 
 async def send_error(room, message: str, code: Optional[str] = None):
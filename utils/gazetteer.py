@@ -0,0 +1,551 @@
+# utils/gazetteer.py
+"""
+Karnataka administrative gazetteer: district → taluk → village.
+
+Place names answered by voice arrive misheard ("Mandiya"), in either script
+(ಮಂಡ್ಯ / Mandya) or under an old name (Mysore). Every name is reduced to
+a phonetic key that both scripts share:
+
+    ಮೈಸೂರು → maisuru → maisur        Mysuru → maisuru → maisur
+
+and matched by trigram overlap (Dice) against the names below the parent
+already chosen, e.g. only Mandya's taluks once the district is Mandya.
+
+The source hierarchy (data/gazetteer/karnataka.json, canonical name plus
+Kannada name and aliases) is compiled into a flat binary index that is
+memory-mapped, so every worker process on a host shares one copy from the
+page cache. Entries are stored level by level, grouped by parent, so the
+descendants of any place are one contiguous id range and a scoped lookup
+only walks that range of each trigram's posting list.
+
+Index layout (little-endian uint32 arrays after a fixed header):
+
+    parent, canonical, child_start, child_count, gram_count   [entries]
+    string offsets (name, kannada per entry)                  [2 × entries + 1]
+    posting start per trigram code                            [GRAM_CODES + 1]
+    postings (entry ids, ascending per trigram)               [postings]
+    utf-8 string blob
+
+Pincodes (data/gazetteer/pincodes.json) map to the taluk, or only the
+district when the post offices of one pincode lie in several taluks. They
+are stored as a sorted array next to the place entries:
+
+    pincode, place id                                        [pincodes]
+
+Villages are not in the repository data; load them from the LGD village
+directory export (CSV with district, taluk, village[, village_kannada]).
+The pincode table can be regenerated from the India Post pincode directory
+(CSV with pincode, Districtname, Taluk, statename):
+
+    python -m utils.gazetteer build [villages.csv]
+    python -m utils.gazetteer pincodes all_india_pincode.csv
+    python -m utils.gazetteer benchmark
+"""
+
+import csv
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_PATH = os.path.join(BASE_DIR, "data", "gazetteer", "karnataka.json")
+INDEX_PATH = os.path.join(BASE_DIR, "data", "gazetteer", "karnataka.idx")
+PINCODE_PATH = os.path.join(BASE_DIR, "data", "gazetteer", "pincodes.json")
+
+LEVELS = ("district", "taluk", "village")
+
+# Dice score needed to snap a field value to a place
+MIN_SCORE = 0.6
+# Stricter score for picking a place out of a whole transcript (fast path)
+CAPTURE_SCORE = 0.8
+
+MAGIC = b"KGZ2"
+_HEADER = struct.Struct("<4sIIIII")  # magic, entries, postings, pincodes, blob bytes, level starts follow
+_NONE = 0xFFFFFFFF
+
+# Trigram codes over "^", a-z, "$"
+_ALPHABET = 28
+GRAM_CODES = _ALPHABET ** 3
+
+
+# -------------------------------------------------------------------
+# Phonetic keys
+# -------------------------------------------------------------------
+
+_KN_CONSONANTS = {
+    "ಕ": "k", "ಖ": "kh", "ಗ": "g", "ಘ": "gh", "ಙ": "n", "ಚ": "ch", "ಛ": "ch", "ಜ": "j", "ಝ": "jh",
+    "ಞ": "n", "ಟ": "t", "ಠ": "th", "ಡ": "d", "ಢ": "dh", "ಣ": "n", "ತ": "t", "ಥ": "th", "ದ": "d",
+    "ಧ": "dh", "ನ": "n", "ಪ": "p", "ಫ": "ph", "ಬ": "b", "ಭ": "bh", "ಮ": "m", "ಯ": "y", "ರ": "r",
+    "ಱ": "r", "ಲ": "l", "ವ": "v", "ಶ": "sh", "ಷ": "sh", "ಸ": "s", "ಹ": "h", "ಳ": "l", "ೞ": "l",
+}
+_KN_VOWELS = {
+    "ಅ": "a", "ಆ": "a", "ಇ": "i", "ಈ": "i", "ಉ": "u", "ಊ": "u", "ಋ": "ru",
+    "ಎ": "e", "ಏ": "e", "ಐ": "ai", "ಒ": "o", "ಓ": "o", "ಔ": "au",
+}
+_KN_SIGNS = {
+    "ಾ": "a", "ಿ": "i", "ೀ": "i", "ು": "u", "ೂ": "u", "ೃ": "ru",
+    "ೆ": "e", "ೇ": "e", "ೈ": "ai", "ೊ": "o", "ೋ": "o", "ೌ": "au",
+}
+_KN_VIRAMA = "್"
+_KN_MODIFIERS = {"ಂ": "n", "ಃ": "h"}
+
+_KANNADA = re.compile(r"[ಀ-೿]")
+_NON_LETTERS = re.compile(r"[^a-z]")
+_Y_AS_VOWEL = re.compile(r"y(?![aeiou])")  # Mysuru ~ ಮೈಸೂರು (mai)
+_ASPIRATES = re.compile(r"([bcdgjkpst])h")
+_DOUBLES = re.compile(r"(.)\1+")
+_FOLD = str.maketrans("wzfqx", "vjpkk")
+
+
+def kannada_to_latin(text: str) -> str:
+    """Rough Kannada → Latin transliteration (inherent 'a' unless a sign or virama follows)."""
+    out: List[str] = []
+    pending = False  # consonant still carrying its inherent vowel
+    for ch in text:
+        if ch in _KN_CONSONANTS:
+            if pending:
+                out.append("a")
+            out.append(_KN_CONSONANTS[ch])
+            pending = True
+        elif ch in _KN_SIGNS:
+            out.append(_KN_SIGNS[ch])
+            pending = False
+        elif ch == _KN_VIRAMA:
+            pending = False
+        else:
+            if pending:
+                out.append("a")
+            out.append(_KN_VOWELS.get(ch) or _KN_MODIFIERS.get(ch) or ch)
+            pending = False
+    if pending:
+        out.append("a")
+    return "".join(out)
+
+
+def phonetic_key(text: str) -> str:
+    """Script-independent key: ಮಂಡ್ಯ, Mandya and Mandiya → "mandy"."""
+    if _KANNADA.search(text):
+        text = kannada_to_latin(text)
+    key = _NON_LETTERS.sub("", text.lower())
+    key = _Y_AS_VOWEL.sub("ai", key)
+    key = key.replace("ee", "i").replace("oo", "u").replace("iy", "y")
+    key = _ASPIRATES.sub(r"\1", key).translate(_FOLD)
+    key = _DOUBLES.sub(r"\1", key)
+    if len(key) > 3 and key[-1] in "au":
+        key = key[:-1]  # final vowel: Maddur ~ ಮದ್ದೂರು, Hassan ~ ಹಾಸನ
+    return key
+
+
+def _code(ch: str) -> int:
+    return 0 if ch == "^" else 27 if ch == "$" else ord(ch) - 96
+
+
+def gram_codes(key: str) -> List[int]:
+    """Distinct trigram codes of `key`, padded with ^ and $."""
+    padded = f"^{key}$"
+    codes = {
+        (_code(padded[i]) * _ALPHABET + _code(padded[i + 1])) * _ALPHABET + _code(padded[i + 2])
+        for i in range(len(padded) - 2)
+    }
+    return sorted(codes)
+
+
+# -------------------------------------------------------------------
+# Build
+# -------------------------------------------------------------------
+
+def _names(item) -> Tuple[str, Optional[str], List[str]]:
+    if isinstance(item, str):
+        return item, None, []
+    return item["name"], item.get("kannada"), list(item.get("aliases", ()))
+
+
+def load_source(
+    source_path: str = SOURCE_PATH,
+    villages_csv: Optional[str] = None,
+    pincode_path: Optional[str] = PINCODE_PATH,
+) -> dict:
+    """Source hierarchy, with the pincode table and villages from an LGD-style CSV merged in."""
+    with open(source_path, encoding="utf-8") as f:
+        source = json.load(f)
+    if pincode_path and os.path.exists(pincode_path):
+        with open(pincode_path, encoding="utf-8") as f:
+            source["pincodes"] = json.load(f)["pincodes"]
+    if not villages_csv:
+        return source
+
+    taluks: Dict[Tuple[str, str], dict] = {}
+    for district in source["districts"]:
+        district["taluks"] = [t if isinstance(t, dict) else {"name": t} for t in district["taluks"]]
+        for taluk in district["taluks"]:
+            taluks[(phonetic_key(district["name"]), phonetic_key(taluk["name"]))] = taluk
+
+    added = 0
+    with open(villages_csv, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            taluk = taluks.get((phonetic_key(row["district"]), phonetic_key(row["taluk"])))
+            if taluk is None:
+                continue
+            village = {"name": row["village"].strip()}
+            if row.get("village_kannada"):
+                village["kannada"] = row["village_kannada"].strip()
+            taluk.setdefault("villages", []).append(village)
+            added += 1
+    logger.info(f"🗺️ Merged {added} villages from {villages_csv}")
+    return source
+
+
+def import_pincodes(directory_csv: str, pincode_path: str = PINCODE_PATH, state: str = "KARNATAKA") -> int:
+    """Write the pincode table from the India Post directory. Returns the number of pincodes."""
+    places: Dict[str, set] = {}
+    with open(directory_csv, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("statename", "").strip().upper() != state:
+                continue
+            places.setdefault(row["pincode"].strip(), set()).add((row["Districtname"].strip(), row["Taluk"].strip()))
+
+    pincodes = {}
+    for code, offices in sorted(places.items()):
+        districts = {district for district, _ in offices}
+        if len(districts) > 1:
+            continue  # spans districts, nothing to infer
+        taluks = {taluk for _, taluk in offices if taluk and taluk.upper() != "NA"}
+        pincodes[code] = [districts.pop(), *(taluks if len(taluks) == 1 else ())]
+
+    with open(pincode_path, "w", encoding="utf-8") as f:
+        json.dump({"source": f"India Post pincode directory ({directory_csv})", "pincodes": pincodes},
+                  f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    return len(pincodes)
+
+
+def build_index(source: dict, index_path: str = INDEX_PATH) -> int:
+    """Compile the hierarchy into the binary index. Returns the number of entries."""
+    # Canonical places per level, children grouped under their parent's order
+    levels: List[List[Tuple[int, object]]] = [[(-1, d) for d in source["districts"]], [], []]
+    for depth, child_key in ((1, "taluks"), (2, "villages")):
+        for parent_position, (_, item) in enumerate(levels[depth - 1]):
+            if isinstance(item, dict):
+                levels[depth].extend((parent_position, child) for child in item.get(child_key, ()))
+
+    # Entries: every canonical place followed by its aliases (Kannada name included)
+    parent: List[int] = []
+    canonical: List[int] = []
+    strings: List[str] = []
+    keys: List[str] = []
+    level_start: List[int] = []
+    first_id: List[List[int]] = []  # level → position → entry id of the canonical place
+    by_key: Dict[Tuple[int, str], int] = {}  # (parent id, key) → canonical id, for pincodes
+    for depth, places in enumerate(levels):
+        level_start.append(len(parent))
+        ids = []
+        for parent_position, item in places:
+            name, kannada, aliases = _names(item)
+            entry = len(parent)
+            ids.append(entry)
+            parent_id = first_id[depth - 1][parent_position] if depth else _NONE
+            seen = set()
+            for alias in (name, kannada, *aliases):
+                key = phonetic_key(alias) if alias else ""
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                by_key.setdefault((parent_id, key), entry)
+                parent.append(parent_id)
+                canonical.append(entry)
+                strings.extend((name, kannada or ""))
+                keys.append(key)
+        first_id.append(ids)
+    level_start.append(len(parent))
+
+    count = len(parent)
+    child_start = [0] * count
+    child_count = [0] * count
+    for entry in range(count - 1, -1, -1):  # reversed, so child_start ends at the first child
+        p = parent[entry]
+        if p != _NONE:
+            child_start[p] = entry
+            child_count[p] += 1
+
+    grams = [gram_codes(key) for key in keys]
+    postings_by_code: Dict[int, List[int]] = {}
+    for entry, codes in enumerate(grams):
+        for code in codes:
+            postings_by_code.setdefault(code, []).append(entry)
+    post_start, postings = [], []
+    for code in range(GRAM_CODES):
+        post_start.append(len(postings))
+        postings.extend(postings_by_code.get(code, ()))
+    post_start.append(len(postings))
+
+    # Pincode → deepest place named (district, taluk), names resolved like scope values
+    pincodes: List[Tuple[int, int]] = []
+    for code, names in source.get("pincodes", {}).items():
+        place = _NONE
+        for name in names:
+            found = by_key.get((place, phonetic_key(name)))
+            if found is None:
+                break
+            place = found
+        if place != _NONE:
+            pincodes.append((int(code), place))
+        else:
+            logger.warning(f"🗺️ Pincode {code}: unknown place {names}")
+    pincodes.sort()
+
+    blob = bytearray()
+    offsets = []
+    for text in strings:
+        offsets.append(len(blob))
+        blob += text.encode("utf-8")
+    offsets.append(len(blob))
+
+    def u32(values) -> bytes:
+        return struct.pack(f"<{len(values)}I", *values)
+
+    payload = b"".join((
+        _HEADER.pack(MAGIC, count, len(postings), len(pincodes), len(blob), len(level_start)),
+        u32(level_start),
+        u32(parent), u32(canonical), u32(child_start), u32(child_count), u32([len(g) for g in grams]),
+        u32(offsets), u32(post_start), u32(postings),
+        u32([code for code, _ in pincodes]), u32([place for _, place in pincodes]),
+        bytes(blob),
+    ))
+    os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+    tmp = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, index_path)  # readers never map a partial file
+    return count
+
+
+# -------------------------------------------------------------------
+# Lookup
+# -------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Place:
+    id: int
+    level: str
+    name: str
+    kannada: Optional[str]
+    score: float
+
+
+class Gazetteer:
+    """Read-only view of a compiled index (memory-mapped)."""
+
+    def __init__(self, path: str = INDEX_PATH) -> None:
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, n_postings, n_pincodes, blob_len, n_levels = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a gazetteer index: {path}")
+
+        view = memoryview(self._mm)
+        offset = _HEADER.size
+        # Every view into the map, released before it is closed
+        self._views = [view]
+
+        def take(length: int) -> memoryview:
+            nonlocal offset
+            array = view[offset:offset + 4 * length].cast("I")
+            self._views.append(array)
+            offset += 4 * length
+            return array
+
+        self.count = count
+        self._level_start = list(take(n_levels))
+        self._parent = take(count)
+        self._canonical = take(count)
+        self._child_start = take(count)
+        self._child_count = take(count)
+        self._gram_count = take(count)
+        self._offsets = take(2 * count + 1)
+        self._post_start = take(GRAM_CODES + 1)
+        self._postings = take(n_postings)
+        self._pincodes = take(n_pincodes)
+        self._pincode_place = take(n_pincodes)
+        self._blob = view[offset:offset + blob_len]
+        self._views.append(self._blob)
+
+    def _string(self, index: int) -> str:
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode("utf-8")
+
+    def place(self, entry: int, score: float = 1.0) -> Place:
+        level = bisect_left(self._level_start, entry + 1) - 1
+        return Place(entry, LEVELS[level], self._string(2 * entry), self._string(2 * entry + 1) or None, score)
+
+    def _level_range(self, level: str) -> Tuple[int, int]:
+        depth = LEVELS.index(level)
+        return self._level_start[depth], self._level_start[depth + 1]
+
+    def _descendants(self, entry: int, depth: int) -> Tuple[int, int]:
+        """Id range of `entry`'s descendants `depth` levels down (children are contiguous)."""
+        lo, hi = entry, entry + 1
+        for _ in range(depth):
+            children = [c for c in range(lo, hi) if self._child_count[c]]
+            if not children:
+                return 0, 0
+            lo = self._child_start[children[0]]
+            hi = self._child_start[children[-1]] + self._child_count[children[-1]]
+        return lo, hi
+
+    def _score(self, key: str, lo: int, hi: int) -> List[Tuple[float, int]]:
+        """(Dice score, canonical id) of the entries in [lo, hi), best first."""
+        codes = gram_codes(key)
+        if not codes or lo >= hi:
+            return []
+        hits: Dict[int, int] = {}
+        postings, post_start = self._postings, self._post_start
+        for code in codes:
+            start = bisect_left(postings, lo, post_start[code], post_start[code + 1])
+            end = bisect_left(postings, hi, start, post_start[code + 1])
+            for i in range(start, end):
+                entry = postings[i]
+                hits[entry] = hits.get(entry, 0) + 1
+
+        best: Dict[int, float] = {}
+        for entry, common in hits.items():
+            score = 2 * common / (len(codes) + self._gram_count[entry])
+            canon = self._canonical[entry]
+            if score > best.get(canon, 0.0):
+                best[canon] = score
+        return sorted(((score, canon) for canon, score in best.items()), reverse=True)
+
+    def resolve(self, scope: Sequence[Optional[str]]) -> Optional[int]:
+        """Canonical id of the deepest place named by `scope` (district, taluk, ...), None if none matches."""
+        entry = None
+        for depth, name in enumerate(scope):
+            if not name:
+                break
+            lo, hi = self._level_range(LEVELS[depth]) if entry is None else self._descendants(entry, 1)
+            ranked = self._score(phonetic_key(name), lo, hi)
+            if not ranked or ranked[0][0] < 1.0:
+                break  # scope values are canonical names; anything else is not a known place
+            entry = ranked[0][1]
+        return entry
+
+    def candidates(self, level: str, scope: Sequence[Optional[str]] = ()) -> Tuple[int, int]:
+        """Id range searched for `level` under `scope` (whole level if the scope is unknown)."""
+        depth = LEVELS.index(level)
+        parent = self.resolve(scope[:depth])
+        if parent is None:
+            return self._level_range(level)
+        return self._descendants(parent, depth - (bisect_left(self._level_start, parent + 1) - 1))
+
+    def known(self, level: str, scope: Sequence[Optional[str]] = ()) -> bool:
+        """Whether the index has any `level` places under `scope` (no villages loaded → False)."""
+        lo, hi = self.candidates(level, scope)
+        return hi > lo
+
+    def match(self, level: str, text: str, scope: Sequence[Optional[str]] = (), min_score: float = MIN_SCORE) -> Optional[Place]:
+        """Best place for `text` at `level` under `scope`, if clearly better than the rest."""
+        ranked = self._score(phonetic_key(text), *self.candidates(level, scope))
+        if not ranked or ranked[0][0] < min_score:
+            return None
+        if len(ranked) > 1 and ranked[1][0] == ranked[0][0]:
+            return None  # ambiguous
+        return self.place(ranked[0][1], round(ranked[0][0], 3))
+
+    def find_in(self, level: str, transcript: str, scope: Sequence[Optional[str]] = (), min_score: float = CAPTURE_SCORE) -> Optional[Place]:
+        """Best place named anywhere in `transcript` (windows of up to three words)."""
+        words = transcript.split()
+        best = None
+        for size in (1, 2, 3):
+            for start in range(len(words) - size + 1):
+                place = self.match(level, " ".join(words[start:start + size]), scope, min_score)
+                if place is not None and (best is None or place.score > best.score):
+                    best = place
+        return best
+
+    def pincode(self, code: str) -> Tuple[Place, ...]:
+        """Places a pincode lies in, outermost first: (district, taluk), (district,) or ()."""
+        if not (code.isdigit() and len(code) == 6):
+            return ()
+        number = int(code)
+        i = bisect_left(self._pincodes, number)
+        if i == len(self._pincodes) or self._pincodes[i] != number:
+            return ()
+        chain = []
+        entry = self._pincode_place[i]
+        while entry != _NONE:
+            chain.append(self.place(entry))
+            entry = self._parent[entry]
+        return tuple(reversed(chain))
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._mm.close()
+
+
+def _stale(index_path: str, *sources: str) -> bool:
+    """Whether the index is missing, in an older format, or older than a source file."""
+    if not os.path.exists(index_path):
+        return True
+    with open(index_path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return True
+    built = os.path.getmtime(index_path)
+    return any(os.path.exists(path) and os.path.getmtime(path) > built for path in sources)
+
+
+@lru_cache(maxsize=None)
+def load_gazetteer(
+    index_path: str = INDEX_PATH,
+    source_path: str = SOURCE_PATH,
+    pincode_path: str = PINCODE_PATH,
+) -> Optional[Gazetteer]:
+    """Gazetteer shared by the process; (re)builds the index when a source is newer."""
+    try:
+        if _stale(index_path, source_path, pincode_path):
+            entries = build_index(load_source(source_path, pincode_path=pincode_path), index_path)
+            logger.info(f"🗺️ Built gazetteer index ({entries} entries)")
+        return Gazetteer(index_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"🗺️ Gazetteer unavailable, place names are not checked: {e}")
+        return None
+
+
+# -------------------------------------------------------------------
+# Benchmark
+# -------------------------------------------------------------------
+
+def benchmark(rounds: int = 20000) -> Dict[str, float]:
+    """µs per lookup for typical misheard / cross-script inputs."""
+    import timeit
+
+    gazetteer = load_gazetteer()
+    cases = {
+        "district (Mandiya)": lambda: gazetteer.match("district", "Mandiya"),
+        "district (ಮೈಸೂರು)": lambda: gazetteer.match("district", "ಮೈಸೂರು"),
+        "taluk in Mysuru (Hunsuru)": lambda: gazetteer.match("taluk", "Hunsuru", ("Mysuru",)),
+        "taluk, no district (Madhur)": lambda: gazetteer.match("taluk", "Madhur"),
+        "capture from transcript": lambda: gazetteer.find_in("district", "my district is mandya"),
+        "pincode (571105)": lambda: gazetteer.pincode("571105"),
+    }
+    return {name: round(timeit.timeit(fn, number=rounds) / rounds * 1e6, 2) for name, fn in cases.items()}
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "build":
+        entries = build_index(load_source(SOURCE_PATH, sys.argv[2] if len(sys.argv) > 2 else None))
+        print(f"Built {INDEX_PATH}: {entries} entries ({os.path.getsize(INDEX_PATH)} bytes)")
+    elif command == "pincodes":
+        print(f"Wrote {PINCODE_PATH}: {import_pincodes(sys.argv[2])} pincodes")
+    elif command == "benchmark":
+        for name, micros in benchmark().items():
+            print(f"  {name:<30} {micros:>7} µs")
@@ -0,0 +1,424 @@
+# utils/intent.py
+"""
+Local intent classifier for the greeter: contact / felling / unknown.
+
+A small multinomial naive Bayes model over word unigrams, word bigrams and
+character trigrams (the trigrams keep inflected Kannada words close to their
+stems, e.g. ಮರವನ್ನು → ಮರ). The trained model is a compact JSON file
+(data/intent_model.json) loaded once per worker process at prewarm.
+
+classify() returns a service (contact / felling) only when the model is
+confident and the request contains a keyword of that service (and none of
+the other); anything else, "unknown" included, returns None and the greeter
+falls back to the LLM ("what can you help me with" deserves an answer, not
+a refusal).
+
+    python -m utils.intent train       # rebuild data/intent_model.json
+    python -m utils.intent benchmark   # offline accuracy / latency on benchmark_corpus()
+"""
+
+import ast
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.normalizers import _tokens
+
+INTENTS = ("contact", "felling", "unknown")
+# Intents routed without the LLM
+LOCAL_INTENTS = ("contact", "felling")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "data", "intent_model.json")
+GREETER_TEST_PATH = os.path.join(BASE_DIR, "tests", "test_greeter_live_integration.py")
+
+# Posterior probability needed to route without the LLM
+MIN_CONFIDENCE = 0.85
+
+# Service keywords; Kannada entries are stems matched as token prefixes
+KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "contact": (
+        "complaint", "complain", "grievance", "inquiry", "enquiry", "feedback", "contact",
+        "information", "question", "report", "message",
+        "ದೂರು", "ಮಾಹಿತಿ", "ಸಂಪರ್ಕ", "ವಿಚಾರಣೆ", "ಪ್ರಶ್ನೆ", "ಅಭಿಪ್ರಾಯ",
+    ),
+    "felling": (
+        "tree", "trees", "cut", "cutting", "fell", "felling", "timber", "wood", "transit", "clearance",
+        "ಮರ", "ಕಡಿ", "ಸಾಗಣೆ", "ಅರಣ್ಯ",
+    ),
+}
+
+
+# -------------------------------------------------------------------
+# Training phrases
+# -------------------------------------------------------------------
+
+TRAINING_PHRASES: Dict[str, List[str]] = {
+    "contact": [
+        "I want to make a complaint",
+        "I have a complaint about a department",
+        "complaint about the forest office",
+        "I want to contact the department",
+        "I have a general inquiry",
+        "I want to ask a question",
+        "I need some information",
+        "I want to give feedback",
+        "feedback about your service",
+        "how do I reach the forest officer",
+        "I want to talk to someone in the department",
+        "I have a grievance",
+        "my application is delayed I want to complain",
+        "the officer did not respond to my letter",
+        "I want to send a message to the department",
+        "contact form please",
+        "general enquiry",
+        "I want to report a problem",
+        "ನಾನು ದೂರು ನೀಡಬೇಕು",
+        "ಇಲಾಖೆಯ ಬಗ್ಗೆ ದೂರು ಇದೆ",
+        "ನನಗೆ ಮಾಹಿತಿ ಬೇಕು",
+        "ನಾನು ಇಲಾಖೆಯನ್ನು ಸಂಪರ್ಕಿಸಬೇಕು",
+        "ಸಾಮಾನ್ಯ ವಿಚಾರಣೆ",
+        "ನನ್ನ ಅಭಿಪ್ರಾಯ ತಿಳಿಸಬೇಕು",
+        "ಅಧಿಕಾರಿಗಳನ್ನು ಸಂಪರ್ಕಿಸಲು ಬಯಸುತ್ತೇನೆ",
+        "ಒಂದು ಪ್ರಶ್ನೆ ಕೇಳಬೇಕು",
+    ],
+    "felling": [
+        "I need a tree cutting permission",
+        "I want to cut a tree",
+        "permission to cut trees on my land",
+        "tree felling permission",
+        "I want to fell a teak tree",
+        "felling transit permit",
+        "transit permission for timber",
+        "I need a forest clearance",
+        "how do I get permission to remove a tree",
+        "there is a tree on my farm I want to cut",
+        "apply for tree cutting",
+        "I want to cut down a coconut tree",
+        "permit to transport wood",
+        "tree removal permission",
+        "cutting rosewood trees in my field",
+        "felling form please",
+        "ಮರ ಕಡಿಯಲು ಅನುಮತಿ ಬೇಕು",
+        "ನನ್ನ ಜಮೀನಿನಲ್ಲಿ ಮರ ಕಡಿಯಬೇಕು",
+        "ಮರವನ್ನು ಕಡಿಯುವ ಅನುಮತಿ",
+        "ಮರ ಕಡಿಯುವ ಪರವಾನಗಿ",
+        "ಸಾಗಣೆ ಅನುಮತಿ ಬೇಕು",
+        "ಮರದ ಸಾಗಣೆ ಪರವಾನಗಿ",
+        "ತೇಗದ ಮರ ಕಡಿಯಬೇಕು",
+        "ಅರಣ್ಯ ಅನುಮತಿ ಬೇಕು",
+    ],
+    "unknown": [
+        "what is the weather today",
+        "tell me a joke",
+        "what is the stock price of apple",
+        "book a train ticket",
+        "who won the cricket match",
+        "play some music",
+        "what time is it",
+        "I want to order food",
+        "how do I apply for a passport",
+        "what is my bank balance",
+        "recommend a movie",
+        "how to reset my phone",
+        "what is the capital of france",
+        "ಇವತ್ತು ಹವಾಮಾನ ಹೇಗಿದೆ",
+        "ಒಂದು ಹಾಡು ಹಾಕಿ",
+        "ಕ್ರಿಕೆಟ್ ಪಂದ್ಯ ಯಾರು ಗೆದ್ದರು",
+        "ರೈಲು ಟಿಕೆಟ್ ಬುಕ್ ಮಾಡಿ",
+        "ಸಮಯ ಎಷ್ಟು",
+        "ಊಟ ಆರ್ಡರ್ ಮಾಡಬೇಕು",
+    ],
+}
+
+
+# -------------------------------------------------------------------
+# Features
+# -------------------------------------------------------------------
+
+def features(text: str) -> List[str]:
+    """Word unigrams, word bigrams and character trigrams of `text`."""
+    tokens = _tokens(text or "")
+    feats = [f"w:{tok}" for tok in tokens]
+    feats.extend(f"b:{a}_{b}" for a, b in zip(tokens, tokens[1:]))
+    for tok in tokens:
+        padded = f"^{tok}$"
+        feats.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return feats
+
+
+def keyword_hits(text: str) -> Dict[str, int]:
+    """Number of service keywords per intent found in `text`."""
+    tokens = _tokens(text or "")
+    return {
+        intent: sum(1 for tok in tokens if any(tok == kw or (not kw.isascii() and tok.startswith(kw)) for kw in words))
+        for intent, words in KEYWORDS.items()
+    }
+
+
+# -------------------------------------------------------------------
+# Model
+# -------------------------------------------------------------------
+
+@dataclass
+class IntentClassifier:
+    """Multinomial naive Bayes with Laplace smoothing."""
+
+    log_priors: Dict[str, float]
+    # intent → {feature: log P(feature | intent)}, only for features seen in training
+    log_likelihoods: Dict[str, Dict[str, float]]
+    # intent → log P(unseen feature | intent)
+    log_unseen: Dict[str, float]
+    vocabulary: frozenset
+    # Scores use the mean per-feature log-likelihood times this factor, which
+    # keeps correlated n-gram features from making every answer look certain
+    scale: float = 4.0
+
+    @classmethod
+    def train(cls, samples: Dict[str, Sequence[str]], alpha: float = 0.5) -> "IntentClassifier":
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        for intent, phrases in samples.items():
+            for phrase in phrases:
+                counts[intent].update(features(phrase))
+
+        vocabulary = frozenset(feat for counter in counts.values() for feat in counter)
+        total_phrases = sum(len(phrases) for phrases in samples.values())
+
+        log_priors, log_likelihoods, log_unseen = {}, {}, {}
+        for intent, phrases in samples.items():
+            denominator = sum(counts[intent].values()) + alpha * len(vocabulary)
+            log_priors[intent] = math.log(len(phrases) / total_phrases)
+            log_likelihoods[intent] = {
+                feat: math.log((count + alpha) / denominator) for feat, count in counts[intent].items()
+            }
+            log_unseen[intent] = math.log(alpha / denominator)
+
+        return cls(log_priors, log_likelihoods, log_unseen, vocabulary)
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Posterior probability per intent."""
+        feats = [feat for feat in features(text) if feat in self.vocabulary]
+        if not feats:
+            return {}
+
+        log_scores = {}
+        for intent, prior in self.log_priors.items():
+            table, unseen = self.log_likelihoods[intent], self.log_unseen[intent]
+            mean = sum(table.get(feat, unseen) for feat in feats) / len(feats)
+            log_scores[intent] = prior + self.scale * mean
+
+        top = max(log_scores.values())
+        exp = {intent: math.exp(score - top) for intent, score in log_scores.items()}
+        total = sum(exp.values())
+        return {intent: value / total for intent, value in exp.items()}
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Most likely intent and its probability ((None, 0.0) if no known feature)."""
+        scores = self.scores(text)
+        if not scores:
+            return None, 0.0
+        intent = max(scores, key=scores.get)
+        return intent, scores[intent]
+
+    def classify(self, text: str, min_confidence: float = MIN_CONFIDENCE) -> Optional[str]:
+        """Service to route to if the model is confident, else None (ask the LLM)."""
+        intent, confidence = self.predict(text)
+        if intent not in LOCAL_INTENTS or confidence < min_confidence:
+            return None
+
+        hits = keyword_hits(text)
+        others = [name for name in hits if name != intent]
+        if hits.get(intent) and not any(hits[name] for name in others):
+            return intent
+        return None
+
+    # ---------------------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "scale": self.scale,
+            "log_priors": self.log_priors,
+            "log_unseen": self.log_unseen,
+            "log_likelihoods": {
+                intent: {feat: round(value, 4) for feat, value in sorted(table.items())}
+                for intent, table in self.log_likelihoods.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IntentClassifier":
+        tables = data["log_likelihoods"]
+        vocabulary = frozenset(feat for table in tables.values() for feat in table)
+        return cls(data["log_priors"], tables, data["log_unseen"], vocabulary, data.get("scale", 4.0))
+
+    def save(self, path: str = MODEL_PATH) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "IntentClassifier":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+@lru_cache(maxsize=1)
+def load_intent_classifier(path: str = MODEL_PATH) -> IntentClassifier:
+    """Classifier shared by every session in the process (trained on the fly if the file is missing)."""
+    if os.path.exists(path):
+        return IntentClassifier.load(path)
+    return IntentClassifier.train(TRAINING_PHRASES)
+
+
+# -------------------------------------------------------------------
+# Offline benchmark
+# -------------------------------------------------------------------
+
+def greeter_test_phrases(path: str = GREETER_TEST_PATH) -> List[Tuple[str, str]]:
+    """(phrase, intent) pairs from the `<intent>_request = "..."` lines of the greeter live test."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    phrases = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Assign) or not isinstance(node.value, ast.Constant):
+            continue
+        for target in node.targets:
+            if isinstance(target, ast.Name) and target.id.endswith("_request") and isinstance(node.value.value, str):
+                phrases.append((node.value.value, target.id.split("_")[0]))
+    return phrases
+
+
+# Service requests not in TRAINING_PHRASES (held out), English and Kannada
+CORPUS_REQUESTS: Dict[str, Tuple[str, ...]] = {
+    "contact": (
+        "I would like to file a complaint", "I have an enquiry for the forest department",
+        "please take my feedback", "I want to contact an officer", "I need information about my application",
+        "I want to report an issue", "can I send a message to the range office", "I have a question for you",
+        "ದೂರು ದಾಖಲಿಸಬೇಕು", "ನನಗೆ ಕೆಲವು ಮಾಹಿತಿ ಬೇಕಾಗಿದೆ", "ಇಲಾಖೆಯನ್ನು ಸಂಪರ್ಕಿಸಲು ಬಯಸುತ್ತೇನೆ", "ನನ್ನ ಪ್ರಶ್ನೆ ಇದೆ",
+    ),
+    "felling": (
+        "I need permission to cut a mango tree", "I want to apply for tree felling", "I need a timber transit permit",
+        "permission for cutting trees in my plantation", "I want to fell two silver oak trees",
+        "how can I get clearance to remove trees", "I have to transport wood from my farm", "cutting a jackfruit tree",
+        "ಮರ ಕಡಿಯಲು ಅರ್ಜಿ ಹಾಕಬೇಕು", "ಮರದ ಸಾಗಣೆಗೆ ಅನುಮತಿ ಬೇಕು", "ಅರಣ್ಯ ಇಲಾಖೆಯ ಅನುಮತಿ ಬೇಕು", "ಎರಡು ಮರ ಕಡಿಯಬೇಕು",
+    ),
+    "unknown": (
+        "what is the weather tomorrow", "book a bus ticket to Mysuru", "who is the chief minister",
+        "play a kannada song", "how much is petrol today", "I want to renew my driving licence",
+        "find a hospital near me", "what is the news today",
+        "ನಾಳೆ ಮಳೆ ಬರುತ್ತದೆಯೇ", "ಬಸ್ ಟಿಕೆಟ್ ಬುಕ್ ಮಾಡಿ", "ಇಂದಿನ ಸುದ್ದಿ ಏನು", "ಹತ್ತಿರದ ಆಸ್ಪತ್ರೆ ಎಲ್ಲಿದೆ",
+    ),
+}
+
+# Field mentions appended to a request ({} = field name or Kannada label)
+FIELD_MENTIONS = {
+    "english": ("and I have my {} ready", "my {} is with me", "I can give the {}", "I will tell you the {}"),
+    "kannada": ("ನನ್ನ {} ಸಿದ್ಧವಿದೆ", "{} ಹೇಳುತ್ತೇನೆ", "ನನ್ನ ಬಳಿ {} ಇದೆ"),
+}
+UNKNOWN_MENTIONS = {
+    "english": ("please", "right now", "for my family", "as soon as possible"),
+    "kannada": ("ದಯವಿಟ್ಟು", "ಈಗಲೇ", "ನಮ್ಮ ಮನೆಗೆ"),
+}
+
+
+def _script(text: str) -> str:
+    return "kannada" if any("\u0c80" <= ch <= "\u0cff" for ch in text) else "english"
+
+
+def benchmark_corpus(distinct: int = 500, seed: int = 7) -> List[Tuple[str, str]]:
+    """
+    `distinct` different (request, intent) pairs: each form's held-out requests
+    combined with mentions of its fields, walked in field order, plus
+    off-topic requests. Same seed, same corpus.
+    """
+    import random
+
+    from models.registry import FORM_REGISTRY
+
+    rng = random.Random(seed)
+    pools: Dict[str, List[str]] = {}
+    corpus = {(text, intent) for intent in CORPUS_REQUESTS for text in CORPUS_REQUESTS[intent]}
+    for form_name, form_cls in FORM_REGISTRY.items():
+        schema = form_cls.schema()
+        pool = []
+        for name in schema.field_order:
+            label = schema.by_name[name].label.get("kannada")
+            mentions = []
+            for request in CORPUS_REQUESTS[form_name]:
+                language = _script(request)
+                field_text = name.replace("_", " ") if language == "english" else label
+                if field_text:
+                    mentions.extend(f"{request} {mention.format(field_text)}" for mention in FIELD_MENTIONS[language])
+            corpus.add((rng.choice(mentions), form_name))  # every field at least once
+            pool.extend(mentions)
+        pools[form_name] = pool
+    pools["unknown"] = [
+        f"{request} {mention}" for request in CORPUS_REQUESTS["unknown"] for mention in UNKNOWN_MENTIONS[_script(request)]
+    ]
+
+    # Every service is represented, in proportion to its pool but at least a sixth each
+    floor = distinct // 6
+    for intent, pool in sorted(pools.items()):
+        corpus.update((text, intent) for text in rng.sample(pool, min(floor, len(pool))))
+    rest = [(text, intent) for intent, pool in sorted(pools.items()) for text in pool]
+    rng.shuffle(rest)
+    for pair in rest:
+        if len(corpus) >= distinct:
+            break
+        corpus.add(pair)
+    return sorted(corpus)
+
+
+def benchmark(classifier: IntentClassifier, phrases: Iterable[Tuple[str, str]], repeat: int = 20) -> dict:
+    """Accuracy, LLM fallback / misroute rates and per-call latency of `classifier` on `phrases`."""
+    phrases = list(phrases)
+    correct = fallback = misrouted = 0
+    for text, expected in phrases:
+        intent = classifier.classify(text)
+        if intent is None:
+            fallback += 1
+        elif intent == expected:
+            correct += 1
+        else:
+            misrouted += 1
+
+    samples = []
+    for _ in range(repeat):
+        for text, _ in phrases:
+            start = time.perf_counter()
+            classifier.classify(text)
+            samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    total = len(phrases) or 1
+
+    return {
+        "phrases": len(phrases),
+        "accuracy": correct / total,
+        "llm_fallback_rate": fallback / total,
+        "misroute_rate": misrouted / total,
+        "mean_latency_us": sum(samples) / len(samples) if samples else 0.0,
+        "p50_latency_us": samples[len(samples) // 2] if samples else 0.0,
+        "p99_latency_us": samples[min(len(samples) - 1, int(0.99 * len(samples)))] if samples else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "benchmark"
+
+    if command == "train":
+        model = IntentClassifier.train(TRAINING_PHRASES)
+        model.save()
+        print(f"Saved {MODEL_PATH} ({os.path.getsize(MODEL_PATH)} bytes, {len(model.vocabulary)} features)")
+    else:
+        results = benchmark(load_intent_classifier(), benchmark_corpus() + greeter_test_phrases())
+        for key, value in results.items():
+            print(f"{key:20s} {value:.3f}" if isinstance(value, float) else f"{key:20s} {value}")
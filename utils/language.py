@@ -4,18 +4,31 @@ Language utilities for enforcing script consistency and normalizing STT outputs.
 Supports:
   - Force Romanization (ASCII/Latin-only for English)
   - Force Kannada Scripting (native Kannada script for Kannada)
-  - General text normalization
+  - General text normalization, one text or a batch
+
+Nothing in the live transcript path calls it yet (the fast-path parsers
+read the raw transcript, and transliterating "yes" or a Latin name to
+Kannada script would defeat them). It is kept cheap enough to run on every
+STT segment:
+  - regex patterns are compiled once at import
+  - indic-transliteration and its ITRANS → Kannada table are loaded on the
+    first Latin text that needs them, not at import
+  - Kannada transliteration is memoized per word, and normalize_text per
+    text (district names, "yes"/"no" and names repeat across sessions)
+
+    python -m utils.language benchmark
 """
 
 import re
-from typing import Literal
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Literal, Optional
 
-try:
-    # external lib for transliteration (Indic scripts)
-    from indic_transliteration import sanscript
-    from indic_transliteration.sanscript import transliterate
-except ImportError:
-    transliterate = None  # fallback if lib not installed
+# Cache sizes: whole texts (segments) and single words
+TEXT_CACHE_SIZE = 4096
+WORD_CACHE_SIZE = 16384
+
+_WHITESPACE = re.compile(r"\s+")
+_LATIN = re.compile(r"[A-Za-z]")
 
 
 # -------------------------------------------------------------------
@@ -26,9 +39,7 @@ def clean_text(text: str) -> str:
     """Trim spaces, normalize multiple spaces, strip weird chars."""
     if not text:
         return ""
-    text = text.strip()
-    text = re.sub(r"\s+", " ", text)
-    return text
+    return _WHITESPACE.sub(" ", text.strip())
 
 
 # -------------------------------------------------------------------
@@ -48,14 +59,41 @@ def force_romanization(text: str) -> str:
     text = clean_text(text)
 
     # remove all non-ascii
-    ascii_text = text.encode("ascii", "ignore").decode("ascii")
-    return ascii_text
+    if text.isascii():
+        return text
+    return text.encode("ascii", "ignore").decode("ascii")
 
 
 # -------------------------------------------------------------------
 # Kannada Scripting
 # -------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
+def _kannada_transliterator() -> Optional[Callable[[str], str]]:
+    """ITRANS → Kannada transliteration, imported and built on first use (None if not installed)."""
+    try:
+        # external lib for transliteration (Indic scripts)
+        from indic_transliteration import sanscript
+    except ImportError:
+        return None  # fallback if lib not installed
+
+    # Built once instead of on every transliterate() call
+    scheme_map = sanscript.SchemeMap(sanscript.SCHEMES[sanscript.ITRANS], sanscript.SCHEMES[sanscript.KANNADA])
+    return lambda text: sanscript.transliterate(text, scheme_map=scheme_map)
+
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def _kannada_word(word: str) -> str:
+    transliterate = _kannada_transliterator()
+    if transliterate is None or not _LATIN.search(word):
+        return word  # already Kannada (or another script): nothing to transliterate
+    try:
+        return transliterate(word)
+    except Exception:
+        # if transliteration fails, return original
+        return word
+
+
 def force_kannada_scripting(text: str) -> str:
     """
     Convert Latin text to Kannada script if possible.
@@ -66,27 +104,23 @@ def force_kannada_scripting(text: str) -> str:
         return ""
 
     text = clean_text(text)
-
-    if transliterate:
-        try:
-            return transliterate(text, sanscript.ITRANS, sanscript.KANNADA)
-        except Exception:
-            # if transliteration fails, return original
-            return text
-    else:
-        # fallback: return as-is
+    if not _LATIN.search(text):
         return text
+    # ITRANS never spans a space, so words are transliterated (and cached) one by one
+    return " ".join(_kannada_word(word) for word in text.split(" "))
 
 
 # -------------------------------------------------------------------
 # Normalization Dispatcher
 # -------------------------------------------------------------------
 
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
 def normalize_text(text: str, target_language: Literal["english", "kannada"]) -> str:
     """
     Normalize text based on selected target language.
     - english → force romanization (ASCII)
     - kannada → force Kannada script
+    Memoized: repeated segments cost a dict lookup.
     """
     if not text:
         return ""
@@ -101,69 +135,98 @@ def normalize_text(text: str, target_language: Literal["english", "kannada"]) ->
     return clean_text(text)
 
 
+def normalize_batch(texts: Iterable[str], target_language: Literal["english", "kannada"]) -> List[str]:
+    """Normalize many transcripts at once; each distinct text is normalized once."""
+    texts = list(texts)
+    normalized: Dict[str, str] = {text: normalize_text(text, target_language) for text in dict.fromkeys(texts)}
+    return [normalized[text] for text in texts]
+
+
 # -------------------------------------------------------------------
 # STT Language Updates
 # -------------------------------------------------------------------
 
 async def update_stt_language(session, language: str):
-    """Update STT language hints based on user's selected language"""
-    from livekit.plugins import soniox
+    """
+    Switch the session STT to the language's prebuilt options.
+    The live stream reconnects in place (see utils/stt_manager.py).
+    """
     import logging
-    
+    from utils.stt_manager import STT_MANAGER, ManagedSTT
+
     logger = logging.getLogger(__name__)
-    
+
     try:
-        if language.lower() == "kannada":
-            # Focus on Kannada with English fallback for mixed speech
-            language_hints = ["kn", "en"]
-            context = (
-                "Karnataka Government voice assistant in Kannada script. "
-                "Form filling: names, addresses, phone numbers, tree species, land measurements. "
-                "Common Kannada words: ಹೆಸರು, ವಿಳಾಸ, ಫೋನ್, ಗ್ರಾಮ, ತಾಲೂಕು, ಜಿಲ್ಲೆ, ಮರ, ವಯಸ್ಸು. "
-                "Mixed Kannada-English speech allowed."
-            )
-        else:
-            # ULTRA STRICT ENGLISH ONLY - NO OTHER LANGUAGES DETECTED
-            language_hints = ["en"]  # ABSOLUTELY ONLY English
-            context = (
-                "STRICT ENGLISH TRANSCRIPTION ONLY. IGNORE ALL OTHER LANGUAGES. "
-                "FORCE ROMANIZE: آفتاب حسین → Aftaab Hussain, محمد خاصم → Mohammed Khasim "
-                "DETECT LANGUAGE AS ENGLISH ONLY. DO NOT DETECT URDU, ARABIC, HINDI. "
-                "TRANSCRIBE ALL SPEECH AS ENGLISH WORDS IN LATIN SCRIPT. "
-                "COMMON INDIAN NAMES IN ENGLISH: Aftaab, Hussain, Mohammed, Khasim, Ahmed, Ali, Khan, Sheikh "
-                "WAIT FOR COMPLETE MULTI-WORD NAMES: FirstName LastName pattern. "
-                "EXAMPLES: Aftaab Hussain (complete), Mohammed Khasim (complete), Ahmed Ali (complete). "
-                "ABSOLUTELY FORBIDDEN: Arabic script آفتاب, Urdu script, Devanagari script. "
-                "MANDATORY: A-Z a-z 0-9 spaces only. English government form system. "
-                "OVERRIDE LANGUAGE DETECTION - FORCE ENGLISH OUTPUT REGARDLESS OF INPUT LANGUAGE."
-            )
-
-        # Create new STT options with updated language settings
-        new_soniox_options = soniox.STTOptions(
-            language_hints=language_hints,
-            context=context,
-        )
-
-        # Update the session's STT
-        session._stt = soniox.STT(params=new_soniox_options)
-        logger.info(f"Updated STT language hints to: {language_hints}")
-        
+        stt = session.stt
+        if not isinstance(stt, ManagedSTT):
+            logger.warning("Session STT is not managed, language hints unchanged")
+            return
+
+        STT_MANAGER.switch(stt, language.lower())
+        logger.info(f"Updated STT language hints to: {stt._params.language_hints}")
+
     except Exception as e:
         logger.error(f"Failed to update STT language: {e}")
 
 
 # -------------------------------------------------------------------
-# Example (manual test)
+# Benchmark
 # -------------------------------------------------------------------
-if __name__ == "__main__":
-    samples = [
-        "آفتاب حسین",   # Arabic script
-        "ಅಫ್ತಾಬ್ ಹುಸೈನ್",  # Kannada script
-        "Aftaab Hussain",  # Latin
+
+SAMPLES = [
+    "آفتاب حسین",   # Arabic script
+    "ಅಫ್ತಾಬ್ ಹುಸೈನ್",  # Kannada script
+    "Aftaab Hussain",  # Latin
+]
+
+
+def benchmark(segments: int = 20000, distinct: int = 500) -> Dict[str, float]:
+    """
+    µs per segment over a corpus of mixed Arabic / Kannada / Latin names and
+    places, `distinct` different segments repeated up to `segments`.
+    """
+    import random
+    import timeit
+
+    words = [
+        "آفتاب", "حسین", "محمد", "فاطمہ", "عبدالله",
+        "ಅಫ್ತಾಬ್", "ಹುಸೈನ್", "ರಮೇಶ್", "ಮೈಸೂರು", "ಮಂಡ್ಯ", "ಹುಣಸೂರು",
+        "Aftaab", "Hussain", "Ramesh", "Kumar", "Mysuru", "Mandya", "Hunsur", "yes", "no",
     ]
+    rng = random.Random(7)
+    pool = [
+        "  ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) + rng.choice(["", " ", "\t"])
+        for _ in range(distinct)
+    ] + SAMPLES
+    corpus = [rng.choice(pool) for _ in range(segments)]
+    uncached = normalize_text.__wrapped__
+
+    def per_segment(fn) -> float:
+        return round(timeit.timeit(fn, number=1) / len(corpus) * 1e6, 3)
+
+    results = {}
+    for language in ("english", "kannada"):
+        _kannada_word.cache_clear()
+        results[f"{language}_uncached_us"] = per_segment(lambda: [uncached(text, language) for text in corpus])
+        normalize_text.cache_clear()
+        _kannada_word.cache_clear()
+        # Includes the cold start: every distinct segment is normalized once
+        results[f"{language}_cached_us"] = per_segment(lambda: [normalize_text(text, language) for text in corpus])
+        results[f"{language}_batch_us"] = per_segment(lambda: normalize_batch(corpus, language))
+    results["transliteration"] = _kannada_transliterator() is not None
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] == ["benchmark"]:
+        for name, value in benchmark().items():
+            print(f"  {name:<22} {value}")
+        sys.exit()
 
-    for s in samples:
+    for s in SAMPLES:
         print("RAW:", s)
         print(" -> English:", normalize_text(s, "english"))
         print(" -> Kannada:", normalize_text(s, "kannada"))
-        print("---")
\ No newline at end of file
+        print("---")
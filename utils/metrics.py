@@ -0,0 +1,381 @@
+# utils/metrics.py
+"""
+Per-turn latency histograms with a local Prometheus scrape endpoint.
+
+Stages (seconds, one histogram per stage × agent × field × language):
+
+  end_of_utterance   VAD end of speech → user turn committed   (eou metrics)
+  stt_final          VAD end of speech → final transcript      (eou metrics)
+  llm_ttft           LLM time to first token                   (llm metrics)
+  tool_exec          form tool execution                       (form_engine)
+  frontend_publish   send_to_frontend publish_data call        (utils/frontend)
+  tts_ttfb           TTS time to first byte                    (tts metrics)
+
+Series for every registered agent/field/language are allocated at prewarm,
+so observing is a dict lookup and a few integer increments: no allocation
+and no logging per sample. Labels come from the session bound to the current
+task context (bind_session), i.e. the active agent, the field it is asking
+and the user's language.
+
+Sessions run in separate job processes, so one endpoint is served per
+worker, the same way Prometheus multiprocess mode does it: each job process
+writes a snapshot of its histograms to METRICS_DIR every METRICS_EXPORT_S
+seconds (and at exit), and the parent worker process serves /metrics by
+merging the snapshots. Each job process runs one session, so on every scrape
+the snapshots of processes that have exited are folded into one cumulative
+file and deleted, keeping the directory at one file per live job. The parent
+clears METRICS_DIR when it starts.
+
+    curl http://127.0.0.1:9464/metrics
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("end_of_utterance", "stt_final", "llm_ttft", "tool_exec", "frontend_publish", "tts_ttfb")
+LANGUAGES = ("", "english", "kannada")  # "" = not selected yet
+
+# Upper bounds in seconds (+Inf implied)
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0)
+
+METRIC_NAME = "voice_turn_stage_seconds"
+DEFAULT_PORT = int(os.getenv("METRICS_PORT", "9464"))
+# Per-process snapshots merged by the worker's endpoint
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(BASE_DIR, "data", "metrics"))
+EXPORT_INTERVAL = float(os.getenv("METRICS_EXPORT_S", "5"))
+# Counts of the job processes that have exited, in METRICS_DIR
+CUMULATIVE_FILE = "cumulative.json"
+
+Labels = Tuple[str, str, str, str]  # stage, agent, field, language
+
+
+class Series:
+    """Cumulative-at-render histogram counters for one label set."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * (buckets + 1)  # last slot = +Inf
+        self.total = 0.0
+        self.count = 0
+
+
+class LatencyHistograms:
+    """Fixed-bucket histograms keyed by (stage, agent, field, language)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self._series: Dict[Labels, Series] = {}
+        self._lock = threading.Lock()  # only taken when a new series is created
+
+    def preallocate(self, agents: Iterable[Tuple[str, Iterable[str]]], languages: Iterable[str] = LANGUAGES) -> int:
+        """Create the series for each (agent name, field names) × stage × language. Returns the total."""
+        languages = list(languages)
+        for agent, fields in agents:
+            for field_name in ("", *fields):
+                for language in languages:
+                    for stage in STAGES:
+                        self._get((stage, agent, field_name, language))
+        return len(self._series)
+
+    def _get(self, labels: Labels) -> Series:
+        series = self._series.get(labels)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(labels, Series(len(self.buckets)))
+        return series
+
+    def observe(self, stage: str, seconds: float, agent: str = "", field: str = "", language: str = "") -> None:
+        if seconds < 0:
+            return  # not measured (e.g. ttft of a cancelled generation)
+        series = self._get((stage, agent, field, language))
+        series.counts[bisect_left(self.buckets, seconds)] += 1
+        series.total += seconds
+        series.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Observed series as JSON-serializable data, for merge() in another process."""
+        return {
+            "buckets": list(self.buckets),
+            "series": [
+                [*labels, series.counts, series.total, series.count]
+                for labels, series in list(self._series.items())
+                if series.count
+            ],
+        }
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Add the counts of a snapshot() taken with the same buckets."""
+        if tuple(snapshot["buckets"]) != self.buckets:
+            raise ValueError("snapshot has different buckets")
+        for stage, agent, field_name, language, counts, total, count in snapshot["series"]:
+            series = self._get((stage, agent, field_name, language))
+            series.counts = [a + b for a, b in zip(series.counts, counts)]
+            series.total += total
+            series.count += count
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines = [
+            f"# HELP {METRIC_NAME} Voice turn latency per stage.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        for (stage, agent, field_name, language), series in list(self._series.items()):
+            if not series.count:
+                continue
+            labels = f'stage="{stage}",agent="{agent}",field="{field_name}",language="{language}"'
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series.counts):
+                cumulative += count
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{METRIC_NAME}_sum{{{labels}}} {series.total}")
+            lines.append(f"{METRIC_NAME}_count{{{labels}}} {series.count}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared histograms for the current worker process
+LATENCY = LatencyHistograms()
+
+
+# -------------------------------------------------------------------
+# Session labels
+# -------------------------------------------------------------------
+
+_SESSION: contextvars.ContextVar = contextvars.ContextVar("metrics_session", default=None)
+
+
+def bind_session(session) -> None:
+    """Label observations made from this task (and tasks it starts) with `session`'s state."""
+    _SESSION.set(session)
+
+
+def current_labels() -> Tuple[str, str, str]:
+    """(agent class, field being asked, language) of the bound session."""
+    session = _SESSION.get()
+    if session is None:
+        return "", "", ""
+    try:
+        agent = session.current_agent
+    except RuntimeError:
+        agent = None  # session not started yet
+    field_name = getattr(agent, "_turn_field", None) or getattr(agent, "_expected_field", None) or ""
+    language = getattr(session.userdata, "preferred_language", None) or ""
+    return type(agent).__name__ if agent is not None else "", field_name, language
+
+
+def observe(stage: str, seconds: float) -> None:
+    LATENCY.observe(stage, seconds, *current_labels())
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Observe the duration of the block under `stage`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+
+def on_metrics_collected(ev) -> None:
+    """session.on("metrics_collected") handler for the livekit pipeline metrics."""
+    metrics = ev.metrics
+    if metrics.type == "eou_metrics":
+        observe("end_of_utterance", metrics.end_of_utterance_delay)
+        observe("stt_final", metrics.transcription_delay)
+    elif metrics.type == "llm_metrics":
+        observe("llm_ttft", metrics.ttft)
+    elif metrics.type == "tts_metrics":
+        observe("tts_ttfb", metrics.ttfb)
+
+
+# -------------------------------------------------------------------
+# Per-process export
+# -------------------------------------------------------------------
+
+_export_path: Optional[str] = None
+
+
+def export_metrics(directory: str = METRICS_DIR, histograms: Optional[LatencyHistograms] = None) -> str:
+    """Write this process's snapshot to `directory` (atomically). Returns the file path."""
+    global _export_path
+    if _export_path is None or os.path.dirname(_export_path) != directory:
+        # pid + start time: a recycled pid never overwrites a finished process's counts
+        _export_path = os.path.join(directory, f"{os.getpid()}-{time.time_ns()}.json")
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{_export_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump((histograms or LATENCY).snapshot(), f)
+    os.replace(tmp, _export_path)
+    return _export_path
+
+
+def start_metrics_export(directory: str = METRICS_DIR, interval: float = EXPORT_INTERVAL) -> None:
+    """Export this job process's histograms every `interval` seconds and at exit, once per process."""
+    global _exporter
+    if _exporter is not None:
+        return
+
+    def _export() -> None:
+        try:
+            export_metrics(directory)
+        except OSError as e:
+            logger.warning(f"📈 Could not export latency metrics: {e}")
+
+    def _loop() -> None:
+        while True:
+            time.sleep(interval)
+            _export()
+
+    _exporter = threading.Thread(target=_loop, name="metrics-export", daemon=True)
+    _exporter.start()
+    atexit.register(_export)
+
+
+_exporter: Optional[threading.Thread] = None
+
+
+def _snapshot_pid(name: str) -> Optional[int]:
+    """pid of a `<pid>-<ns>.json` snapshot, None for other files."""
+    pid, sep, rest = name.partition("-")
+    return int(pid) if sep and pid.isdigit() and rest.endswith(".json") else None
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_fold_lock = threading.Lock()
+
+
+def fold_finished(directory: str = METRICS_DIR) -> int:
+    """
+    Add the snapshots of exited processes (their last export was at exit)
+    to CUMULATIVE_FILE and delete them. Returns how many were folded.
+    """
+    with _fold_lock:
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return 0
+        finished = [name for name in names if (pid := _snapshot_pid(name)) is not None and not _alive(pid)]
+        if not finished:
+            return 0
+
+        cumulative = LatencyHistograms(LATENCY.buckets)
+        for name in (CUMULATIVE_FILE, *finished):
+            try:
+                with open(os.path.join(directory, name), encoding="utf-8") as f:
+                    cumulative.merge(json.load(f))
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as e:
+                logger.warning(f"📈 Dropped metrics snapshot {name}: {e}")
+        path = os.path.join(directory, CUMULATIVE_FILE)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(cumulative.snapshot(), f)
+        os.replace(f"{path}.tmp", path)
+        for name in finished:
+            os.remove(os.path.join(directory, name))
+        return len(finished)
+
+
+def collect(directory: str = METRICS_DIR) -> LatencyHistograms:
+    """This process's histograms merged with the cumulative file and the live snapshots in `directory`."""
+    try:
+        fold_finished(directory)
+    except OSError as e:
+        logger.warning(f"📈 Could not fold finished metrics snapshots: {e}")
+    merged = LatencyHistograms(LATENCY.buckets)
+    merged.merge(LATENCY.snapshot())
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                merged.merge(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"📈 Skipped metrics snapshot {name}: {e}")
+    return merged
+
+
+# -------------------------------------------------------------------
+# Scrape endpoint
+# -------------------------------------------------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = collect(_directory).render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # no access log per scrape
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_directory = METRICS_DIR
+
+
+def start_metrics_server(port: int = DEFAULT_PORT, host: str = "127.0.0.1", directory: str = METRICS_DIR) -> Optional[int]:
+    """
+    Serve /metrics from a daemon thread of the worker's parent process,
+    merging the job processes' snapshots in `directory` (cleared first).
+    Returns the bound port, None if it is taken.
+    """
+    global _server, _directory
+    if _server is not None:
+        return _server.server_address[1]
+
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith((".json", ".tmp")):
+            os.remove(os.path.join(directory, name))  # left by a previous worker
+    _directory = directory
+
+    try:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"📈 Metrics port {port} unavailable ({e}), endpoint disabled")
+        return None
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"📈 Latency metrics on http://{host}:{port}/metrics")
+    return port
+
+
+def agent_fields(agent_classes: Iterable[type]) -> List[Tuple[str, List[str]]]:
+    """(agent name, field names) for preallocate()."""
+    result = []
+    for agent_cls in agent_classes:
+        form_cls = getattr(agent_cls, "form_class", None)
+        fields = form_cls.schema().field_order if form_cls is not None else []
+        result.append((agent_cls.__name__, fields))
+    return result
@@ -0,0 +1,245 @@
+# utils/normalizers.py
+"""
+Deterministic normalizers for spoken form answers.
+Turns final STT transcripts into field values without an LLM round trip:
+  - Digit strings (mobile numbers, pincodes, khata numbers)
+  - Small numbers (guntas, anna)
+  - Spoken email addresses ("john dot doe at gmail dot com")
+  - Yes / No answers
+English and Kannada number words are both supported.
+Every parser returns None when it is not confident, so callers can fall back to the LLM.
+"""
+
+import re
+from typing import List, Optional
+
+# -------------------------------------------------------------------
+# Vocabulary
+# -------------------------------------------------------------------
+
+UNITS = {
+    "zero": 0, "oh": 0, "o": 0, "one": 1, "two": 2, "three": 3, "four": 4,
+    "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    # Kannada
+    "ಸೊನ್ನೆ": 0, "ಶೂನ್ಯ": 0, "ಒಂದು": 1, "ಎರಡು": 2, "ಮೂರು": 3, "ನಾಲ್ಕು": 4,
+    "ಐದು": 5, "ಆರು": 6, "ಏಳು": 7, "ಎಂಟು": 8, "ಒಂಬತ್ತು": 9,
+}
+
+TEENS = {
+    "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    # Kannada
+    "ಹತ್ತು": 10, "ಹನ್ನೊಂದು": 11, "ಹನ್ನೆರಡು": 12, "ಹದಿಮೂರು": 13, "ಹದಿನಾಲ್ಕು": 14,
+    "ಹದಿನೈದು": 15, "ಹದಿನಾರು": 16, "ಹದಿನೇಳು": 17, "ಹದಿನೆಂಟು": 18, "ಹತ್ತೊಂಬತ್ತು": 19,
+}
+
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+    # Kannada
+    "ಇಪ್ಪತ್ತು": 20, "ಮೂವತ್ತು": 30, "ನಲವತ್ತು": 40, "ಐವತ್ತು": 50,
+    "ಅರವತ್ತು": 60, "ಎಪ್ಪತ್ತು": 70, "ಎಂಬತ್ತು": 80, "ತೊಂಬತ್ತು": 90,
+}
+
+MULTIPLIERS = {"hundred": 100, "ನೂರು": 100, "thousand": 1000, "ಸಾವಿರ": 1000, "lakh": 100000, "ಲಕ್ಷ": 100000}
+
+REPEATS = {"double": 2, "triple": 3}
+
+# Words that may surround a spoken value without changing it
+FILLERS = {
+    "my", "the", "is", "it", "its", "it's", "number", "no", "num", "code", "pin", "pincode",
+    "mobile", "phone", "khata", "guntas", "gunta", "anna", "annas", "acres", "acre",
+    "ok", "okay", "uh", "um", "sir", "madam", "and", "of",
+    # Kannada
+    "ನನ್ನ", "ಸಂಖ್ಯೆ", "ನಂಬರ್", "ಪಿನ್", "ಕೋಡ್", "ಗುಂಟೆ", "ಅಣ್ಣಾ", "ಮೊಬೈಲ್", "ಖಾತೆ",
+}
+
+YES_WORDS = {
+    "yes", "yeah", "yep", "yup", "haan", "han", "ha", "sure", "correct", "right",
+    "ಹೌದು", "ಹೌದ್", "ಹೂಂ", "ಇದೆ", "ಸರಿ",
+}
+NO_WORDS = {"no", "nope", "nah", "not", "illa", "ಇಲ್ಲ", "ಇಲ್ಲಾ", "ಬೇಡ"}
+
+# "correct" is not one: "yes, that's correct" confirms (see YES_WORDS)
+CORRECTION_WORDS = {
+    "change", "correction", "wrong", "mistake", "actually", "instead", "edit", "fix",
+    "ಬದಲಾಯಿಸಿ", "ಬದಲಿಸಿ", "ತಪ್ಪು", "ತಪ್ಪಾಗಿದೆ", "ಸರಿಪಡಿಸಿ", "ತಿದ್ದಿ",
+}
+
+EMAIL_FILLERS = {"my", "email", "e-mail", "mail", "id", "address", "is", "it", "it's", "its", "ನನ್ನ", "ಇಮೇಲ್", "ಐಡಿ"}
+
+SPOKEN_EMAIL_SYMBOLS = {
+    "at": "@", "ಅಟ್": "@",
+    "dot": ".", "ಡಾಟ್": ".", "period": ".",
+    "underscore": "_", "dash": "-", "hyphen": "-",
+}
+
+EMAIL_SEPARATORS = {".", "_", "-"}
+EMAIL_PATTERN = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+
+_KANNADA_DIGITS = str.maketrans("೦೧೨೩೪೫೬೭೮೯", "0123456789")
+_PUNCTUATION = re.compile(r"[,;:!?\"()\[\]]|(?<!\d)\.|\.(?!\d)")
+_SPLIT_DIGITS = re.compile(r"(?<=\d)-(?=\d)")
+
+
+# -------------------------------------------------------------------
+# Tokenization
+# -------------------------------------------------------------------
+
+def _tokens(text: str) -> List[str]:
+    """Lowercase, map Kannada digits, drop punctuation and split on whitespace."""
+    text = text.translate(_KANNADA_DIGITS).lower()
+    text = _SPLIT_DIGITS.sub(" ", text)
+    text = _PUNCTUATION.sub(" ", text)
+    return text.split()
+
+
+def _number_groups(tokens: List[str]) -> Optional[List[str]]:
+    """
+    Convert spoken number tokens into a list of digit groups.
+    "nine eight four five" → ["9", "8", "4", "5"]
+    "forty five"           → ["45"]
+    "double seven 12"      → ["77", "12"]
+    Returns None if a token is neither a number word nor a filler.
+    """
+    groups: List[str] = []
+    current: Optional[int] = None
+    repeat = 1
+
+    def flush():
+        nonlocal current
+        if current is not None:
+            groups.append(str(current))
+            current = None
+
+    for tok in tokens:
+        if tok.isdigit():
+            flush()
+            groups.append(tok * repeat)
+            repeat = 1
+        elif tok in REPEATS:
+            flush()
+            repeat = REPEATS[tok]
+        elif tok in UNITS or tok in TEENS or tok in TENS:
+            value = UNITS.get(tok, TEENS.get(tok, TENS.get(tok)))
+            if repeat > 1 and value < 10:
+                flush()
+                groups.append(str(value) * repeat)
+                repeat = 1
+                continue
+            composes = current is not None and (
+                (value < 10 and current >= 20 and current % 10 == 0 and current % 100 != 0)
+                or (value < 100 and current >= 100 and current % 100 == 0)
+            )
+            if composes:
+                current += value
+            else:
+                flush()
+                current = value
+        elif tok in MULTIPLIERS:
+            current = (current or 1) * MULTIPLIERS[tok]
+        elif tok in FILLERS:
+            continue
+        else:
+            return None
+
+    if repeat > 1:
+        return None
+    flush()
+    return groups
+
+
+# -------------------------------------------------------------------
+# Field parsers
+# -------------------------------------------------------------------
+
+def parse_digits(text: str, length: Optional[int] = None, min_length: int = 1) -> Optional[str]:
+    """
+    Parse a spoken digit string (mobile number, pincode, khata number).
+    With `length`, the result must have exactly that many digits.
+    """
+    if not text:
+        return None
+    groups = _number_groups(_tokens(text))
+    if not groups:
+        return None
+
+    digits = "".join(groups)
+    if length is not None and len(digits) != length:
+        return None
+    if len(digits) < min_length:
+        return None
+    return digits
+
+
+def parse_number(text: str) -> Optional[str]:
+    """Parse a single spoken quantity ("twenty five", "10 guntas", "ಹತ್ತು") → "25"."""
+    if not text:
+        return None
+    groups = _number_groups(_tokens(text))
+    if not groups or len(groups) != 1:
+        return None
+    return str(int(groups[0]))
+
+
+def parse_email(text: str) -> Optional[str]:
+    """
+    Parse a spoken email address.
+    "john dot doe at gmail dot com" → "john.doe@gmail.com"
+    """
+    if not text:
+        return None
+
+    words = []
+    for tok in text.lower().replace(" at the rate ", " at ").split():
+        tok = tok.strip(",!?")
+        words.append(SPOKEN_EMAIL_SYMBOLS.get(tok, tok))
+
+    # An email already written out by the STT
+    for word in words:
+        candidate = word.rstrip(".")
+        if "@" in candidate and EMAIL_PATTERN.match(candidate):
+            return candidate
+
+    if words.count("@") != 1:
+        return None
+
+    # Grow the address outwards from "@" while words are joined by separators
+    at = words.index("@")
+    if at == 0 or at == len(words) - 1:
+        return None
+    start = at - 1
+    while start >= 2 and words[start - 1] in EMAIL_SEPARATORS:
+        start -= 2
+    end = at + 1
+    while end + 2 < len(words) and words[end + 1] in EMAIL_SEPARATORS:
+        end += 2
+
+    # Anything outside the address must be filler, otherwise the split is a guess
+    if any(w not in EMAIL_FILLERS for w in words[:start] + words[end + 1:]):
+        return None
+
+    email = "".join(words[start:end + 1])
+    return email if EMAIL_PATTERN.match(email) else None
+
+
+def parse_yes_no(text: str) -> Optional[str]:
+    """Parse a short yes/no answer in English or Kannada → "Yes" | "No"."""
+    if not text:
+        return None
+    tokens = _tokens(text)
+    if not tokens or len(tokens) > 4:
+        return None
+
+    said_yes = any(tok in YES_WORDS for tok in tokens)
+    said_no = any(tok in NO_WORDS for tok in tokens)
+    if said_yes == said_no:
+        return None
+    return "Yes" if said_yes else "No"
+
+
+def is_correction(text: str) -> bool:
+    """True if the user is asking to change something they already answered."""
+    if not text:
+        return False
+    return any(tok in CORRECTION_WORDS for tok in _tokens(text))
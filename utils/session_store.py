@@ -0,0 +1,504 @@
+# utils/session_store.py
+"""
+Crash-safe session state.
+
+A session's language, active form, the field being asked and the form values
+are persisted so a session whose job process died, or whose user dropped off
+the network, resumes at the next missing field instead of starting over.
+
+Write-behind: nothing is written from the audio/tool path. SessionPersister
+polls the tracked sessions every `interval` seconds, collects what changed
+(form fields from the form's dirty set, see models/base_form.py, plus the
+conversation state) and writes all sessions' changes in one batch from a
+worker thread. Failed batches are kept and merged into the next one.
+
+Backends (SESSION_STORE):
+
+  sqlite[:path]   default, data/sessions.db; one row per session and one
+                  per (session, form, field), upserted
+  file[:path]     append-only JSON lines, replayed on load
+  none            persistence disabled
+
+Sessions are keyed by room name. A reconnect under a new room name is
+matched by participant identity (most recent session of that participant).
+Submitted sessions are deleted; others expire after SESSION_TTL_HOURS.
+
+    python -m utils.session_store compact   # rewrite the append-only log
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+SESSION_STORE = os.getenv("SESSION_STORE", "sqlite")
+# Write-behind interval: the most recent changes a crash can lose
+FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_MS", "500")) / 1000
+SESSION_TTL = float(os.getenv("SESSION_TTL_HOURS", "24")) * 3600
+
+
+@dataclass
+class SessionRecord:
+    """
+    Persisted session state. Written as a delta (only the changed form
+    fields), loaded as the merged state.
+    """
+
+    key: str
+    participant: Optional[str] = None
+    agent_type: Optional[str] = None
+    preferred_language: Optional[str] = None
+    language_selected: bool = False
+    current_field: Optional[str] = None
+    # form name → {field: value}
+    forms: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    updated_at: float = 0.0
+
+    def state(self) -> Tuple[Any, ...]:
+        return self.participant, self.agent_type, self.preferred_language, self.language_selected, self.current_field
+
+    def merge(self, newer: "SessionRecord") -> "SessionRecord":
+        """`newer` on top of this record (state replaced, form fields merged)."""
+        forms = {name: dict(values) for name, values in self.forms.items()}
+        for name, values in newer.forms.items():
+            forms.setdefault(name, {}).update(values)
+        return SessionRecord(
+            key=newer.key,
+            participant=newer.participant or self.participant,
+            agent_type=newer.agent_type,
+            preferred_language=newer.preferred_language,
+            language_selected=newer.language_selected,
+            current_field=newer.current_field,
+            forms=forms,
+            updated_at=newer.updated_at,
+        )
+
+
+# -------------------------------------------------------------------
+# Backends
+# -------------------------------------------------------------------
+
+class SessionStore:
+    """Storage backend interface. Called from worker threads, one call at a time per store."""
+
+    def write(self, records: Iterable[SessionRecord]) -> None:
+        raise NotImplementedError
+
+    def delete(self, keys: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def load(self, key: str, participant: Optional[str] = None) -> Optional[SessionRecord]:
+        """The session stored under `key`, else the participant's most recent one."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteSessionStore(SessionStore):
+    """Local SQLite database (WAL), shared by the worker processes of a host."""
+
+    def __init__(self, path: str = os.path.join(DATA_DIR, "sessions.db"), ttl: float = SESSION_TTL) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    key TEXT PRIMARY KEY,
+                    participant TEXT,
+                    agent_type TEXT,
+                    preferred_language TEXT,
+                    language_selected INTEGER NOT NULL DEFAULT 0,
+                    current_field TEXT,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS sessions_participant ON sessions (participant, updated_at);
+                CREATE TABLE IF NOT EXISTS session_fields (
+                    key TEXT NOT NULL,
+                    form TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    value TEXT,
+                    PRIMARY KEY (key, form, field)
+                ) WITHOUT ROWID;
+                """
+            )
+            self._expire()
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl
+        self._db.execute("BEGIN")
+        self._db.execute("DELETE FROM session_fields WHERE key IN (SELECT key FROM sessions WHERE updated_at < ?)", (cutoff,))
+        self._db.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+        self._db.execute("COMMIT")
+
+    def write(self, records: Iterable[SessionRecord]) -> None:
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for record in records:
+                    self._db.execute(
+                        "INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                        "participant = COALESCE(excluded.participant, participant), agent_type = excluded.agent_type, "
+                        "preferred_language = excluded.preferred_language, language_selected = excluded.language_selected, "
+                        "current_field = excluded.current_field, updated_at = excluded.updated_at",
+                        (record.key, record.participant, record.agent_type, record.preferred_language,
+                         int(record.language_selected), record.current_field, record.updated_at),
+                    )
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO session_fields VALUES (?, ?, ?, ?)",
+                        [
+                            (record.key, form_name, name, json.dumps(value, ensure_ascii=False))
+                            for form_name, values in record.forms.items()
+                            for name, value in values.items()
+                        ],
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def delete(self, keys: Iterable[str]) -> None:
+        keys = [(key,) for key in keys]
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany("DELETE FROM session_fields WHERE key = ?", keys)
+            self._db.executemany("DELETE FROM sessions WHERE key = ?", keys)
+            self._db.execute("COMMIT")
+
+    def load(self, key: str, participant: Optional[str] = None) -> Optional[SessionRecord]:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            row = self._db.execute("SELECT * FROM sessions WHERE key = ? AND updated_at >= ?", (key, cutoff)).fetchone()
+            if row is None and participant:
+                row = self._db.execute(
+                    "SELECT * FROM sessions WHERE participant = ? AND updated_at >= ? ORDER BY updated_at DESC LIMIT 1",
+                    (participant, cutoff),
+                ).fetchone()
+            if row is None:
+                return None
+            fields = self._db.execute("SELECT form, field, value FROM session_fields WHERE key = ?", (row[0],)).fetchall()
+
+        record = SessionRecord(*row[:4], bool(row[4]), row[5], updated_at=row[6])
+        for form_name, name, value in fields:
+            record.forms.setdefault(form_name, {})[name] = json.loads(value)
+        return record
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class FileSessionStore(SessionStore):
+    """Append-only JSON-lines log. Every write appends; load replays the log."""
+
+    def __init__(self, path: str = os.path.join(DATA_DIR, "sessions.jsonl"), ttl: float = SESSION_TTL) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def _append(self, lines: List[str]) -> None:
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def write(self, records: Iterable[SessionRecord]) -> None:
+        self._append([json.dumps(asdict(record), ensure_ascii=False) + "\n" for record in records])
+
+    def delete(self, keys: Iterable[str]) -> None:
+        self._append([json.dumps({"key": key, "deleted": True}) + "\n" for key in keys])
+
+    def replay(self) -> Dict[str, SessionRecord]:
+        """Current state of every live session in the log."""
+        sessions: Dict[str, SessionRecord] = {}
+        try:
+            with self._lock, open(self.path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return sessions
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn last line after a crash
+            key = entry.get("key")
+            if entry.get("deleted"):
+                sessions.pop(key, None)
+                continue
+            record = SessionRecord(**entry)
+            sessions[key] = sessions[key].merge(record) if key in sessions else record
+
+        cutoff = time.time() - self.ttl
+        return {key: record for key, record in sessions.items() if record.updated_at >= cutoff}
+
+    def load(self, key: str, participant: Optional[str] = None) -> Optional[SessionRecord]:
+        sessions = self.replay()
+        if key in sessions:
+            return sessions[key]
+        candidates = [record for record in sessions.values() if participant and record.participant == participant]
+        return max(candidates, key=lambda record: record.updated_at) if candidates else None
+
+    def compact(self) -> int:
+        """Rewrite the log with one line per live session. Run with no workers writing."""
+        sessions = self.replay()
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(asdict(record), ensure_ascii=False) + "\n" for record in sessions.values())
+        os.replace(tmp, self.path)
+        return len(sessions)
+
+
+def open_store(spec: str = SESSION_STORE) -> Optional[SessionStore]:
+    """Backend for a SESSION_STORE value ("sqlite", "sqlite:<path>", "file", "file:<path>", "none")."""
+    kind, _, path = spec.partition(":")
+    if kind == "sqlite":
+        return SQLiteSessionStore(path) if path else SQLiteSessionStore()
+    if kind == "file":
+        return FileSessionStore(path) if path else FileSessionStore()
+    if kind in ("", "none"):
+        return None
+    raise ValueError(f"Unknown session store: {spec}")
+
+
+# -------------------------------------------------------------------
+# Write-behind
+# -------------------------------------------------------------------
+
+class _Tracked:
+    __slots__ = ("userdata", "state")
+
+    def __init__(self, userdata) -> None:
+        self.userdata = userdata
+        self.state: Optional[Tuple[Any, ...]] = None
+
+
+def participant_identity(userdata) -> Optional[str]:
+    """Identity of the (first) remote participant in the session's room."""
+    room = getattr(userdata.ctx, "room", None)
+    participants = getattr(room, "remote_participants", None) or {}
+    return next(iter(participants), None)
+
+
+class SessionPersister:
+    """Tracks live sessions and writes their changes behind, in batches."""
+
+    def __init__(self, spec: str = SESSION_STORE, interval: float = FLUSH_INTERVAL) -> None:
+        self.spec = spec
+        self.interval = interval
+        self._store: Optional[SessionStore] = None
+        self._opened = False
+        self._open_lock = threading.Lock()
+        self._tracked: Dict[str, _Tracked] = {}
+        self._pending: Dict[str, SessionRecord] = {}
+        self._deletes: set = set()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.records = 0
+        self.failures = 0
+        self.last_write_ms = 0.0
+
+    @property
+    def store(self) -> Optional[SessionStore]:
+        """
+        Backend, opened on first use (None if disabled or unavailable).
+        Opening touches the disk, so only from a worker thread or prewarm; see
+        open_sync() and open().
+        """
+        with self._open_lock:
+            if not self._opened:
+                try:
+                    self._store = open_store(self.spec)
+                except Exception as e:
+                    logger.error(f"❌ Session store '{self.spec}' unavailable, sessions will not be persisted: {e}")
+                self._opened = True
+        return self._store
+
+    def open_sync(self) -> Optional[SessionStore]:
+        """Open the backend now, blocking (prewarm). Returns it, None if disabled or unavailable."""
+        return self.store
+
+    async def open(self) -> Optional[SessionStore]:
+        """The backend, opened in a worker thread if prewarm has not done it."""
+        if self._opened:
+            return self._store
+        return await asyncio.to_thread(self.open_sync)
+
+    # ---------------------------------------------------------------
+    # Resume
+    # ---------------------------------------------------------------
+
+    async def restore(
+        self,
+        userdata,
+        key: str,
+        participant: Optional[str] = None,
+        agent_type: Optional[str] = None,
+    ) -> bool:
+        """
+        Fill `userdata` from the stored session for `key`/`participant`.
+        With `agent_type`, only a session of that agent is resumed. Returns True if resumed.
+        """
+        store = await self.open()
+        if store is None:
+            return False
+        try:
+            record = await asyncio.to_thread(store.load, key, participant)
+        except Exception as e:
+            logger.error(f"❌ Failed to load session {key}: {e}")
+            return False
+        if record is None:
+            return False
+        if agent_type is not None and record.agent_type != agent_type:
+            logger.info(f"💾 Not resuming session {record.key} ({record.agent_type}): room asked for {agent_type}")
+            return False
+
+        userdata.agent_type = record.agent_type
+        userdata.preferred_language = record.preferred_language
+        userdata.language_selected = record.language_selected
+        userdata.current_field = record.current_field
+        for form_name, values in record.forms.items():
+            form = userdata.get_form(form_name)
+            if form is None:
+                continue
+            known = form.schema().by_name
+            form.apply_updates({name: value for name, value in values.items() if name in known})
+            if record.key == key:
+                form.mark_synced()  # already stored under this key
+        if record.key != key:
+            # Reconnected under a new room: the restored fields stay dirty and
+            # are rewritten under `key` by the first flush
+            self._deletes.add(record.key)
+        userdata.resumed = True
+        logger.info(f"💾 Resumed session {record.key} ({record.agent_type}, {record.preferred_language})")
+        return True
+
+    # ---------------------------------------------------------------
+    # Tracking
+    # ---------------------------------------------------------------
+
+    def track(self, userdata, key: str) -> None:
+        """Persist `userdata` under `key` until release()."""
+        if self._opened and self._store is None:
+            return  # disabled or unavailable
+        self._tracked[key] = _Tracked(userdata)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def release(self, key: str) -> None:
+        """Write the session's last changes and stop tracking it."""
+        if key not in self._tracked:
+            return
+        await self.flush()
+        self._tracked.pop(key, None)
+        if not self._tracked and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _collect(self, key: str, tracked: _Tracked) -> None:
+        userdata = tracked.userdata
+        if userdata.should_submit:
+            # Submitted: nothing to resume
+            self._deletes.add(key)
+            self._pending.pop(key, None)
+            return
+
+        forms = {}
+        for form_name, form in userdata.all_forms().items():
+            changed = form.mark_synced()
+            if changed:
+                forms[form_name] = changed
+        record = SessionRecord(
+            key=key,
+            participant=participant_identity(userdata),
+            agent_type=userdata.agent_type,
+            preferred_language=userdata.preferred_language,
+            language_selected=userdata.language_selected,
+            current_field=userdata.current_field,
+            forms=forms,
+        )
+        if not forms and record.state() == tracked.state:
+            return
+        tracked.state = record.state()
+        record.updated_at = time.time()
+        self._pending[key] = self._pending[key].merge(record) if key in self._pending else record
+
+    async def flush(self) -> None:
+        """Collect every tracked session's changes and write them in one batch."""
+        async with self._lock:
+            for key, tracked in list(self._tracked.items()):
+                self._collect(key, tracked)
+            if not self._pending and not self._deletes:
+                return
+
+            pending, self._pending = self._pending, {}
+            deletes, self._deletes = self._deletes, set()
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write, list(pending.values()), deletes)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"❌ Session store write failed, retrying with the next batch: {e}")
+                for key, record in pending.items():
+                    self._pending[key] = record.merge(self._pending[key]) if key in self._pending else record
+                self._deletes |= deletes
+                return
+
+            self.last_write_ms = (time.perf_counter() - started) * 1000
+            self.batches += 1
+            self.records += len(pending)
+
+    def _write(self, records: List[SessionRecord], deletes: set) -> None:
+        store = self.store
+        if store is None:
+            return
+        if deletes:
+            store.delete(deletes)
+        if records:
+            store.write(records)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "tracked": len(self._tracked),
+            "batches": self.batches,
+            "records": self.records,
+            "failures": self.failures,
+            "last_write_ms": round(self.last_write_ms, 2),
+        }
+
+
+# Shared persister for the current worker process
+SESSIONS = SessionPersister()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if (sys.argv[1] if len(sys.argv) > 1 else "") == "compact":
+        store = open_store()
+        if not isinstance(store, FileSessionStore):
+            sys.exit("compact only applies to the append-only file store (SESSION_STORE=file)")
+        print(f"Compacted {store.path}: {store.compact()} live sessions")
@@ -0,0 +1,282 @@
+# utils/stt_manager.py
+"""
+Per-process Soniox STT manager.
+
+Switching language used to build a brand new soniox.STT and assign it to the
+session, which the running stream never saw (and the next one paid a cold
+start for). SttManager instead:
+
+  - keeps one prebuilt STTOptions per (profile, language); a profile is the
+    session STT or one form agent's STT, each with its own context texts
+  - hands out ManagedSTT clients that remember their live streams
+  - switches a client in place: its options are swapped for the prebuilt
+    set and each live stream reconnects its websocket with the new language
+    hints / context, on the same stream and HTTP session. Audio pushed while
+    the socket is re-opened stays buffered in the stream's input channel.
+
+Form agents also focus the STT on the field being asked: its SpeechProfile
+(models/schema.py) sets the endpoint delay and replaces the context with the
+field's expected vocabulary. Option sets are keyed (profile, language,
+speech profile), so consecutive fields with the same profile cost nothing.
+Soniox reads its config when the websocket opens, and a reconnect per field
+would cost more than it saves, so focus usually only swaps the options: live
+streams keep their socket and pick the field options up at their next connect
+(a language switch or a dropped connection). The exception is a field that
+needs a longer endpoint delay than the socket was opened with (a name after
+a yes/no question, an address): the short delay would cut the answer off,
+so those streams reconnect.
+
+Switch timings (options swap, or request → new socket configured when a
+stream is live) are logged and kept in `stats()`; per-field turn latency
+(end of utterance delay, and the silence saved against the session default,
+negative for fields that wait longer) in `field_report()`.
+"""
+
+import logging
+import time
+import weakref
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions
+from livekit.plugins import soniox
+from livekit.plugins.soniox.stt import SpeechStream
+
+from models.schema import SpeechProfile
+
+logger = logging.getLogger(__name__)
+
+# (language hints, context) for one language; language None = not chosen yet
+OptionsBuilder = Callable[[Optional[str]], Tuple[Iterable[str], str]]
+
+# Profile of the session-level STT (greeter and agents without their own STT)
+SESSION_PROFILE = "session"
+
+SESSION_LANGUAGE_HINTS = {
+    None: ["en", "kn"],
+    "english": ["en"],  # ABSOLUTELY ONLY English
+    "kannada": ["kn", "en"],  # Kannada with English fallback for mixed speech
+}
+
+SESSION_CONTEXT = {
+    None: (
+        "Karnataka Government voice assistant for language selection. "
+        "User will say 'English' or 'Kannada' to select language. "
+        "Wait for complete phrases - do not cut off speech early. "
+        "Services: Contact Form, Felling Transit Permission."
+    ),
+    # ULTRA STRICT ENGLISH ONLY - NO OTHER LANGUAGES DETECTED
+    "english": (
+        "STRICT ENGLISH TRANSCRIPTION ONLY. IGNORE ALL OTHER LANGUAGES. "
+        "FORCE ROMANIZE: آفتاب حسین → Aftaab Hussain, محمد خاصم → Mohammed Khasim "
+        "DETECT LANGUAGE AS ENGLISH ONLY. DO NOT DETECT URDU, ARABIC, HINDI. "
+        "TRANSCRIBE ALL SPEECH AS ENGLISH WORDS IN LATIN SCRIPT. "
+        "COMMON INDIAN NAMES IN ENGLISH: Aftaab, Hussain, Mohammed, Khasim, Ahmed, Ali, Khan, Sheikh "
+        "WAIT FOR COMPLETE MULTI-WORD NAMES: FirstName LastName pattern. "
+        "EXAMPLES: Aftaab Hussain (complete), Mohammed Khasim (complete), Ahmed Ali (complete). "
+        "ABSOLUTELY FORBIDDEN: Arabic script آفتاب, Urdu script, Devanagari script. "
+        "MANDATORY: A-Z a-z 0-9 spaces only. English government form system. "
+        "OVERRIDE LANGUAGE DETECTION - FORCE ENGLISH OUTPUT REGARDLESS OF INPUT LANGUAGE."
+    ),
+    "kannada": (
+        "Karnataka Government voice assistant in Kannada script. "
+        "Form filling: names, addresses, phone numbers, tree species, land measurements. "
+        "Common Kannada words: ಹೆಸರು, ವಿಳಾಸ, ಫೋನ್, ಗ್ರಾಮ, ತಾಲೂಕು, ಜಿಲ್ಲೆ, ಮರ, ವಯಸ್ಸು. "
+        "Mixed Kannada-English speech allowed."
+    ),
+}
+
+
+def session_options(language: Optional[str]) -> Tuple[List[str], str]:
+    language = language if language in SESSION_CONTEXT else None
+    return SESSION_LANGUAGE_HINTS[language], SESSION_CONTEXT[language]
+
+
+class ManagedSpeechStream(SpeechStream):
+    """Soniox stream that reports each (re)connect to its STT."""
+
+    # max_endpoint_delay_ms its websocket was opened with (None until connected)
+    endpoint_delay_ms: Optional[int] = None
+
+    async def _connect_ws(self):
+        self.endpoint_delay_ms = self._stt._params.max_endpoint_delay_ms
+        ws = await super()._connect_ws()
+        self._stt._stream_connected(self)
+        return ws
+
+    def reconnect(self) -> bool:
+        """Re-open the websocket with the STT's current options. False if not connected."""
+        if self._ws is None or self._reconnect_event.is_set():
+            return False
+        self._reconnect_event.set()
+        return True
+
+
+class ManagedSTT(soniox.STT):
+    """soniox.STT whose options can be switched under live streams."""
+
+    def __init__(self, *, profile: str, manager: "SttManager", **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.profile = profile
+        self.language: Optional[str] = None
+        self.speech: Optional[SpeechProfile] = None
+        self._manager = manager
+        self._streams: "weakref.WeakSet[ManagedSpeechStream]" = weakref.WeakSet()
+        # stream -> perf_counter() of the switch it still has to apply
+        self._pending: "weakref.WeakKeyDictionary[ManagedSpeechStream, float]" = weakref.WeakKeyDictionary()
+
+    def stream(
+        self,
+        *,
+        language=None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> ManagedSpeechStream:
+        stream = ManagedSpeechStream(stt=self, conn_options=conn_options)
+        self._streams.add(stream)
+        return stream
+
+    def _stream_connected(self, stream: ManagedSpeechStream) -> None:
+        started = self._pending.pop(stream, None)
+        if started is not None:
+            self._manager._record(self, time.perf_counter() - started, reconnected=True)
+
+
+class SttManager:
+    """Prebuilt STT option sets and in-place language switches for this process."""
+
+    def __init__(self, history: int = 100) -> None:
+        self._builders: Dict[str, OptionsBuilder] = {SESSION_PROFILE: session_options}
+        self._options: Dict[Tuple[str, Optional[str], Optional[SpeechProfile]], soniox.STTOptions] = {}
+        self._timings: Deque[float] = deque(maxlen=history)
+        # field -> [turns, total end of utterance delay (s), total VAD silence saved (s)]
+        self._fields: Dict[str, List[float]] = {}
+        self.switches = 0
+        self.reconnects = 0
+
+    def register(self, profile: str, build: OptionsBuilder) -> None:
+        """Declare how to build the options of `profile` (first registration wins)."""
+        self._builders.setdefault(profile, build)
+
+    def options(
+        self,
+        profile: str,
+        language: Optional[str] = None,
+        speech: Optional[SpeechProfile] = None,
+    ) -> soniox.STTOptions:
+        """Prebuilt options for `profile` in `language`, focused on `speech`. Shared, do not mutate."""
+        key = (profile, language, speech)
+        options = self._options.get(key)
+        if options is None:
+            hints, context = self._builders[profile](language)
+            extra = {}
+            if speech is not None:
+                hints = speech.language_hints or hints
+                if speech.phrases:
+                    context = f"Expected answer vocabulary: {', '.join(speech.phrases)}."
+                if speech.endpoint_delay_ms is not None:
+                    extra["max_endpoint_delay_ms"] = speech.endpoint_delay()
+            options = soniox.STTOptions(language_hints=list(hints), context=context, **extra)
+            self._options[key] = options
+        return options
+
+    def prewarm(
+        self,
+        languages: Iterable[Optional[str]] = (None, "english", "kannada"),
+        speech_profiles: Iterable[Optional[SpeechProfile]] = (None,),
+    ) -> int:
+        """Build every registered profile's options up front. Returns how many exist."""
+        speech_profiles = list(speech_profiles)
+        for profile in list(self._builders):
+            for language in languages:
+                for speech in speech_profiles:
+                    self.options(profile, language, speech)
+        return len(self._options)
+
+    def client(self, profile: str = SESSION_PROFILE, language: Optional[str] = None, **kwargs) -> ManagedSTT:
+        """A new STT client for one owner (session or agent), starting in `language`."""
+        stt = ManagedSTT(profile=profile, manager=self, params=self.options(profile, language), **kwargs)
+        stt.language = language
+        return stt
+
+    def switch(self, stt: ManagedSTT, language: Optional[str]) -> int:
+        """
+        Move `stt` to the `language` options of its profile. Live streams
+        reconnect with the new options; returns how many did.
+        """
+        return self._apply(stt, language, stt.speech, reconnect=True)
+
+    def focus(self, stt: ManagedSTT, speech: Optional[SpeechProfile]) -> int:
+        """
+        Keep the language and change the field speech profile. The options
+        are swapped and live streams keep their socket, unless it was opened
+        with a shorter endpoint delay than the field needs; returns how many
+        reconnected.
+        """
+        return self._apply(stt, stt.language, speech, reconnect=False)
+
+    def _apply(
+        self,
+        stt: ManagedSTT,
+        language: Optional[str],
+        speech: Optional[SpeechProfile],
+        reconnect: bool,
+    ) -> int:
+        options = self.options(stt.profile, language, speech)
+        if stt._params is options:
+            return 0
+
+        started = time.perf_counter()
+        stt._params = options
+        stt.language = language
+        stt.speech = speech
+
+        reconnecting = 0
+        for stream in list(stt._streams):
+            cut_short = (stream.endpoint_delay_ms or options.max_endpoint_delay_ms) < options.max_endpoint_delay_ms
+            if (reconnect or cut_short) and stream.reconnect():
+                stt._pending[stream] = started
+                reconnecting += 1
+
+        if not reconnecting:
+            self._record(stt, time.perf_counter() - started, reconnected=False)
+        return reconnecting
+
+    def _record(self, stt: ManagedSTT, seconds: float, reconnected: bool) -> None:
+        self.switches += 1
+        self.reconnects += int(reconnected)
+        self._timings.append(seconds * 1000)
+        how = "reconnected" if reconnected else "options swapped"
+        logger.info(f"🎙️ STT {stt.profile} → {stt.language or 'bilingual'} in {seconds * 1000:.1f} ms ({how})")
+
+    def record_turn(self, field_name: str, end_of_utterance_delay: float, silence_saved: float) -> None:
+        """One user turn answered while `field_name` was asked."""
+        totals = self._fields.setdefault(field_name, [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += end_of_utterance_delay
+        totals[2] += silence_saved
+
+    def field_report(self) -> Dict[str, dict]:
+        """Per field: turns, mean end of utterance delay and total silence saved against the session VAD (ms)."""
+        return {
+            name: {
+                "turns": int(turns),
+                "mean_eou_ms": round(delay / turns * 1000, 1),
+                "saved_ms": round(saved * 1000, 1),
+            }
+            for name, (turns, delay, saved) in self._fields.items()
+        }
+
+    def stats(self) -> dict:
+        timings = list(self._timings)
+        return {
+            "switches": self.switches,
+            "reconnects": self.reconnects,
+            "last_ms": timings[-1] if timings else 0.0,
+            "mean_ms": sum(timings) / len(timings) if timings else 0.0,
+            "max_ms": max(timings, default=0.0),
+            "saved_ms": round(sum(saved for _, _, saved in self._fields.values()) * 1000, 1),
+        }
+
+
+# Shared manager for the current worker process
+STT_MANAGER = SttManager()
@@ -0,0 +1,425 @@
+# utils/submissions.py
+"""
+Server-side form submission.
+
+A confirmed form is written to a durable local outbox (SQLite, synchronous
+commit) under an idempotency key, and the confirm tool returns as soon as
+that commit is done. A background batcher delivers pending submissions to
+the configured sink in batches; failed batches are retried with jittered
+exponential backoff and given up ("dead") after SUBMISSION_MAX_ATTEMPTS.
+
+The idempotency key is derived from the session, form name and values, so
+confirming the same form twice stores and delivers it once. Sinks receive
+the key with every submission and must treat redelivery of a key as a
+no-op: a batch is only marked delivered after the sink accepted all of it.
+
+Rows are claimed with a lease, so several worker processes on one host can
+share the outbox, and a process restarted after a crash delivers whatever
+was left pending.
+
+Sinks (SUBMISSION_SINK):
+
+  file[:path]     append JSON lines, data/submissions.jsonl (default)
+  http(s)://...   POST {"submissions": [...]} (SUBMISSION_TOKEN as bearer)
+  stub            in-memory, for tests
+
+    python -m utils.submissions status
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+SUBMISSION_SINK = os.getenv("SUBMISSION_SINK", "file")
+SUBMISSION_TOKEN = os.getenv("SUBMISSION_TOKEN")
+BATCH_SIZE = int(os.getenv("SUBMISSION_BATCH", "20"))
+MAX_ATTEMPTS = int(os.getenv("SUBMISSION_MAX_ATTEMPTS", "10"))
+# Backoff after the n-th failure: RETRY_BASE * 2**(n-1), capped, ±50% jitter
+RETRY_BASE = 1.0
+RETRY_MAX = 300.0
+# A claimed batch not settled within this time is picked up again
+LEASE_SECONDS = 60.0
+# Idle poll for due retries
+POLL_INTERVAL = 1.0
+
+
+@dataclass
+class Submission:
+    key: str
+    form: str
+    session: str
+    values: Dict[str, Any]
+    created_at: float
+    attempts: int = 0
+
+
+def idempotency_key(session: str, form_name: str, values: Dict[str, Any]) -> str:
+    """Same session + form + values → same key."""
+    raw = json.dumps([session, form_name, values], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def backoff(attempts: int) -> float:
+    """Seconds before retry number `attempts` (1-based)."""
+    delay = min(RETRY_MAX, RETRY_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.5)
+
+
+# -------------------------------------------------------------------
+# Durable outbox
+# -------------------------------------------------------------------
+
+class SubmissionOutbox:
+    """SQLite table of submissions: pending → delivered | dead."""
+
+    def __init__(self, path: str = os.path.join(DATA_DIR, "submissions.db")) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=FULL")  # an acknowledged submission survives power loss
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS submissions (
+                    key TEXT PRIMARY KEY,
+                    form TEXT NOT NULL,
+                    session TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    delivered_at REAL,
+                    last_error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS submissions_due ON submissions (status, next_attempt_at);
+                """
+            )
+
+    def add(self, submission: Submission) -> bool:
+        """Store `submission`. False if its key is already stored."""
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO submissions (key, form, session, payload, created_at, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (submission.key, submission.form, submission.session,
+                 json.dumps(submission.values, ensure_ascii=False), submission.created_at, submission.created_at),
+            )
+            return cursor.rowcount == 1
+
+    def claim(self, limit: int, lease: float = LEASE_SECONDS) -> List[Submission]:
+        """Take up to `limit` due submissions, hidden from other claimers for `lease` seconds."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT key, form, session, payload, created_at, attempts FROM submissions "
+                    "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                    (now, limit),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE submissions SET next_attempt_at = ? WHERE key = ?",
+                    [(now + lease, row[0]) for row in rows],
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return [Submission(key, form, session, json.loads(payload), created_at, attempts)
+                for key, form, session, payload, created_at, attempts in rows]
+
+    def delivered(self, keys: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "UPDATE submissions SET status = 'delivered', delivered_at = ?, attempts = attempts + 1, "
+                "last_error = NULL WHERE key = ?",
+                [(now, key) for key in keys],
+            )
+
+    def failed(self, batch: Iterable[Submission], error: str, max_attempts: int = MAX_ATTEMPTS) -> int:
+        """Schedule retries for `batch`. Returns how many were given up."""
+        now = time.time()
+        dead = 0
+        updates = []
+        for submission in batch:
+            attempts = submission.attempts + 1
+            status = "dead" if attempts >= max_attempts else "pending"
+            dead += status == "dead"
+            updates.append((status, attempts, now + backoff(attempts), error[:500], submission.key))
+        with self._lock:
+            self._db.executemany(
+                "UPDATE submissions SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE key = ?",
+                updates,
+            )
+        return dead
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM submissions GROUP BY status").fetchall())
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt_at) FROM submissions WHERE status = 'pending'"
+            ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+# -------------------------------------------------------------------
+# Sinks
+# -------------------------------------------------------------------
+
+class SubmissionSink:
+    """Delivery target. deliver() raises if the batch was not accepted as a whole."""
+
+    name = "sink"
+
+    async def deliver(self, batch: List[Submission]) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class FileSink(SubmissionSink):
+    """Appends one JSON line per submission (fsynced)."""
+
+    name = "file"
+
+    def __init__(self, path: str = os.path.join(DATA_DIR, "submissions.jsonl")) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+
+    def _append(self, lines: List[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def deliver(self, batch: List[Submission]) -> None:
+        lines = [json.dumps(asdict(submission), ensure_ascii=False) + "\n" for submission in batch]
+        await asyncio.to_thread(self._append, lines)
+
+
+class HttpSink(SubmissionSink):
+    """POSTs a batch to the department backend; any 2xx accepts it."""
+
+    name = "http"
+
+    def __init__(self, url: str, token: Optional[str] = SUBMISSION_TOKEN, timeout: float = 10.0) -> None:
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+        self._http = None
+
+    async def deliver(self, batch: List[Submission]) -> None:
+        import aiohttp
+
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        headers = {"Idempotency-Key": ",".join(submission.key for submission in batch)}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        body = {"submissions": [asdict(submission) for submission in batch]}
+        async with self._http.post(self.url, json=body, headers=headers) as response:
+            if response.status // 100 != 2:
+                raise RuntimeError(f"HTTP {response.status}: {(await response.text())[:200]}")
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+
+class StubSink(SubmissionSink):
+    """Keeps delivered submissions in memory; fails the first `failures` batches."""
+
+    name = "stub"
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.batches: List[List[Submission]] = []
+
+    @property
+    def delivered(self) -> List[Submission]:
+        return [submission for batch in self.batches for submission in batch]
+
+    async def deliver(self, batch: List[Submission]) -> None:
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("stub sink failure")
+        self.batches.append(list(batch))
+
+
+def open_sink(spec: str = SUBMISSION_SINK) -> SubmissionSink:
+    """Sink for a SUBMISSION_SINK value ("file", "file:<path>", "http(s)://...", "stub")."""
+    if spec.startswith(("http://", "https://")):
+        return HttpSink(spec)
+    kind, _, path = spec.partition(":")
+    if kind == "file":
+        return FileSink(path) if path else FileSink()
+    if kind == "stub":
+        return StubSink()
+    raise ValueError(f"Unknown submission sink: {spec}")
+
+
+# -------------------------------------------------------------------
+# Pipeline
+# -------------------------------------------------------------------
+
+class SubmissionPipeline:
+    """Durable enqueue + background batched delivery, one per worker process."""
+
+    def __init__(
+        self,
+        sink: Optional[SubmissionSink] = None,
+        path: str = os.path.join(DATA_DIR, "submissions.db"),
+        batch_size: int = BATCH_SIZE,
+        max_attempts: int = MAX_ATTEMPTS,
+    ) -> None:
+        self._sink = sink
+        self.path = path
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._outbox: Optional[SubmissionOutbox] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # One delivery pass at a time, so drain() waits for a batch the batcher has in flight
+        self._delivering = asyncio.Lock()
+        self.enqueued = 0
+        self.duplicates = 0
+        self.delivered = 0
+        self.retried = 0
+        self.dead = 0
+
+    @property
+    def outbox(self) -> SubmissionOutbox:
+        if self._outbox is None:
+            self._outbox = SubmissionOutbox(self.path)
+        return self._outbox
+
+    @property
+    def sink(self) -> SubmissionSink:
+        if self._sink is None:
+            self._sink = open_sink()
+        return self._sink
+
+    async def submit(self, form_name: str, values: Dict[str, Any], session: str = "") -> str:
+        """Store a confirmed form durably and schedule its delivery. Returns the idempotency key."""
+        submission = Submission(
+            key=idempotency_key(session, form_name, values),
+            form=form_name,
+            session=session,
+            values=values,
+            created_at=time.time(),
+        )
+        if await asyncio.to_thread(self.outbox.add, submission):
+            self.enqueued += 1
+            logger.info(f"📮 Queued {form_name} submission {submission.key[:12]}")
+        else:
+            self.duplicates += 1
+            logger.info(f"📮 {form_name} submission {submission.key[:12]} already queued")
+        self.start()
+        self._wake.set()
+        return submission.key
+
+    def start(self) -> None:
+        """Run the batcher (also delivers what earlier processes left pending)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def deliver_due(self) -> int:
+        """Deliver every due submission now, batch by batch. Returns how many were delivered."""
+        async with self._delivering:
+            return await self._deliver_batches()
+
+    async def _deliver_batches(self) -> int:
+        delivered = 0
+        while True:
+            batch = await asyncio.to_thread(self.outbox.claim, self.batch_size)
+            if not batch:
+                return delivered
+            try:
+                await self.sink.deliver(batch)
+            except Exception as e:
+                dead = await asyncio.to_thread(self.outbox.failed, batch, str(e), self.max_attempts)
+                self.retried += len(batch) - dead
+                self.dead += dead
+                logger.warning(f"⚠️ Submission batch of {len(batch)} failed ({self.sink.name}): {e}")
+                if dead:
+                    logger.error(f"❌ Gave up on {dead} submissions after {self.max_attempts} attempts")
+                return delivered
+            await asyncio.to_thread(self.outbox.delivered, [submission.key for submission in batch])
+            delivered += len(batch)
+            self.delivered += len(batch)
+            logger.info(f"📬 Delivered {len(batch)} submissions ({self.sink.name})")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.deliver_due()
+                next_due = await asyncio.to_thread(self.outbox.next_due)
+            except Exception as e:
+                logger.error(f"❌ Submission batcher error: {e}")
+                next_due = None
+            delay = POLL_INTERVAL if next_due is None else min(max(next_due - time.time(), 0.0), POLL_INTERVAL)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain(self, timeout: float = 5.0) -> None:
+        """Best-effort delivery before shutdown; whatever is left stays queued on disk."""
+        try:
+            await asyncio.wait_for(self.deliver_due(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ Submission drain timed out, pending submissions stay queued")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._sink is not None:
+            await self._sink.close()
+
+    def stats(self) -> dict:
+        return {
+            "enqueued": self.enqueued,
+            "duplicates": self.duplicates,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "dead": self.dead,
+        }
+
+
+# Shared pipeline for the current worker process
+SUBMISSIONS = SubmissionPipeline()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if (sys.argv[1] if len(sys.argv) > 1 else "status") == "status":
+        print(SUBMISSIONS.outbox.counts())
@@ -0,0 +1,349 @@
+# utils/tts_cache.py
+"""
+Pre-synthesized TTS phrase cache.
+
+Most of what the agents say is fixed text: greetings, form intros, field
+questions and confirmation prompts. PhraseCache keeps the synthesized audio
+for such phrases, keyed by (text, voice, model, language):
+
+  - on disk, content-addressed (sha256 of the key) as 16-bit PCM .wav files
+    under data/tts_cache/, shared by every worker on the host
+  - in memory, as an LRU of decoded PCM bounded by `max_memory_bytes`
+
+The disk store is also LRU-bounded (`max_disk_bytes`, by file mtime, which
+is refreshed on every hit); a sweep runs in a worker thread after new files
+are written. Playback only looks in memory: hits stream straight from the
+cache through session.say(text, audio=...); misses are spoken live by the
+session TTS and, for catalogued phrases, loaded from disk or rendered in the
+background for next time. Disk reads and writes never run on the event loop
+(warm() loads the whole catalogue into memory at session start).
+
+    python -m utils.tts_cache build   # render the prompt catalogue (needs API keys)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import wave
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from livekit import rtc
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, "data", "tts_cache")
+
+# Length of each frame streamed to the session on playback
+FRAME_MS = 20
+
+
+@dataclass(frozen=True)
+class CachedAudio:
+    pcm: bytes  # 16-bit little-endian PCM, interleaved
+    sample_rate: int
+    num_channels: int
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / (2 * self.num_channels * self.sample_rate)
+
+
+def tts_identity(tts) -> Tuple[str, str]:
+    """(voice, model) of a TTS instance, used in the cache key."""
+    opts = getattr(tts, "_opts", None)
+    voice = getattr(opts, "voice", None) or getattr(opts, "voice_id", None) or ""
+    model = getattr(tts, "model", None) or getattr(opts, "model", None) or ""
+    return str(voice), str(model)
+
+
+def phrase_key(text: str, voice: str, model: str, language: Optional[str]) -> str:
+    """Content address of one phrase rendering."""
+    raw = json.dumps([text.strip(), voice, model, language or ""], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PhraseCache:
+    """Disk + in-memory LRU cache of synthesized phrases."""
+
+    def __init__(
+        self,
+        directory: str = CACHE_DIR,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, CachedAudio]" = OrderedDict()
+        self._memory_bytes = 0
+        self._catalogue: Set[str] = set()
+        self._rendering: Set[str] = set()
+        self._warm_task: Optional[asyncio.Task] = None
+        # Background loads, renders and sweeps (kept so they are not garbage collected)
+        self._tasks: Set[asyncio.Task] = set()
+        self._sweep_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    # ---------------------------------------------------------------
+    # Store
+    # ---------------------------------------------------------------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.wav")
+
+    def peek(self, key: str) -> Optional[CachedAudio]:
+        """Cached audio for `key` if it is in memory (no disk access)."""
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+        return audio
+
+    def get(self, key: str) -> Optional[CachedAudio]:
+        """Cached audio for `key` (memory first, then disk), or None. Blocking; see load()."""
+        audio = self.peek(key)
+        if audio is None:
+            audio = self._read(key)
+            if audio is not None:
+                self._remember(key, audio)
+        return audio
+
+    async def load(self, key: str) -> Optional[CachedAudio]:
+        """get() with the disk read in a worker thread."""
+        audio = self.peek(key)
+        if audio is None:
+            audio = await asyncio.to_thread(self._read, key)
+            if audio is not None:
+                self._remember(key, audio)
+        return audio
+
+    def put(self, key: str, audio: CachedAudio) -> None:
+        """Store `audio` under `key` on disk and in memory. Blocking; see store()."""
+        self._write(key, audio)
+        self._remember(key, audio)
+
+    async def store(self, key: str, audio: CachedAudio) -> None:
+        """put() with the disk write in a worker thread, then a background sweep."""
+        await asyncio.to_thread(self._write, key, audio)
+        self._remember(key, audio)
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = self._spawn(asyncio.to_thread(self.sweep))
+
+    def _read(self, key: str) -> Optional[CachedAudio]:
+        path = self._path(key)
+        try:
+            with wave.open(path, "rb") as wav:
+                audio = CachedAudio(wav.readframes(wav.getnframes()), wav.getframerate(), wav.getnchannels())
+            os.utime(path)  # LRU on disk
+        except (FileNotFoundError, wave.Error, EOFError):
+            return None
+        return audio
+
+    def _write(self, key: str, audio: CachedAudio) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with wave.open(tmp, "wb") as wav:
+            wav.setnchannels(audio.num_channels)
+            wav.setsampwidth(2)
+            wav.setframerate(audio.sample_rate)
+            wav.writeframes(audio.pcm)
+        os.replace(tmp, path)  # readers never see a partial file
+
+    def _remember(self, key: str, audio: CachedAudio) -> None:
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key).pcm)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio.pcm)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.pcm)
+
+    def sweep(self) -> int:
+        """Drop the least recently used files over `max_disk_bytes`. Blocking. Returns how many."""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".wav"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # swept by another worker
+            total -= size
+            removed += 1
+        return removed
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def drain(self) -> None:
+        """Wait for background loads, renders and sweeps started so far."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+        }
+
+    # ---------------------------------------------------------------
+    # Rendering
+    # ---------------------------------------------------------------
+
+    async def render(self, tts, text: str, language: Optional[str]) -> CachedAudio:
+        """Synthesize `text` with `tts` and store it."""
+        from livekit import rtc
+
+        frames: List[rtc.AudioFrame] = []
+        async with tts.synthesize(text) as stream:
+            async for event in stream:
+                frames.append(event.frame)
+
+        merged = rtc.combine_audio_frames(frames)
+        audio = CachedAudio(bytes(merged.data.cast("B")), merged.sample_rate, merged.num_channels)
+        await self.store(phrase_key(text, *tts_identity(tts), language), audio)
+        return audio
+
+    async def warm(self, tts, phrases: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """Render every (text, language) not cached yet. Returns how many were rendered."""
+        rendered = 0
+        for text, language in phrases:
+            self._catalogue.add(text.strip())
+            key = phrase_key(text, *tts_identity(tts), language)
+            if await self.load(key) is not None:
+                continue
+            try:
+                await self.render(tts, text, language)
+                rendered += 1
+            except Exception as e:
+                logger.warning(f"TTS cache render failed for {text[:40]!r}: {e}")
+        return rendered
+
+    def schedule_warm(self, tts) -> None:
+        """Render the prompt catalogue in the background, once per process."""
+        if self._warm_task is None:
+            self._warm_task = asyncio.create_task(self.warm(tts, prompt_catalogue()))
+
+    def _fill_later(self, tts, text: str, language: Optional[str], key: str) -> None:
+        """Bring a catalogued phrase into memory: from disk, else by rendering it."""
+        if key in self._rendering:
+            return
+        self._rendering.add(key)
+
+        async def _fill() -> None:
+            try:
+                if await self.load(key) is None:
+                    await self.render(tts, text, language)
+            except Exception as e:
+                logger.warning(f"TTS cache render failed for {text[:40]!r}: {e}")
+            finally:
+                self._rendering.discard(key)
+
+        self._spawn(_fill())
+
+    # ---------------------------------------------------------------
+    # Playback
+    # ---------------------------------------------------------------
+
+    @staticmethod
+    async def stream(audio: CachedAudio) -> AsyncIterator["rtc.AudioFrame"]:
+        """Yield `audio` as FRAME_MS frames for session.say(audio=...)."""
+        from livekit import rtc
+
+        samples_per_frame = audio.sample_rate * FRAME_MS // 1000
+        frame_bytes = samples_per_frame * audio.num_channels * 2
+        for start in range(0, len(audio.pcm), frame_bytes):
+            chunk = audio.pcm[start:start + frame_bytes]
+            yield rtc.AudioFrame(
+                data=chunk,
+                sample_rate=audio.sample_rate,
+                num_channels=audio.num_channels,
+                samples_per_channel=len(chunk) // (2 * audio.num_channels),
+            )
+
+    def say(self, session, text: str, **kwargs):
+        """
+        session.say() that plays cached audio when available.
+        Returns the SpeechHandle, like session.say().
+        """
+        tts = session.tts
+        # Before language selection the agent speaks English (the catalogue key)
+        language = getattr(session.userdata, "preferred_language", None) or "english"
+        if tts is None:
+            return session.say(text, **kwargs)
+
+        key = phrase_key(text, *tts_identity(tts), language)
+        audio = self.peek(key)
+        if audio is not None:
+            self.hits += 1
+            return session.say(text, audio=self.stream(audio), **kwargs)
+
+        self.misses += 1
+        if text.strip() in self._catalogue:
+            self._fill_later(tts, text, language, key)
+        return session.say(text, **kwargs)
+
+
+# -------------------------------------------------------------------
+# Prompt catalogue
+# -------------------------------------------------------------------
+
+def prompt_catalogue() -> List[Tuple[str, str]]:
+    """Every fixed (text, language) the agents speak: greetings, intros, questions, confirmations."""
+    from agents.base_agent import CONFIRMATION_PROMPT, RESUME_PROMPT
+    from agents.greeter_agent import CANNOT_HELP, GREETING, SERVICE_PROMPTS
+    from models.registry import FORM_REGISTRY
+
+    phrases = [(GREETING, "english")]
+    phrases.extend((text, language) for language, text in SERVICE_PROMPTS.items())
+    for texts in (CONFIRMATION_PROMPT, RESUME_PROMPT, CANNOT_HELP):
+        phrases.extend((text, language) for language, text in texts.items())
+
+    for form_cls in FORM_REGISTRY.values():
+        for texts in (form_cls.intro, form_cls.submitted_message):
+            phrases.extend((text, language) for language, text in texts.items())
+        for spec in form_cls.schema().fields:
+            phrases.extend((text, language) for language, text in spec.prompt.items())
+
+    return list(dict.fromkeys(phrases))
+
+
+# Shared cache for the current worker process
+PHRASE_CACHE = PhraseCache()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if (sys.argv[1] if len(sys.argv) > 1 else "build") == "build":
+        from config.settings import DEFAULT_TTS
+
+        async def _build() -> None:
+            catalogue = prompt_catalogue()
+            rendered = await PHRASE_CACHE.warm(DEFAULT_TTS, catalogue)
+            print(f"Rendered {rendered} of {len(catalogue)} phrases into {CACHE_DIR}")
+
+        asyncio.run(_build())